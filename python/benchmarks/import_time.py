@@ -0,0 +1,113 @@
+"""
+Import-time benchmark for the package entry points.
+
+Runs each import in a fresh interpreter with ``python -X importtime`` and reports the cumulative
+import time, next to the time the same import costs when the heavy dependencies (pandas, scipy,
+shapely, matplotlib) are loaded eagerly, as they were before imports were deferred. With
+``--check``, exits non-zero if a light entry point pulls in a heavy dependency.
+
+Usage (from the ``python/`` directory):
+    python benchmarks/import_time.py [--repeat 5] [--check]
+"""
+
+# base libs
+from pathlib import Path
+from typing import Dict, List, Tuple
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+# Modules that should only load on first use
+HEAVY_MODULES = ("pandas", "scipy", "shapely", "matplotlib")
+
+# (label, import statement) of entry points that must stay light
+ENTRY_POINTS = [
+    ("battles", "import imperial_generals.battles"),
+    ("units", "import imperial_generals.units"),
+    ("map package", "import imperial_generals.map"),
+    ("MapConfig", "from imperial_generals.map import MapConfig"),
+]
+
+PYTHON_DIR = Path(__file__).resolve().parents[1]
+
+_IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def measure(statement: str) -> Tuple[float, List[str]]:
+    """
+    Import in a fresh interpreter and parse the ``-X importtime`` report.
+
+    Args:
+        statement (str): Python import statement to run.
+
+    Returns:
+        Tuple[float, List[str]]: Total cumulative import time in milliseconds (top-level
+        imports only) and the heavy top-level packages that were imported.
+    """
+    env = dict(os.environ, PYTHONPATH=str(PYTHON_DIR) + os.pathsep + os.environ.get("PYTHONPATH", ""))
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        capture_output=True, text=True, env=env, check=True,
+    )
+    total_us = 0
+    loaded = set()
+    for line in result.stderr.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        cumulative, indent, module = int(match.group(2)), len(match.group(3)), match.group(4)
+        if indent == 1:
+            # top-level imports; nested ones are already counted in their parent's cumulative time
+            total_us += cumulative
+        if module.split(".")[0] in HEAVY_MODULES:
+            loaded.add(module.split(".")[0])
+    return total_us / 1000, sorted(loaded)
+
+
+def run(repeat: int) -> Dict[str, Dict[str, object]]:
+    """
+    Measure every entry point lazily and with the heavy dependencies forced in.
+
+    Args:
+        repeat (int): Number of fresh interpreters per measurement (the median is reported).
+
+    Returns:
+        dict: Per entry point: 'lazy_ms', 'eager_ms' and the 'heavy' modules loaded lazily.
+    """
+    eager_imports = "; ".join(f"import {name}" for name in HEAVY_MODULES) + "; import matplotlib.pyplot"
+    results = {}
+    for label, statement in ENTRY_POINTS:
+        lazy = [measure(statement) for _ in range(repeat)]
+        eager = [measure(f"{statement}; {eager_imports}")[0] for _ in range(repeat)]
+        results[label] = {
+            'lazy_ms': statistics.median(t for t, _ in lazy),
+            'eager_ms': statistics.median(eager),
+            'heavy': lazy[0][1],
+        }
+    return results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5, help="fresh interpreters per measurement")
+    parser.add_argument("--check", action="store_true", help="fail if a light entry point loads a heavy module")
+    args = parser.parse_args()
+
+    results = run(args.repeat)
+    print(f"{'entry point':<14} {'lazy ms':>9} {'eager ms':>9} {'saved ms':>9}  heavy modules loaded")
+    for label, row in results.items():
+        print(
+            f"{label:<14} {row['lazy_ms']:>9.1f} {row['eager_ms']:>9.1f} "
+            f"{row['eager_ms'] - row['lazy_ms']:>9.1f}  {', '.join(row['heavy']) or '-'}"
+        )
+    if args.check and any(row['heavy'] for row in results.values()):
+        print("FAIL: heavy dependencies are imported eagerly")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,210 @@
+"""
+Benchmark suite for the simulation, unit loading, sampling and Voronoi hot paths.
+
+Every benchmark is a setup function registered with ``@benchmark(*params)``: called with one
+parameter, it does its untimed setup and returns the zero-argument callable that is timed. All
+inputs come from fixed seeds, so timings of different commits measure the same work. Run the
+suite with ``run_benchmarks.py`` at the repository root.
+"""
+
+# base libs
+from typing import Callable, Dict, Iterator, List, Tuple
+import time
+
+# ext libs
+import numpy as np
+
+# name -> (setup function, parameters)
+BENCHMARKS: Dict[str, Tuple[Callable[..., Callable[[], object]], List[object]]] = {}
+
+SEED = 1234
+
+
+def benchmark(*params: object) -> Callable:
+    """Register a setup function, run once per parameter (or once with none)."""
+    def register(setup: Callable[..., Callable[[], object]]) -> Callable[..., Callable[[], object]]:
+        BENCHMARKS[setup.__name__] = (setup, list(params) or [None])
+        return setup
+    return register
+
+
+def cases(pattern: str = "") -> Iterator[Tuple[str, Callable[..., Callable[[], object]], object]]:
+    """Yield (case name, setup, parameter) for every case whose name contains pattern."""
+    for name, (setup, params) in BENCHMARKS.items():
+        for param in params:
+            case = name if param is None else f"{name}[{param}]"
+            if pattern in case:
+                yield case, setup, param
+
+
+def measure(func: Callable[[], object], repeat: int = 5, min_time: float = 0.2) -> Dict[str, float]:
+    """
+    Time a callable: one warm-up call, then at least `repeat` calls and at least `min_time` seconds.
+
+    Returns:
+        dict: 'min', 'median', 'mean' and 'stdev' seconds per call, and the number of 'repeats'.
+    """
+    func()
+    timings = []
+    start = time.perf_counter()
+    while len(timings) < repeat or time.perf_counter() - start < min_time:
+        t0 = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - t0)
+        if len(timings) >= 1000:
+            break
+    timings = np.array(timings)
+    return {
+        'min': float(timings.min()),
+        'median': float(np.median(timings)),
+        'mean': float(timings.mean()),
+        'stdev': float(timings.std(ddof=1)) if len(timings) > 1 else 0.0,
+        'repeats': len(timings),
+    }
+
+
+# ------------------------------------------------------------------------------
+# Battles
+# ------------------------------------------------------------------------------
+
+# regiment sizes per scale; the second side is 10% smaller so most runs last the full time
+SIMULATION_SIZES = {"small": 100, "medium": 1_000, "large": 10_000}
+
+
+@benchmark(*SIMULATION_SIZES)
+def simulation_run(scale: str) -> Callable[[], object]:
+    from imperial_generals.battles import Simulation
+    from imperial_generals.units import Regiment
+
+    size = SIMULATION_SIZES[scale]
+
+    def run() -> object:
+        sim = Simulation((Regiment(size, "4/5/2/1", "sq"), Regiment(size * 9 // 10, "3/6/1/0", "sq")), seed=SEED)
+        sim.run_simulation(time=1.0)
+        return sim
+    return run
+
+
+# campaign battles started per timed run; the serial case is the baseline of the pooled one
+CAMPAIGN_BATTLES = 100
+
+
+@benchmark(1, 4)
+def campaign_run(workers: int) -> Callable[[], object]:
+    from imperial_generals.battles import CampaignScheduler
+    from imperial_generals.units import Regiment
+
+    # the scheduler (and its worker processes) lives across calls, so pool start-up is not timed
+    campaign = CampaignScheduler(workers=workers, seed=SEED)
+    campaign.start_battle("warm-up", (Regiment(10, "4/5/2/1", "sq"), Regiment(10, "3/6/1/0", "sq")))
+    campaign.run(until=0.0001)
+    rounds = iter(range(1_000_000))
+
+    def run() -> object:
+        n = next(rounds)
+        start = campaign.time
+        for i in range(CAMPAIGN_BATTLES):
+            battle_id = f"r{n}-b{i}"
+            campaign.start_battle(
+                battle_id, (Regiment(300 + i, "4/5/2/1", "sq"), Regiment(320, "3/6/1/0", "sq")),
+                time=start + 0.001 * (i + 1)
+            )
+            if i % 10 == 0:
+                campaign.join_battle(battle_id, 1, 50, time=start + 0.001 * i + 0.05)
+        campaign.run(until=start + 0.3)
+        return campaign
+    return run
+
+
+# ------------------------------------------------------------------------------
+# Units
+# ------------------------------------------------------------------------------
+
+@benchmark(100_000)
+def regiment_bulk_load(n_regiments: int) -> Callable[[], object]:
+    from imperial_generals.units import Regiment
+
+    rng = np.random.default_rng(SEED)
+    records = [
+        {"size": int(size), "stats": f"{xp}/{morale}/{weapon}/{melee}", "law": "sq"}
+        for size, xp, morale, weapon, melee in zip(
+            rng.integers(100, 3000, n_regiments), rng.integers(1, 11, n_regiments),
+            rng.integers(1, 11, n_regiments), rng.integers(0, 3, n_regiments), rng.integers(0, 2, n_regiments),
+        )
+    ]
+    return lambda: Regiment.bulk_from_json(records)
+
+
+# ------------------------------------------------------------------------------
+# Utils
+# ------------------------------------------------------------------------------
+
+UTIL_CALLS = 10_000
+
+
+@benchmark()
+def combat_efficiency() -> Callable[[], object]:
+    from imperial_generals.utils import get_combat_efficiency
+
+    rng = np.random.default_rng(SEED)
+    stats = list(zip(
+        rng.integers(1, 11, UTIL_CALLS).tolist(), rng.integers(1, 11, UTIL_CALLS).tolist(),
+        rng.integers(-2, 3, UTIL_CALLS).tolist(), rng.integers(0, 2, UTIL_CALLS).tolist(),
+    ))
+
+    def run() -> object:
+        return [get_combat_efficiency(*s) for s in stats]
+    return run
+
+
+@benchmark()
+def closest_morale_stat() -> Callable[[], object]:
+    from imperial_generals.utils import get_closest_morale_stat
+
+    morale = np.random.default_rng(SEED).uniform(0, 100, UTIL_CALLS).tolist()
+
+    def run() -> object:
+        return [get_closest_morale_stat(m) for m in morale]
+    return run
+
+
+# ------------------------------------------------------------------------------
+# Map
+# ------------------------------------------------------------------------------
+
+# (width, height, min_distance) per scale
+POISSON_MAPS = {"100x100": (100, 100, 2.0), "300x300": (300, 300, 2.0), "1000x1000": (1000, 1000, 4.0)}
+
+
+@benchmark(*POISSON_MAPS)
+def poisson_disc(size: str) -> Callable[[], object]:
+    from imperial_generals.map import PoissonDiscSampler
+
+    width, height, min_distance = POISSON_MAPS[size]
+    return lambda: PoissonDiscSampler.generate(width, height, min_distance, seed=SEED)
+
+
+@benchmark(1_000, 10_000, 100_000)
+def voronoi_diagram(n_points: int) -> Callable[[], object]:
+    from imperial_generals.map import VoronoiMap
+
+    points = np.random.default_rng(SEED).uniform(0, 1000, size=(n_points, 2))
+
+    def run() -> object:
+        voronoi = VoronoiMap(points, width=1000, height=1000)
+        voronoi.generate_diagram()
+        return voronoi
+    return run
+
+
+@benchmark(2_000, 20_000, 100_000)
+def voronoi_add_points(n_points: int) -> Callable[[], object]:
+    from imperial_generals.map import VoronoiMap
+
+    rng = np.random.default_rng(SEED)
+    voronoi = VoronoiMap(rng.uniform(0, 1000, size=(n_points, 2)), width=1000, height=1000)
+    voronoi.generate_diagram()
+    # the first insertion builds the per-cell rows; after that one site per call should cost
+    # the same whatever the map size
+    voronoi.add_points(rng.uniform(0, 1000, size=(1, 2)))
+    return lambda: voronoi.add_points(rng.uniform(0, 1000, size=(1, 2)))
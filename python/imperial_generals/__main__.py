@@ -0,0 +1,129 @@
+"""
+Command line interface.
+
+Usage (from the ``python/`` directory):
+    python -m imperial_generals run scenarios.json [-o results.jsonl] [-j 8] [--replicas 100]
+    python -m imperial_generals serve [--socket /tmp/imperial.sock | --port 8765]
+
+Running the same command again after an interruption resumes from the runs already in the output
+(and, with --checkpoint-dir, from the last checkpoint of each unfinished run).
+"""
+
+# base libs
+from pathlib import Path
+from typing import List, Optional
+import argparse
+import logging
+import sys
+
+
+def _run(args: argparse.Namespace) -> int:
+    # imported here so that `--help` stays fast
+    from imperial_generals.battles.BatchRunner import BatchRunner
+
+    scenarios = BatchRunner.load_scenarios(args.scenarios, replicas=args.replicas, seed=args.seed)
+    output = args.output
+    if output is None:
+        suffix = ".results.parquet" if args.format == "parquet" else ".results.jsonl"
+        output = Path(args.scenarios).with_suffix(suffix)
+    runner = BatchRunner(
+        scenarios,
+        output,
+        workers=args.workers,
+        chunk_size=args.chunk_size,
+        max_pending=args.max_pending,
+        output_format=args.format,
+        overwrite=args.overwrite,
+        checkpoint_dir=args.checkpoint_dir,
+        checkpoint_interval=args.checkpoint_interval,
+        memory_budget=int(args.memory_budget_mb * 2**20) if args.memory_budget_mb is not None else None,
+        profile_memory=args.profile_memory,
+    )
+    summary = runner.run()
+    print(
+        f"{summary['completed']} runs completed, {summary['skipped']} already in {runner.output} "
+        f"({summary['total']} total)",
+        file=sys.stderr,
+    )
+    if args.profile_memory:
+        print(f"peak memory of a run: {summary['peak_memory'] / 2**20:.1f} MiB", file=sys.stderr)
+    return 0
+
+
+def _serve(args: argparse.Namespace) -> int:
+    import asyncio
+    from imperial_generals.battles.SimulationService import SimulationService
+
+    async def serve() -> None:
+        service = SimulationService(
+            workers=args.workers,
+            batch_window=args.batch_window_ms / 1000,
+            max_batch_size=args.max_batch_size,
+            max_queue=args.max_queue,
+            timeout=args.timeout,
+        )
+        server = await service.serve(host=args.host, port=args.port, path=args.socket)
+        print(f"Serving on {args.socket or server.sockets[0].getsockname()}", file=sys.stderr)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            await service.stop()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m imperial_generals",
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("-v", "--verbose", action="count", default=0, help="log progress (-vv for debug)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="run the battles of a scenario file")
+    run.add_argument("scenarios", help="JSON (list or {'defaults', 'scenarios'}) or JSONL scenario file")
+    run.add_argument("-o", "--output", help="output file (.jsonl) or directory (.parquet); "
+                     "defaults to <scenarios>.results.jsonl")
+    run.add_argument("--format", choices=("jsonl", "parquet"), help="output format (default: from the output suffix)")
+    run.add_argument("-j", "--workers", type=int, help="worker processes (default: CPU count; 1 runs in-process)")
+    run.add_argument("--replicas", type=int, default=1, help="replicas of scenarios that do not set their own")
+    run.add_argument("--seed", type=int, default=0, help="base seed of scenarios that do not set their own")
+    run.add_argument("--chunk-size", type=int, default=1, help="replicas per task sent to a worker")
+    run.add_argument("--max-pending", type=int, help="tasks in flight before waiting for results")
+    run.add_argument("--overwrite", action="store_true", help="discard existing output instead of resuming")
+    run.add_argument("--checkpoint-dir", help="checkpoint long runs here so a pre-empted batch resumes mid-run")
+    run.add_argument("--checkpoint-interval", type=float, default=600.0, help="seconds between checkpoints of a run")
+    run.add_argument("--memory-budget-mb", type=float, help="trajectory memory per run before recording coarsens")
+    run.add_argument("--profile-memory", action="store_true", help="record each run's peak and retained memory")
+    run.set_defaults(func=_run)
+
+    serve = commands.add_parser("serve", help="answer JSON-lines battle prediction requests on a socket")
+    serve.add_argument("--socket", help="Unix socket path (instead of TCP)")
+    serve.add_argument("--host", default="127.0.0.1", help="TCP host (default: 127.0.0.1)")
+    serve.add_argument("--port", type=int, default=8765, help="TCP port (default: 8765)")
+    serve.add_argument("-j", "--workers", type=int, help="worker processes (default: CPU count)")
+    serve.add_argument("--batch-window-ms", type=float, default=5.0, help="micro-batching window")
+    serve.add_argument("--max-batch-size", type=int, default=64, help="requests per batch")
+    serve.add_argument("--max-queue", type=int, default=1024, help="queued requests before rejecting")
+    serve.add_argument("--timeout", type=float, default=30.0, help="default request timeout in seconds")
+    serve.set_defaults(func=_serve)
+
+    args = parser.parse_args(argv)
+    logging.basicConfig(
+        level=(logging.WARNING, logging.INFO, logging.DEBUG)[min(args.verbose, 2)],
+        format='%(asctime)s %(levelname)s %(message)s',
+    )
+    try:
+        return args.func(args)
+    except (OSError, ValueError, ImportError) as e:
+        parser.exit(1, f"error: {e}\n")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
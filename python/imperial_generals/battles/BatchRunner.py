@@ -0,0 +1,544 @@
+"""
+Batch runs of scenario files: many matchups, many seeded replicas, results streamed to disk.
+"""
+
+# base libs
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Set, Tuple, Union
+import hashlib
+import json
+import logging
+import os
+import zlib
+
+# ext libs
+import numpy as np
+
+# local imports
+from imperial_generals.units import Regiment
+from imperial_generals.battles.Simulation import Simulation
+
+# Inherit logging configuration from the main application
+logger = logging.getLogger(__name__)
+
+# Columns of a result record, in output order
+RESULT_FIELDS = (
+    "scenario", "replica", "seed", "end_time", "events",
+    "size_1", "size_2", "morale_1", "morale_2", "outcome", "winner",
+)
+
+# Extra columns of a result record when memory is profiled (JSONL output only)
+MEMORY_FIELDS = ("peak_memory", "retained_memory", "trajectory_rows")
+
+# A (scenario id, replica) pair identifying one simulation run
+TaskKey = Tuple[str, int]
+
+
+class _JsonlWriter:
+    """Appends one JSON object per line, flushed after every batch so partial output is usable."""
+
+    def __init__(self, path: Path, overwrite: bool) -> None:
+        self.path = path
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if overwrite:
+            self.path.unlink(missing_ok=True)
+        self._file = None
+
+    def completed(self) -> Set[TaskKey]:
+        """Keys already in the file; a torn last line (interrupted write) is cut off."""
+        done: Set[TaskKey] = set()
+        if not self.path.exists():
+            return done
+        valid_bytes = 0
+        with open(self.path, "rb") as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    record = json.loads(line)
+                    key = (record["scenario"], record["replica"])
+                except (ValueError, KeyError, TypeError):
+                    break
+                done.add(key)
+                valid_bytes += len(line)
+        if valid_bytes != self.path.stat().st_size:
+            # the cut-off record is rerun
+            logger.warning(f"Discarding incomplete trailing output in {self.path}")
+            os.truncate(self.path, valid_bytes)
+        return done
+
+    def write(self, records: List[Dict[str, Any]]) -> None:
+        if self._file is None:
+            self._file = open(self.path, "a", encoding="utf-8")
+        self._file.writelines(json.dumps(record) + "\n" for record in records)
+        self._file.flush()
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class _ParquetWriter:
+    """
+    Writes results as a directory of Parquet part files. Rows are buffered up to ``rows_per_file``;
+    each part is written to a temporary name and renamed, so a killed run never leaves a torn file.
+    """
+
+    def __init__(self, path: Path, overwrite: bool, rows_per_file: int = 10_000) -> None:
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ImportError("Parquet output requires pyarrow; install it or write JSONL output") from e
+        self._pa, self._pq = pa, pq
+        self.schema = pa.schema([
+            ("scenario", pa.string()), ("replica", pa.int32()), ("seed", pa.uint64()),
+            ("end_time", pa.float64()), ("events", pa.int32()),
+            ("size_1", pa.int32()), ("size_2", pa.int32()),
+            ("morale_1", pa.float64()), ("morale_2", pa.float64()),
+            ("outcome", pa.string()), ("winner", pa.int8()),
+        ])
+        self.path = path
+        self.rows_per_file = rows_per_file
+        self.path.mkdir(parents=True, exist_ok=True)
+        for stale in self.path.glob("*.tmp"):
+            stale.unlink()
+        if overwrite:
+            for part in self.path.glob("part-*.parquet"):
+                part.unlink()
+        self._buffer: List[Dict[str, Any]] = []
+        self._next_part = len(list(self.path.glob("part-*.parquet")))
+
+    def completed(self) -> Set[TaskKey]:
+        done: Set[TaskKey] = set()
+        for part in sorted(self.path.glob("part-*.parquet")):
+            table = self._pq.read_table(part, columns=["scenario", "replica"])
+            done.update(zip(table.column("scenario").to_pylist(), table.column("replica").to_pylist()))
+        return done
+
+    def write(self, records: List[Dict[str, Any]]) -> None:
+        self._buffer.extend(records)
+        if len(self._buffer) >= self.rows_per_file:
+            self._flush()
+
+    def _flush(self) -> None:
+        if not self._buffer:
+            return
+        table = self._pa.Table.from_pylist(self._buffer, schema=self.schema)
+        final = self.path / f"part-{self._next_part:05d}.parquet"
+        tmp = final.with_suffix(".tmp")
+        self._pq.write_table(table, tmp)
+        os.replace(tmp, final)
+        self._next_part += 1
+        self._buffer = []
+
+    def close(self) -> None:
+        self._flush()
+
+
+class BatchRunner:
+    """
+    Runs every (scenario, replica) pair of a scenario file on a process pool and streams one result
+    record per run to a JSONL file (or a directory of Parquet files) as soon as it finishes.
+
+    Each replica gets its own seed, derived from the scenario seed and the replica number, so a run
+    is reproducible on its own whatever the worker count or completion order. Only ``max_pending``
+    chunks are in flight at once, which bounds memory however many runs the file expands to.
+    Completed runs already present in the output are skipped, so an interrupted batch resumes by
+    running the same command again; with a ``checkpoint_dir``, long runs that were cut off also
+    continue from their last ``Simulation`` checkpoint instead of starting over.
+
+    Attributes:
+        scenarios (List[dict]): Normalised scenarios (see ``load_scenarios``).
+        output (Path): Output file (JSONL) or directory (Parquet).
+        output_format (str): 'jsonl' or 'parquet'.
+        workers (int): Worker processes; 0 or 1 runs everything in this process.
+        chunk_size (int): Replicas of one scenario run per task.
+        max_pending (int): Maximum number of tasks submitted but not yet written.
+        overwrite (bool): Discard existing output instead of resuming from it.
+        checkpoint_dir (Path | None): Directory for per-replica checkpoints of unfinished runs.
+        checkpoint_interval (float): Seconds between checkpoints of a run.
+        memory_budget (int | None): Bytes each run's trajectory may use (see ``Simulation``).
+        profile_memory (bool): Add the MEMORY_FIELDS of each run to its record.
+    """
+
+    def __init__(
+        self,
+        scenarios: List[Dict[str, Any]],
+        output: Union[str, Path],
+        workers: Optional[int] = None,
+        chunk_size: int = 1,
+        max_pending: Optional[int] = None,
+        output_format: Optional[str] = None,
+        overwrite: bool = False,
+        checkpoint_dir: Optional[Union[str, Path]] = None,
+        checkpoint_interval: float = 600.0,
+        memory_budget: Optional[int] = None,
+        profile_memory: bool = False
+    ) -> None:
+        """
+        Initialize the BatchRunner.
+
+        Args:
+            scenarios (List[dict]): Scenarios as returned by ``load_scenarios``.
+            output (str | Path): Output path; a '.parquet' suffix selects Parquet unless
+                output_format is given.
+            workers (int, optional): Worker processes. Defaults to the CPU count.
+            chunk_size (int): Replicas per task. Defaults to 1.
+            max_pending (int, optional): Tasks in flight. Defaults to four per worker.
+            output_format (str, optional): 'jsonl' or 'parquet'.
+            overwrite (bool): Start from scratch even if output exists. Defaults to False.
+            checkpoint_dir (str | Path, optional): Checkpoint runs here. Defaults to no checkpoints.
+            checkpoint_interval (float): Seconds between checkpoints. Defaults to 600.
+            memory_budget (int, optional): Trajectory memory budget of each run, in bytes; runs
+                over it record on a coarser time grid. Defaults to None (no budget).
+            profile_memory (bool): Trace each run's allocations and record its peak and retained
+                memory. Defaults to False.
+
+        Raises:
+            ValueError: If a count is not positive or the format is unknown.
+        """
+        self.output: Path = Path(output)
+        self.output_format: str = output_format or ("parquet" if self.output.suffix == ".parquet" else "jsonl")
+        if self.output_format not in ("jsonl", "parquet"):
+            raise ValueError(f"Unknown output format: {self.output_format}")
+        self.workers: int = (os.cpu_count() or 1) if workers is None else workers
+        if self.workers < 0:
+            raise ValueError("workers must be non-negative")
+        if chunk_size <= 0:
+            raise ValueError("chunk_size must be positive")
+        self.scenarios: List[Dict[str, Any]] = scenarios
+        self.chunk_size: int = chunk_size
+        self.max_pending: int = max_pending if max_pending is not None else 4 * max(self.workers, 1)
+        if self.max_pending <= 0:
+            raise ValueError("max_pending must be positive")
+        self.overwrite: bool = overwrite
+        self.checkpoint_dir: Optional[Path] = Path(checkpoint_dir) if checkpoint_dir is not None else None
+        self.checkpoint_interval: float = checkpoint_interval
+        self.memory_budget: Optional[int] = memory_budget
+        self.profile_memory: bool = profile_memory
+
+    def __str__(self) -> str:
+        return f"BatchRunner({len(self.scenarios)} scenarios -> {self.output})"
+
+    def __repr__(self) -> str:
+        return (
+            f"<BatchRunner(scenarios={len(self.scenarios)}, output={str(self.output)!r}, "
+            f"format={self.output_format!r}, workers={self.workers}, chunk_size={self.chunk_size}, "
+            f"max_pending={self.max_pending})>"
+        )
+
+    @staticmethod
+    def load_scenarios(path: Union[str, Path], replicas: int = 1, seed: int = 0) -> List[Dict[str, Any]]:
+        """
+        Read and validate a scenario file.
+
+        The file is a JSON list of scenarios, a JSON object with a 'scenarios' list (and optional
+        'defaults' applied to every scenario), or JSON lines with one scenario per line. A scenario
+        has 'units' (two regiment specs with 'size', 'stats', 'law' and optionally 'frontage') and
+        'time', either at the top level or under 'inputs' as in the ``test_cases`` files, and
+        optionally 'id' (or 'description'), 'replicas', 'front_width', 'seed' and 'events' (scheduled
+        reinforcements, withdrawals and stat changes, each with 'time', 'kind', 'side' and 'value' as
+        in ``Simulation.schedule_event``).
+
+        Args:
+            path (str | Path): Scenario file.
+            replicas (int): Replicas for scenarios that do not set their own. Defaults to 1.
+            seed (int): Base seed for scenarios that do not set their own. Defaults to 0.
+
+        Returns:
+            List[dict]: Scenarios with keys 'id', 'units', 'time', 'replicas' and 'seed'.
+
+        Raises:
+            ValueError: If a scenario is malformed or two scenarios share an id.
+        """
+        path = Path(path)
+        with open(path, encoding="utf-8") as f:
+            if path.suffix == ".jsonl":
+                entries, defaults = [json.loads(line) for line in f if line.strip()], {}
+            else:
+                data = json.load(f)
+                if isinstance(data, dict):
+                    entries, defaults = data.get("scenarios", []), data.get("defaults", {})
+                else:
+                    entries, defaults = data, {}
+
+        scenarios = []
+        seen = set()
+        for i, entry in enumerate(entries):
+            scenario = BatchRunner.parse_scenario({**defaults, **entry}, f"scenario-{i}", replicas, seed)
+            if scenario["id"] in seen:
+                raise ValueError(f"Duplicate scenario id: {scenario['id']!r}")
+            seen.add(scenario["id"])
+            scenarios.append(scenario)
+        return scenarios
+
+    @staticmethod
+    def parse_scenario(
+        entry: Dict[str, Any],
+        default_id: str = "scenario",
+        replicas: int = 1,
+        seed: int = 0
+    ) -> Dict[str, Any]:
+        """
+        Validate one scenario entry (see ``load_scenarios`` for the accepted keys).
+
+        Args:
+            entry (dict): Scenario as read from JSON.
+            default_id (str): Id if the entry has neither 'id' nor 'description'.
+            replicas (int): Replicas if the entry does not set them. Defaults to 1.
+            seed (int): Base seed if the entry does not set one. Defaults to 0.
+
+        Returns:
+            dict: Scenario with keys 'id', 'units', 'time', 'replicas', 'front_width', 'events' and
+                'seed'.
+
+        Raises:
+            ValueError: If the entry is malformed.
+        """
+        if not isinstance(entry, dict):
+            raise ValueError(f"Invalid scenario {default_id!r}: expected a JSON object")
+        entry = {**entry.get("inputs", {}), **entry}
+        scenario_id = str(entry.get("id", entry.get("description", default_id)))
+        try:
+            units = []
+            for unit in entry["units"]:
+                units.append({key: unit[key] for key in ("size", "stats", "law")})
+                if unit.get("frontage") is not None:
+                    units[-1]["frontage"] = unit["frontage"]
+            if len(units) != 2:
+                raise ValueError("a scenario needs exactly two units")
+            forces = tuple(
+                Regiment(unit["size"], unit["stats"], unit["law"], frontage=unit.get("frontage")) for unit in units
+            )
+            time = float(entry["time"])
+            front_width = entry.get("front_width")
+            if front_width is not None and (not isinstance(front_width, (int, float)) or front_width <= 0):
+                raise ValueError("front_width must be a positive number")
+            events = [{key: event[key] for key in ("time", "kind", "side", "value")} for event in entry.get("events", [])]
+            if events:
+                # validated by scheduling them on a throwaway simulation
+                sim = Simulation(forces)
+                for event in events:
+                    sim.schedule_event(event["time"], event["kind"], event["side"], event["value"])
+            n_replicas = int(entry.get("replicas", replicas))
+            if n_replicas <= 0:
+                raise ValueError("replicas must be positive")
+        except (KeyError, TypeError, ValueError, AttributeError) as e:
+            raise ValueError(f"Invalid scenario {scenario_id!r}: {e}") from e
+        return {
+            "id": scenario_id,
+            "units": units,
+            "time": time,
+            "replicas": n_replicas,
+            "front_width": front_width,
+            "events": events,
+            # unseeded scenarios still get a stable seed of their own, from the base seed and id
+            "seed": entry.get("seed", [seed, zlib.crc32(scenario_id.encode())]),
+        }
+
+    @staticmethod
+    def replica_seed(scenario: Dict[str, Any], replica: int) -> int:
+        """Seed of one replica, independent of every other replica."""
+        sequence = np.random.SeedSequence(scenario["seed"], spawn_key=(replica,))
+        return int(sequence.generate_state(1, np.uint64)[0])
+
+    @staticmethod
+    def checkpoint_path(checkpoint_dir: Path, scenario: Dict[str, Any], replica: int) -> Path:
+        """Checkpoint file of one replica (scenario ids are hashed, as they may be any string)."""
+        digest = hashlib.sha1(scenario["id"].encode()).hexdigest()[:16]
+        return checkpoint_dir / f"{digest}-{replica}.npz"
+
+    @staticmethod
+    def build_simulation(
+        scenario: Dict[str, Any],
+        seed: Optional[Union[int, Sequence[int], np.random.SeedSequence, np.random.Generator]] = None,
+        memory_budget: Optional[int] = None
+    ) -> Simulation:
+        """New Simulation of a scenario (fresh regiments, scheduled events), not yet run."""
+        forces = tuple(
+            Regiment(u["size"], u["stats"], u["law"], frontage=u.get("frontage")) for u in scenario["units"]
+        )
+        sim = Simulation(forces, seed=seed, front_width=scenario.get("front_width"), memory_budget=memory_budget)
+        for event in scenario.get("events", []):
+            sim.schedule_event(event["time"], event["kind"], event["side"], event["value"])
+        return sim
+
+    @staticmethod
+    def run_replica(
+        scenario: Dict[str, Any],
+        replica: int,
+        checkpoint_dir: Optional[Path] = None,
+        checkpoint_interval: float = 600.0,
+        memory_budget: Optional[int] = None,
+        profile_memory: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Run one replica of a scenario, resuming it from its checkpoint if checkpoint_dir has one.
+        The checkpoint is removed once the run is finished.
+
+        Returns:
+            dict: Result record with the fields in RESULT_FIELDS. 'outcome' is 'wipeout', 'rout'
+                (morale at the minimum) or 'time' (time limit reached); 'winner' is the surviving
+                side (1 or 2), or 0 if the battle was not decided. With profile_memory, also the
+                MEMORY_FIELDS: the peak and retained bytes of the run's largest phase and the
+                number of trajectory rows kept.
+        """
+        seed = BatchRunner.replica_seed(scenario, replica)
+        checkpoint = None
+        if checkpoint_dir is not None:
+            checkpoint = BatchRunner.checkpoint_path(checkpoint_dir, scenario, replica)
+            checkpoint_dir.mkdir(parents=True, exist_ok=True)
+        if checkpoint is not None and checkpoint.exists():
+            sim = Simulation.resume(checkpoint)
+        else:
+            sim = BatchRunner.build_simulation(scenario, seed, memory_budget)
+        sim.run_simulation(
+            time=scenario["time"], checkpoint_path=checkpoint, checkpoint_interval=checkpoint_interval,
+            profile_memory=profile_memory
+        )
+        if checkpoint is not None:
+            # a rerun after this point repeats the (seeded) run from the start, with the same result
+            checkpoint.unlink()
+
+        sizes = [sim.forces[0].size, sim.forces[1].size]
+        morale = sim.casualties['morale'].tolist()
+        outcome, winner = BatchRunner.outcome(sim)
+        record = {
+            "scenario": scenario["id"],
+            "replica": replica,
+            "seed": seed,
+            "end_time": float(sim._trajectory['time'][-1]),
+            "events": sim.n_events,
+            "size_1": int(sizes[0]),
+            "size_2": int(sizes[1]),
+            "morale_1": float(morale[0]),
+            "morale_2": float(morale[1]),
+            "outcome": outcome,
+            "winner": winner,
+        }
+        if profile_memory:
+            record["peak_memory"] = max(phase["peak"] for phase in sim.memory_profile.values())
+            record["retained_memory"] = max(phase["retained"] for phase in sim.memory_profile.values())
+            record["trajectory_rows"] = len(sim._trajectory['time'])
+        return record
+
+    @staticmethod
+    def outcome(sim: Simulation) -> Tuple[str, int]:
+        """
+        Outcome of a simulation in its current state.
+
+        Returns:
+            tuple: 'wipeout', 'rout' (morale at the minimum) or 'time' (not decided yet), and the
+                surviving side (1 or 2), or 0 if the battle is not decided.
+        """
+        sizes = [sim.forces[0].size, sim.forces[1].size]
+        morale = sim.casualties['morale'].tolist()
+        if sim._wiped_out():
+            # a side with no men but reinforcements on the way has not lost yet
+            outcome, standing = "wipeout", [s > 0 for s in sizes]
+        elif min(morale) <= 10:
+            outcome, standing = "rout", [m > 10 for m in morale]
+        else:
+            outcome, standing = "time", [True, True]
+        return outcome, standing.index(True) + 1 if standing.count(True) == 1 else 0
+
+    @staticmethod
+    def _run_chunk(
+        scenario: Dict[str, Any],
+        replicas: List[int],
+        checkpoint_dir: Optional[Path] = None,
+        checkpoint_interval: float = 600.0,
+        memory_budget: Optional[int] = None,
+        profile_memory: bool = False
+    ) -> List[Dict[str, Any]]:
+        return [
+            BatchRunner.run_replica(scenario, replica, checkpoint_dir, checkpoint_interval, memory_budget, profile_memory)
+            for replica in replicas
+        ]
+
+    def tasks(self, done: Set[TaskKey]) -> Iterator[Tuple[Dict[str, Any], List[int]]]:
+        """Yield (scenario, replicas) chunks of the runs not in done, lazily."""
+        for scenario in self.scenarios:
+            pending = [r for r in range(scenario["replicas"]) if (scenario["id"], r) not in done]
+            for start in range(0, len(pending), self.chunk_size):
+                yield scenario, pending[start:start + self.chunk_size]
+
+    def run(self) -> Dict[str, int]:
+        """
+        Run all outstanding replicas and write their results.
+
+        Returns:
+            dict: 'total' runs in the scenario file, 'skipped' (already in the output) and
+                'completed'; with profile_memory, also the highest 'peak_memory' of a completed run.
+        """
+        if self.output_format == "parquet":
+            writer = _ParquetWriter(self.output, self.overwrite)
+        else:
+            writer = _JsonlWriter(self.output, self.overwrite)
+        done = writer.completed()
+        if self.overwrite and self.checkpoint_dir is not None:
+            for stale in self.checkpoint_dir.glob("*.npz"):
+                stale.unlink()
+        total = sum(s["replicas"] for s in self.scenarios)
+        skipped = sum(1 for s in self.scenarios for r in range(s["replicas"]) if (s["id"], r) in done)
+        logger.info(f"{self}: {total} runs, {skipped} already done, {self.workers} workers")
+
+        completed = 0
+        peak_memory = 0
+        tasks = self.tasks(done)
+        try:
+            if self.workers <= 1:
+                for scenario, replicas in tasks:
+                    records = self._run_chunk(
+                        scenario, replicas, self.checkpoint_dir, self.checkpoint_interval,
+                        self.memory_budget, self.profile_memory,
+                    )
+                    writer.write(records)
+                    completed += len(records)
+                    peak_memory = max([peak_memory] + [r.get("peak_memory", 0) for r in records])
+            else:
+                with ProcessPoolExecutor(max_workers=self.workers) as pool:
+                    pending: Set[Future] = set()
+                    try:
+                        while True:
+                            # back-pressure: only top up to max_pending tasks in flight
+                            for scenario, replicas in tasks:
+                                pending.add(pool.submit(
+                                    BatchRunner._run_chunk, scenario, replicas,
+                                    self.checkpoint_dir, self.checkpoint_interval,
+                                    self.memory_budget, self.profile_memory,
+                                ))
+                                if len(pending) >= self.max_pending:
+                                    break
+                            if not pending:
+                                break
+                            finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                            records = [record for future in finished for record in future.result()]
+                            writer.write(records)
+                            completed += len(records)
+                            peak_memory = max([peak_memory] + [r.get("peak_memory", 0) for r in records])
+                            logger.info(f"{skipped + completed}/{total} runs done")
+                    except BaseException:
+                        for future in pending:
+                            future.cancel()
+                        raise
+        finally:
+            writer.close()
+        summary = {"total": total, "skipped": skipped, "completed": completed}
+        if self.profile_memory:
+            summary["peak_memory"] = peak_memory
+        return summary
+
+
+if __name__ == "__main__":
+    import tempfile
+
+    scenarios_path = Path(__file__).resolve().parents[3] / "test_cases" / "battle_simulation_basic.json"
+    scenarios = BatchRunner.load_scenarios(scenarios_path, replicas=4)
+    with tempfile.TemporaryDirectory() as tmp:
+        runner = BatchRunner(scenarios, Path(tmp) / "results.jsonl", workers=2)
+        print(runner.run())
+        print((Path(tmp) / "results.jsonl").read_text().splitlines()[0])
@@ -0,0 +1,466 @@
+"""
+Campaign turns: many concurrent battles on one map, advanced together in simulated-time order.
+"""
+
+# base libs
+from concurrent.futures import ProcessPoolExecutor
+from time import perf_counter
+from typing import Any, Dict, List, Optional, Tuple, Union
+import heapq
+import logging
+import os
+import zlib
+
+# ext libs
+import numpy as np
+
+# local imports
+from imperial_generals.units import Regiment
+from imperial_generals.battles.Simulation import Simulation
+from imperial_generals.battles.BatchRunner import BatchRunner
+
+# Inherit logging configuration from the main application
+logger = logging.getLogger(__name__)
+
+# Kinds of campaign events, in the order they are applied when due at the same time
+CAMPAIGN_EVENT_KINDS = ("start", "join", "end")
+
+# Battles resident in this worker process, by id, with the trajectory rows and recording interval
+# the scheduler last received (see CampaignScheduler._advance_resident)
+_RESIDENT: Dict[str, Simulation] = {}
+_SYNCED: Dict[str, Tuple[int, Optional[float]]] = {}
+
+# Columns of a finished battle's result record
+CAMPAIGN_RESULT_FIELDS = (
+    "battle", "start", "end", "events", "size_1", "size_2", "morale_1", "morale_2", "outcome", "winner",
+)
+
+
+class CampaignScheduler:
+    """
+    Runs the battles of a campaign turn against one global clock.
+
+    Campaign events (battles starting, armies joining a battle, battles called off) sit in a
+    priority queue ordered by campaign time and are applied in that order, so battles start, grow
+    and end mid-turn in simulated-time order. Battles are independent between their own events: a
+    join or end event only brings the battle it concerns up to the event's time, and ``run``
+    advances every active battle to its end time in one round. A battle's own clock starts at zero
+    when it starts; battles ending by wipeout or rout are retired after the round they end in.
+
+    With several workers, each battle stays resident in the worker process it was first sent to
+    (the one with the fewest active battles), so a round only sends the workers the battles' new
+    reinforcements and receives their state and the trajectory rows added since the last round;
+    ``battles`` holds an up-to-date copy of each one.
+
+    Attributes:
+        time (float): Campaign time of the last event applied or of the end of the last ``run``;
+            active battles are at this time once ``run`` returns.
+        workers (int): Worker processes; 0 or 1 runs every battle in this process.
+        seed (int): Base seed of battles started without their own.
+        battles (Dict[str, Simulation]): Every started battle, active or finished.
+        results (Dict[str, dict]): Result record of every finished battle (CAMPAIGN_RESULT_FIELDS).
+        engine_time (Dict[str, float]): Seconds spent in ``run_simulation`` per battle.
+        memory_budget (int | None): Bytes each battle's trajectory may use (see ``Simulation``).
+    """
+
+    def __init__(self, workers: Optional[int] = None, seed: int = 0, memory_budget: Optional[int] = None) -> None:
+        """
+        Initialize the CampaignScheduler.
+
+        Args:
+            workers (int, optional): Worker processes. Defaults to the CPU count.
+            seed (int): Base seed of battles started without their own. Defaults to 0.
+            memory_budget (int, optional): Trajectory memory budget of each battle, in bytes;
+                battles over it record on a coarser time grid. Defaults to None (no budget).
+
+        Raises:
+            ValueError: If workers is negative.
+        """
+        self.workers: int = (os.cpu_count() or 1) if workers is None else workers
+        if self.workers < 0:
+            raise ValueError("workers must be non-negative")
+        self.seed: int = seed
+        self.memory_budget: Optional[int] = memory_budget
+        self.time: float = 0.0
+        self.battles: Dict[str, Simulation] = {}
+        self.results: Dict[str, Dict[str, Any]] = {}
+        self.engine_time: Dict[str, float] = {}
+
+        # (time, kind order, sequence, kind, battle id, payload)
+        self._queue: List[Tuple[float, int, int, str, str, Any]] = []
+        self._sequence: int = 0
+        self._ids: set = set()
+        self._start: Dict[str, float] = {}
+        self._active: List[str] = []
+        self._rounds: int = 0
+        self._wall_time: float = 0.0
+        # one single-process pool per worker, so a battle always runs in the same process
+        self._pools: List[ProcessPoolExecutor] = []
+        self._worker: Dict[str, int] = {} # battle id -> worker it is resident in
+        self._resident: set = set()
+        self._retired: Dict[int, List[str]] = {} # worker -> battles to drop on its next round
+        self._reinforcements: Dict[str, List[Tuple[float, int, int]]] = {} # not yet sent to the worker
+        self._reached: Dict[str, float] = {} # campaign time each active battle was advanced to
+
+    def __str__(self) -> str:
+        return (
+            f"CampaignScheduler(time={self.time}, active={len(self._active)}, "
+            f"finished={len(self.results)}, queued={len(self._queue)})"
+        )
+
+    def __repr__(self) -> str:
+        return f"CampaignScheduler(workers={self.workers}, seed={self.seed}, time={self.time})"
+
+    def __enter__(self) -> "CampaignScheduler":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Shut down the workers (a later ``run`` starts new ones and sends them the active battles)."""
+        for pool in self._pools:
+            pool.shutdown()
+        self._pools = []
+        self._worker = {}
+        self._resident = set()
+        self._retired = {}
+
+    @property
+    def active(self) -> List[str]:
+        """Ids of the battles started and not yet finished."""
+        return list(self._active)
+
+    def _push(self, time: Optional[float], kind: str, battle_id: str, payload: Any) -> None:
+        time = self.time if time is None else float(time)
+        if time < self.time:
+            raise ValueError(f"cannot schedule a {kind} event at {time} before the campaign time {self.time}")
+        heapq.heappush(self._queue, (time, CAMPAIGN_EVENT_KINDS.index(kind), self._sequence, kind, battle_id, payload))
+        self._sequence += 1
+
+    def start_battle(
+        self,
+        battle_id: str,
+        forces: Tuple[Regiment, Regiment],
+        time: Optional[float] = None,
+        front_width: Optional[float] = None,
+        seed: Optional[Union[int, List[int]]] = None
+    ) -> None:
+        """
+        Schedule a battle between two regiments.
+
+        Args:
+            battle_id (str): Unique id of the battle.
+            forces (Tuple[Regiment, Regiment]): The two opposing regiments.
+            time (float, optional): Campaign time the battle starts. Defaults to the current time.
+            front_width (float, optional): Maximum width of the front.
+            seed (int | list, optional): Seed of the battle. Defaults to one derived from the
+                scheduler's seed and the battle id, so results do not depend on the worker count.
+
+        Raises:
+            ValueError: If the id is taken, the forces are invalid or the time is in the past.
+        """
+        if battle_id in self._ids:
+            raise ValueError(f"Duplicate battle id: {battle_id!r}")
+        if seed is None:
+            seed = [self.seed, zlib.crc32(battle_id.encode())]
+        sim = Simulation(forces, seed=seed, front_width=front_width, memory_budget=self.memory_budget)
+        self._push(time, "start", battle_id, sim)
+        self._ids.add(battle_id)
+
+    def join_battle(
+        self, battle_id: str, side: int, regiment: Union[Regiment, int], time: Optional[float] = None
+    ) -> None:
+        """
+        Schedule an army joining one side of a battle.
+
+        The joining men reinforce that side's regiment (a Simulation has one regiment per side), so
+        they fight with its stats.
+
+        Args:
+            battle_id (str): Battle to join.
+            side (int): 0 for the battle's first regiment, 1 for the second.
+            regiment (Regiment | int): Joining regiment, or a number of men.
+            time (float, optional): Campaign time of arrival. Defaults to the current time.
+
+        Raises:
+            ValueError: If the battle is unknown, the side is invalid or the time is in the past.
+        """
+        if battle_id not in self._ids:
+            raise ValueError(f"Unknown battle: {battle_id!r}")
+        if side not in (0, 1):
+            raise ValueError("side must be 0 or 1.")
+        size = regiment.size if isinstance(regiment, Regiment) else regiment
+        if not isinstance(size, int) or size < 0:
+            raise ValueError("regiment must be a Regiment or a non-negative number of men.")
+        self._push(time, "join", battle_id, (side, size))
+
+    def end_battle(self, battle_id: str, time: Optional[float] = None) -> None:
+        """
+        Schedule a battle to be called off (e.g. one side disengages on orders).
+
+        Args:
+            battle_id (str): Battle to end.
+            time (float, optional): Campaign time. Defaults to the current time.
+
+        Raises:
+            ValueError: If the battle is unknown or the time is in the past.
+        """
+        if battle_id not in self._ids:
+            raise ValueError(f"Unknown battle: {battle_id!r}")
+        self._push(time, "end", battle_id, None)
+
+    def run(self, until: float) -> Dict[str, Dict[str, Any]]:
+        """
+        Advance the campaign to `until`, applying the queued events in time order. Call it again
+        with a later time to continue (e.g. once per campaign tick).
+
+        Args:
+            until (float): Campaign time to advance to.
+
+        Returns:
+            dict: Result records of all battles finished so far, by battle id.
+
+        Raises:
+            ValueError: If `until` is before the current campaign time.
+        """
+        if until < self.time:
+            raise ValueError(f"cannot run until {until}, before the campaign time {self.time}")
+        started = perf_counter()
+        while self._queue and self._queue[0][0] <= until:
+            event = heapq.heappop(self._queue)
+            event_time, kind, battle_id = event[0], event[3], event[4]
+            if kind != "start" and battle_id in self._active:
+                # only the battle the event concerns has to be at the event's time
+                self._advance_to(event_time, [battle_id])
+            self.time = max(self.time, event_time)
+            self._apply(event)
+        self._advance_to(until, self._active)
+        self.time = until
+        self._wall_time += perf_counter() - started
+        return self.results
+
+    def report(self) -> Dict[str, Any]:
+        """
+        How engine time is split across battles.
+
+        Returns:
+            dict: Campaign 'time', 'rounds' of advancing, 'wall_time' spent in ``run``, total
+                'engine_time' across workers (engine_time / wall_time is the effective parallelism)
+                and per battle (most expensive first) its 'engine_time', 'share' of the total,
+                'events' simulated and whether it is still 'active'.
+        """
+        total = sum(self.engine_time.values())
+        battles = {
+            battle_id: {
+                "engine_time": seconds,
+                "share": seconds / total if total else 0.0,
+                "events": self.battles[battle_id].n_events,
+                "active": battle_id in self._active,
+            }
+            for battle_id, seconds in sorted(self.engine_time.items(), key=lambda item: -item[1])
+        }
+        return {
+            "time": self.time,
+            "rounds": self._rounds,
+            "wall_time": self._wall_time,
+            "engine_time": total,
+            "battles": battles,
+        }
+
+    def _apply(self, event: Tuple[float, int, int, str, str, Any]) -> None:
+        time, _, _, kind, battle_id, payload = event
+        if kind == "start":
+            self.battles[battle_id] = payload
+            self.engine_time[battle_id] = 0.0
+            self._start[battle_id] = time
+            self._reached[battle_id] = time
+            self._active.append(battle_id)
+            logger.info(f"Battle {battle_id!r} started at {time:.4f}")
+        elif battle_id not in self._active:
+            logger.warning(f"Ignoring {kind} event at {time:.4f}: battle {battle_id!r} is not active")
+        elif kind == "join":
+            side, size = payload
+            sim = self.battles[battle_id]
+            # the battle's last step may have run a little past the campaign time
+            local_time = max(time - self._start[battle_id], sim._trajectory['time'][-1])
+            sim.schedule_event(local_time, "reinforce", side, size)
+            if battle_id in self._resident:
+                self._reinforcements.setdefault(battle_id, []).append((local_time, side, size))
+        else:
+            self._finish(battle_id, called_off=True)
+
+    def _advance_to(self, time: float, battle_ids: List[str]) -> None:
+        """Run the given battles up to campaign time `time` in one round and retire the ones that ended."""
+        battle_ids = [battle_id for battle_id in battle_ids if self._reached[battle_id] < time]
+        if not battle_ids:
+            return
+        if self.workers > 1:
+            results = self._advance_in_workers(time, battle_ids)
+        else:
+            results = CampaignScheduler._advance(
+                [(battle_id, self.battles[battle_id], time - self._start[battle_id]) for battle_id in battle_ids]
+            )
+        for battle_id, seconds in results:
+            self.engine_time[battle_id] += seconds
+            self._reached[battle_id] = time
+        for battle_id in [b for b in battle_ids if BatchRunner.outcome(self.battles[b])[0] != "time"]:
+            self._finish(battle_id)
+        self._rounds += 1
+
+    @staticmethod
+    def _advance(tasks: List[Tuple[str, Simulation, float]]) -> List[Tuple[str, float]]:
+        """Run each battle to its own time, in this process, and time it."""
+        results = []
+        for battle_id, sim, time in tasks:
+            started = perf_counter()
+            sim.run_simulation(time=time)
+            results.append((battle_id, perf_counter() - started))
+        return results
+
+    def _advance_in_workers(self, time: float, battle_ids: List[str]) -> List[Tuple[str, float]]:
+        """Advance resident battles in their workers and update their copies here."""
+        if not self._pools:
+            self._pools = [ProcessPoolExecutor(max_workers=1) for _ in range(self.workers)]
+        load = [0] * self.workers
+        for battle_id in self._active:
+            if battle_id in self._worker:
+                load[self._worker[battle_id]] += 1
+
+        jobs: Dict[int, Tuple[list, list]] = {}
+        for battle_id in battle_ids:
+            if battle_id not in self._worker:
+                self._worker[battle_id] = worker = load.index(min(load))
+                load[worker] += 1
+            new, tasks = jobs.setdefault(self._worker[battle_id], ([], []))
+            if battle_id not in self._resident:
+                sim = self.battles[battle_id]
+                # the rate functions are closures, which do not pickle; they are rebuilt on the next run
+                sim.rate_funcs = None
+                sim._sim_output = None
+                new.append((battle_id, sim))
+                self._resident.add(battle_id)
+            tasks.append((battle_id, time - self._start[battle_id], self._reinforcements.pop(battle_id, [])))
+
+        futures = [
+            self._pools[worker].submit(CampaignScheduler._advance_resident, new, tasks, self._retired.pop(worker, []))
+            for worker, (new, tasks) in jobs.items()
+        ]
+        results = []
+        for future in futures:
+            for battle_id, seconds, state in future.result():
+                CampaignScheduler._load_state(self.battles[battle_id], state)
+                results.append((battle_id, seconds))
+        return results
+
+    @staticmethod
+    def _advance_resident(
+        new: List[Tuple[str, Simulation]],
+        tasks: List[Tuple[str, float, List[Tuple[float, int, int]]]],
+        retired: List[str]
+    ) -> List[Tuple[str, float, Dict[str, Any]]]:
+        """
+        Worker side of a round: keep the new battles, drop the retired ones, schedule the new
+        reinforcements and run each battle to its time.
+
+        Returns:
+            list: (battle id, seconds, state) per task, the state as in ``_load_state``.
+        """
+        for battle_id in retired:
+            _RESIDENT.pop(battle_id, None)
+            _SYNCED.pop(battle_id, None)
+        for battle_id, sim in new:
+            _RESIDENT[battle_id] = sim
+            _SYNCED[battle_id] = (len(sim._trajectory['time']), sim.record_interval)
+
+        results = []
+        for battle_id, time, reinforcements in tasks:
+            sim = _RESIDENT[battle_id]
+            for local_time, side, size in reinforcements:
+                sim.schedule_event(local_time, "reinforce", side, size)
+            started = perf_counter()
+            sim.run_simulation(time=time)
+            seconds = perf_counter() - started
+
+            rows, interval = _SYNCED[battle_id]
+            # the last row sent may since have been overwritten, and coarsening rewrites them all
+            since = max(rows - 1, 0) if sim.record_interval == interval else 0
+            _SYNCED[battle_id] = (len(sim._trajectory['time']), sim.record_interval)
+            state = {
+                'regiments': [(reg.size, reg.stats, reg.coef, reg.raw_morale) for reg in sim.forces],
+                'initial_size': list(sim.casualties['initial_size']),
+                'losses': sim.casualties['losses'],
+                'morale': sim.casualties['morale'],
+                'rng': sim.rng.bit_generator.state,
+                'events': list(sim.events),
+                'event_seq': sim._event_seq,
+                'pending_reinforcements': list(sim._pending_reinforcements),
+                'n_events': sim.n_events,
+                'record_interval': sim.record_interval,
+                'end_time': sim._end_time,
+                'since': since,
+                # arrays pickle far faster than lists of scalars
+                'rows': {name: np.asarray(values[since:]) for name, values in sim._trajectory.items()},
+            }
+            results.append((battle_id, seconds, state))
+        return results
+
+    @staticmethod
+    def _load_state(sim: Simulation, state: Dict[str, Any]) -> None:
+        """Bring the scheduler's copy of a battle up to date with its state in a worker."""
+        for reg, (size, stats, coef, raw_morale) in zip(sim.forces, state['regiments']):
+            reg.size, reg.stats, reg.coef, reg.raw_morale = size, stats, coef, raw_morale
+        sim.casualties['initial_size'] = state['initial_size']
+        sim.casualties['losses'] = state['losses']
+        sim.casualties['morale'] = state['morale']
+        sim.rng.bit_generator.state = state['rng']
+        sim.events = state['events']
+        sim._event_seq = state['event_seq']
+        sim._pending_reinforcements = state['pending_reinforcements']
+        sim.n_events = state['n_events']
+        sim.record_interval = state['record_interval']
+        sim._end_time = state['end_time']
+        for name, values in state['rows'].items():
+            sim._trajectory[name][state['since']:] = values.tolist()
+        sim._sim_output = None
+
+    def _finish(self, battle_id: str, called_off: bool = False) -> None:
+        sim = self.battles[battle_id]
+        outcome, winner = BatchRunner.outcome(sim)
+        if called_off and outcome == "time":
+            outcome = "called_off"
+        self._active.remove(battle_id)
+        self._reached.pop(battle_id, None)
+        self._reinforcements.pop(battle_id, None)
+        if battle_id in self._resident:
+            self._resident.discard(battle_id)
+            self._retired.setdefault(self._worker.pop(battle_id), []).append(battle_id)
+        self.results[battle_id] = {
+            "battle": battle_id,
+            "start": self._start[battle_id],
+            "end": self._start[battle_id] + float(sim._trajectory['time'][-1]),
+            "events": sim.n_events,
+            "size_1": int(sim.forces[0].size),
+            "size_2": int(sim.forces[1].size),
+            "morale_1": float(sim.casualties['morale'][0]),
+            "morale_2": float(sim.casualties['morale'][1]),
+            "outcome": outcome,
+            "winner": winner,
+        }
+        logger.info(f"Battle {battle_id!r} ended ({outcome}) at {self.results[battle_id]['end']:.4f}")
+
+
+if __name__ == "__main__":
+    with CampaignScheduler(workers=2, seed=7) as campaign:
+        for i in range(6):
+            campaign.start_battle(
+                f"battle-{i}", (Regiment(400 + 100 * i, "4/5/2/1", "sq"), Regiment(500, "3/6/1/0", "sq")), time=0.01 * i
+            )
+        campaign.join_battle("battle-0", 1, Regiment(300, "3/6/1/0", "sq"), time=0.02)
+        campaign.end_battle("battle-5", time=0.08)
+        for result in campaign.run(until=0.1).values():
+            print(result)
+        report = campaign.report()
+        print(f"{report['engine_time']:.3f}s engine time in {report['wall_time']:.3f}s over {report['rounds']} rounds")
+        for battle_id, share in report["battles"].items():
+            print(f"  {battle_id}: {share['share']:.0%} ({share['events']} events)")
@@ -0,0 +1,352 @@
+"""
+Engine selection: picks the cheapest simulation engine meeting an accuracy target for a matchup.
+"""
+
+# base libs
+from statistics import NormalDist
+from time import perf_counter
+from typing import Any, Dict, List, Optional
+import logging
+import math
+
+# ext libs
+import numpy as np
+
+# local imports
+from imperial_generals.battles.BatchRunner import BatchRunner
+
+# Inherit logging configuration from the main application
+logger = logging.getLogger(__name__)
+
+# Requested outputs: one sample path, the distribution of outcomes, or expected outcomes
+OUTPUT_TYPES = ("path", "distribution", "expectation")
+
+# Outputs each engine can produce: the exact event simulation (Simulation) and the deterministic
+# mean-field integration of the same rates and morale rules
+ENGINE_OUTPUTS = {
+    "exact": OUTPUT_TYPES,
+    "mean_field": ("expectation",),
+}
+
+# Outcome fields summarised by the distribution and expectation outputs
+OUTCOME_FIELDS = ("end_time", "size_1", "size_2", "morale_1", "morale_2")
+
+# Cost model, in seconds: per event and per replica of the exact engine, per mean-field step
+EXACT_EVENT_SECONDS = 25e-6
+EXACT_RUN_SECONDS = 2e-4
+MEAN_FIELD_STEP_SECONDS = 30e-6
+
+# Expected events per mean-field step, as a fraction of the smaller side (at least one event)
+MEAN_FIELD_STEP_FRACTION = 0.002
+
+# A side ending within this many standard deviations of annihilation makes a battle decisive:
+# who is wiped out, and when, then depends on the noise the mean-field leaves out
+DECISIVE_SIGMAS = 3.0
+
+
+class EnginePlanner:
+    """
+    Chooses how to simulate a matchup from its estimated event count and the requested output.
+
+    A deterministic mean-field pass (the Lanchester rates and morale rules of ``Simulation``
+    integrated with expected casualties instead of sampled ones) costs a few hundred steps however
+    large the forces are. It gives the expected number of casualty events, and the Poisson spread
+    of each side's losses (the square root of the expected losses) estimates how noisy one exact
+    replica is. From these the planner prices every engine able to produce the output:
+
+    - 'path': one exact replica (any sample path is exact).
+    - 'distribution': exact replicas, as many as the Dvoretzky-Kiefer-Wolfowitz bound needs for
+      the empirical distributions to be within `accuracy` of the true ones.
+    - 'expectation': exact replicas until the confidence interval of each mean is within
+      `accuracy` of the initial size (of the time limit for the duration), or the mean-field pass
+      itself, whose error is taken to be the spread of one replica. Decisive battles, where a
+      side ends near annihilation, are left to the exact engine, and their outcomes, bounded
+      fractions, are assumed to have the largest possible standard deviation (0.5).
+
+    The cheapest engine whose estimated error meets the target is used; if none does within
+    `max_replicas`, the most accurate one is. The plan is returned with the result.
+
+    Attributes:
+        accuracy (float): Default accuracy target, as a fraction (of initial sizes for
+            expectations, of probability for distributions).
+        confidence (float): Confidence level of the error bounds.
+        max_replicas (int): Most exact replicas a plan may use.
+    """
+
+    def __init__(self, accuracy: float = 0.05, confidence: float = 0.95, max_replicas: int = 10_000) -> None:
+        """
+        Initialize the EnginePlanner.
+
+        Args:
+            accuracy (float): Default accuracy target. Defaults to 0.05.
+            confidence (float): Confidence level of the error bounds. Defaults to 0.95.
+            max_replicas (int): Most exact replicas per plan. Defaults to 10000.
+
+        Raises:
+            ValueError: If accuracy or confidence is not in (0, 1) or max_replicas is not positive.
+        """
+        if not 0 < accuracy < 1:
+            raise ValueError("accuracy must be between 0 and 1")
+        if not 0 < confidence < 1:
+            raise ValueError("confidence must be between 0 and 1")
+        if max_replicas <= 0:
+            raise ValueError("max_replicas must be positive")
+        self.accuracy: float = accuracy
+        self.confidence: float = confidence
+        self.max_replicas: int = max_replicas
+
+    def __str__(self) -> str:
+        return f"EnginePlanner(accuracy={self.accuracy}, confidence={self.confidence})"
+
+    def __repr__(self) -> str:
+        return (
+            f"EnginePlanner(accuracy={self.accuracy!r}, confidence={self.confidence!r}, "
+            f"max_replicas={self.max_replicas!r})"
+        )
+
+    @staticmethod
+    def mean_field(scenario: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Integrate a scenario deterministically: each step removes the expected casualties of about
+        MEAN_FIELD_STEP_FRACTION of the smaller side, and applies the per-event morale change of
+        ``update_morale_losses`` once per expected event. Scheduled events are applied on time.
+
+        Args:
+            scenario (dict): Normalised scenario (see ``BatchRunner.parse_scenario``).
+
+        Returns:
+            dict: The expected outcome: 'end_time', 'size_1', 'size_2', 'morale_1', 'morale_2'
+                (floats), 'winner' (as in ``BatchRunner.outcome``), plus 'events' (expected casualty
+                events), 'losses' (per side) and 'steps'.
+        """
+        sim = BatchRunner.build_simulation(scenario)
+        sim.build_lanch_diffeq()
+        reg1, reg2 = sim.forces
+        sizes = np.array([reg1.size, reg2.size], dtype=float)
+        sim.casualties['losses'] = np.zeros(2)
+        horizon = scenario["time"]
+        t, events, steps = 0.0, 0.0, 0
+
+        while t < horizon:
+            if sim.events and sim.events[0][0] <= t:
+                # scheduled events act on the regiments, whose sizes follow the float ones here
+                reg1.update_size(sizes[0])
+                reg2.update_size(sizes[1])
+                sim._apply_next_event()
+                sizes = np.array([reg1.size, reg2.size], dtype=float)
+                continue
+            coef = [reg1.coef, reg2.coef]
+            rates = np.abs([sim.rate_funcs[i](sizes.tolist(), coef, i) for i in (0, 1)])
+            total = rates.sum()
+            next_event = sim.events[0][0] if sim.events else horizon
+            if total <= 0:
+                t = next_event
+                continue
+            step_events = max(1.0, MEAN_FIELD_STEP_FRACTION * sizes.min())
+            dt = min(step_events / total, next_event - t)
+            lost = np.minimum(rates * dt, sizes)
+            n = total * dt
+
+            # the morale rules see the losses halfway through the step
+            before = sim.casualties['morale'].copy()
+            sim.casualties['losses'] = sim.casualties['losses'] + lost / 2
+            t += dt
+            sizes = sizes - lost
+            sim.update_morale_losses(horizon - t)
+            change = sim.casualties['morale'] - before
+            sim.casualties['losses'] = sim.casualties['losses'] + lost / 2
+            sim.casualties['morale'] = np.clip(before + change * n, 10, 100)
+            for side in (0, 1):
+                sim.forces[side].update_raw_morale(float(sim.casualties['morale'][side]))
+            events += n
+            steps += 1
+
+            if np.any(sizes < 0.5) or np.any(sim.casualties['morale'] <= 10):
+                break
+
+        sizes = np.where(sizes < 0.5, 0.0, sizes)
+        reg1.update_size(int(round(sizes[0])))
+        reg2.update_size(int(round(sizes[1])))
+        outcome, winner = BatchRunner.outcome(sim)
+        return {
+            "end_time": float(min(t, horizon)),
+            "size_1": float(sizes[0]),
+            "size_2": float(sizes[1]),
+            "morale_1": float(sim.casualties['morale'][0]),
+            "morale_2": float(sim.casualties['morale'][1]),
+            "outcome": outcome,
+            "winner": winner,
+            "events": events,
+            "losses": sim.casualties['losses'].tolist(),
+            "steps": steps,
+            "initial_size": list(sim.casualties['initial_size']),
+        }
+
+    def estimate(self, scenario: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Estimate the work and noise of a scenario from its mean-field pass.
+
+        Returns:
+            dict: 'events' (expected events of one exact replica, scheduled events included),
+                'spread' (standard deviation of one replica's outcome, as a fraction),
+                'decisive' (a side ends near annihilation) and 'mean_field' (the pass itself).
+        """
+        expected = self.mean_field(scenario)
+        sigmas = np.sqrt(expected["losses"])
+        final = np.array([expected["size_1"], expected["size_2"]])
+        decisive = bool(np.any(final < DECISIVE_SIGMAS * sigmas) and np.any(sigmas > 0))
+        spread = 0.5 if decisive else float(np.max(sigmas / np.maximum(expected["initial_size"], 1)))
+        return {
+            "events": expected["events"] + len(scenario.get("events", [])),
+            "spread": spread,
+            "decisive": decisive,
+            "mean_field": expected,
+        }
+
+    def candidates(self, estimate: Dict[str, Any], output: str, accuracy: float) -> List[Dict[str, Any]]:
+        """
+        Price every engine able to produce an output.
+
+        Returns:
+            List[dict]: One entry per engine with 'engine', 'replicas', 'seconds' (estimated),
+                'error' (estimated, in the units of `accuracy`) and 'feasible' (error within it).
+        """
+        if output not in OUTPUT_TYPES:
+            raise ValueError(f"Unknown output type: {output!r} (expected one of {OUTPUT_TYPES})")
+        z = NormalDist().inv_cdf((1 + self.confidence) / 2)
+        replica_seconds = estimate["events"] * EXACT_EVENT_SECONDS + EXACT_RUN_SECONDS
+
+        options = []
+        for engine, outputs in ENGINE_OUTPUTS.items():
+            if output not in outputs:
+                continue
+            if engine == "mean_field":
+                replicas = 0
+                seconds = estimate["mean_field"]["steps"] * MEAN_FIELD_STEP_SECONDS
+                error = math.inf if estimate["decisive"] else estimate["spread"]
+            elif output == "path":
+                replicas, seconds, error = 1, replica_seconds, 0.0
+            elif output == "distribution":
+                # Dvoretzky-Kiefer-Wolfowitz: P(sup |F_n - F| > eps) <= 2 exp(-2 n eps^2)
+                log_term = math.log(2 / (1 - self.confidence))
+                replicas = min(math.ceil(log_term / (2 * accuracy ** 2)), self.max_replicas)
+                seconds = replicas * replica_seconds
+                error = math.sqrt(log_term / (2 * replicas))
+            else:
+                replicas = max(2, min(math.ceil((z * estimate["spread"] / accuracy) ** 2), self.max_replicas))
+                seconds = replicas * replica_seconds
+                error = z * estimate["spread"] / math.sqrt(replicas)
+            options.append({
+                "engine": engine, "replicas": replicas, "seconds": seconds,
+                "error": error, "feasible": error <= accuracy,
+            })
+        return options
+
+    def plan(self, scenario: Dict[str, Any], output: str = "expectation", accuracy: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Choose the engine for a scenario and output.
+
+        Args:
+            scenario (dict): Normalised scenario (see ``BatchRunner.parse_scenario``).
+            output (str): 'path', 'distribution' or 'expectation'. Defaults to 'expectation'.
+            accuracy (float, optional): Accuracy target. Defaults to the planner's.
+
+        Returns:
+            dict: 'engine', 'output', 'accuracy', 'replicas', 'estimated_events',
+                'estimated_seconds', 'estimated_error', 'decisive' and 'candidates' (see
+                ``candidates``), plus the 'estimate' used.
+
+        Raises:
+            ValueError: If the output type is unknown.
+        """
+        accuracy = self.accuracy if accuracy is None else accuracy
+        estimate = self.estimate(scenario)
+        options = self.candidates(estimate, output, accuracy)
+        feasible = [option for option in options if option["feasible"]]
+        if feasible:
+            chosen = min(feasible, key=lambda option: option["seconds"])
+        else:
+            chosen = min(options, key=lambda option: (option["error"], option["seconds"]))
+            logger.warning(
+                f"No engine reaches accuracy {accuracy} for {scenario['id']!r} within {self.max_replicas} "
+                f"replicas; using {chosen['engine']} (estimated error {chosen['error']:.3g})"
+            )
+        logger.info(
+            f"Planned {output} of {scenario['id']!r}: {chosen['engine']} x {chosen['replicas']} "
+            f"(~{estimate['events']:.0f} events per replica, ~{chosen['seconds']:.3g} s)"
+        )
+        return {
+            "engine": chosen["engine"],
+            "output": output,
+            "accuracy": accuracy,
+            "replicas": chosen["replicas"],
+            "estimated_events": estimate["events"],
+            "estimated_seconds": chosen["seconds"],
+            "estimated_error": chosen["error"],
+            "decisive": estimate["decisive"],
+            "candidates": options,
+            "estimate": estimate,
+        }
+
+    def run(self, scenario: Dict[str, Any], output: str = "expectation", accuracy: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Plan and run a scenario.
+
+        Args:
+            scenario (dict): Scenario entry as in scenario files, or already normalised.
+            output (str): 'path', 'distribution' or 'expectation'. Defaults to 'expectation'.
+            accuracy (float, optional): Accuracy target. Defaults to the planner's.
+
+        Returns:
+            dict: The output and a 'metadata' entry recording the plan (see ``plan``, without the
+                estimate and candidates) and the wall time in 'seconds'.
+                - 'path': 'trajectory' (arrays, see ``Simulation.trajectory``) of replica 0, with
+                  its final OUTCOME_FIELDS, 'outcome' and 'winner'.
+                - 'distribution': 'samples', one array per OUTCOME_FIELDS and 'winner'.
+                - 'expectation': the mean of each OUTCOME_FIELDS, the win rates 'win_1' and
+                  'win_2', and for exact runs the standard error of each in 'stderr'.
+        """
+        scenario = BatchRunner.parse_scenario(scenario, scenario.get("id", "scenario"))
+        plan = self.plan(scenario, output, accuracy)
+        started = perf_counter()
+
+        if plan["engine"] == "mean_field":
+            expected = plan["estimate"]["mean_field"]
+            result = {field: expected[field] for field in OUTCOME_FIELDS}
+            result["win_1"] = float(expected["winner"] == 1)
+            result["win_2"] = float(expected["winner"] == 2)
+        elif output == "path":
+            sim = BatchRunner.build_simulation(scenario, BatchRunner.replica_seed(scenario, 0))
+            sim.run_simulation(time=scenario["time"])
+            outcome, winner = BatchRunner.outcome(sim)
+            trajectory = sim.trajectory
+            result = {field: trajectory[field][-1].item() for field in OUTCOME_FIELDS if field != "end_time"}
+            result.update(end_time=float(trajectory["time"][-1]), outcome=outcome, winner=winner, trajectory=trajectory)
+        else:
+            records = [BatchRunner.run_replica(scenario, replica) for replica in range(plan["replicas"])]
+            samples = {field: np.array([r[field] for r in records]) for field in OUTCOME_FIELDS + ("winner",)}
+            if output == "distribution":
+                result = {"samples": samples}
+            else:
+                winners = samples.pop("winner")
+                samples["win_1"] = (winners == 1).astype(float)
+                samples["win_2"] = (winners == 2).astype(float)
+                result = {field: float(values.mean()) for field, values in samples.items()}
+                result["stderr"] = {
+                    field: float(values.std(ddof=1) / math.sqrt(len(values))) for field, values in samples.items()
+                }
+
+        metadata = {key: value for key, value in plan.items() if key not in ("estimate", "candidates")}
+        metadata["seconds"] = perf_counter() - started
+        result["metadata"] = metadata
+        return result
+
+
+if __name__ == "__main__":
+    planner = EnginePlanner(accuracy=0.02)
+    for units in (
+        [{"size": 5, "stats": "4/5/2/1", "law": "ln"}, {"size": 5, "stats": "3/6/1/0", "law": "ln"}],
+        [{"size": 3000, "stats": "4/5/1/0", "law": "sq"}, {"size": 2500, "stats": "4/6/1/0", "law": "sq"}],
+    ):
+        result = planner.run({"units": units, "time": 0.5})
+        print(result["metadata"]["engine"], result["metadata"]["replicas"], round(result["size_1"], 1), round(result["size_2"], 1))
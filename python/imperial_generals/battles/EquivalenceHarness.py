@@ -0,0 +1,296 @@
+"""
+Statistical equivalence checks of alternative simulation engines against the reference Simulation.
+"""
+
+# base libs
+from pathlib import Path
+from time import perf_counter
+from typing import Any, Callable, Dict, List, Optional, Union
+import hashlib
+import importlib
+import inspect
+import json
+import logging
+import os
+
+# ext libs
+import numpy as np
+
+# local imports
+from imperial_generals.battles.BatchRunner import BatchRunner
+
+# Inherit logging configuration from the main application
+logger = logging.getLogger(__name__)
+
+# An engine runs one replica of a scenario (see BatchRunner.parse_scenario) and returns its result
+# record, with at least 'end_time', 'size_1', 'size_2' and 'winner' (see BatchRunner.run_replica)
+Engine = Callable[[Dict[str, Any], int], Dict[str, Any]]
+
+# Outcome fields compared between engines
+COMPARED_FIELDS = ("winner", "size_1", "size_2", "end_time")
+
+# Modules whose source defines the reference engine's results: the replica path of BatchRunner
+# (scenario parsing, seeding, build_simulation, run_replica) and everything it runs
+REFERENCE_MODULES = (
+    "imperial_generals.battles.BatchRunner",
+    "imperial_generals.battles.Simulation",
+    "imperial_generals.units.Regiment",
+    "imperial_generals.utils.closest_morale_stat",
+    "imperial_generals.utils.combat_efficiency",
+)
+
+# Canonical matchups: a drawn square-law fight, a decisive one, a frontage-limited linear fight
+# and a small duel decided by the clocks alone
+CANONICAL_MATCHUPS: List[Dict[str, Any]] = [
+    {"id": "even_sq", "time": 1.0, "seed": 101, "units": [
+        {"size": 200, "stats": "4/5/1/0", "law": "sq"}, {"size": 200, "stats": "4/5/1/0", "law": "sq"}]},
+    {"id": "outnumbered_sq", "time": 2.0, "seed": 102, "units": [
+        {"size": 300, "stats": "3/6/1/0", "law": "sq"}, {"size": 200, "stats": "6/7/1/0", "law": "sq"}]},
+    {"id": "frontage_ln", "time": 2.0, "seed": 103, "units": [
+        {"size": 300, "stats": "4/5/1/0", "law": "ln", "frontage": 40}, {"size": 200, "stats": "5/6/1/0", "law": "ln"}]},
+    {"id": "duel_ln", "time": 10.0, "seed": 104, "units": [
+        {"size": 5, "stats": "4/5/2/1", "law": "ln"}, {"size": 5, "stats": "3/6/1/0", "law": "ln"}]},
+]
+
+# Default tolerances: absolute difference in each side's win rate, difference in the mean final
+# size of each side as a fraction of its initial size, and in the mean duration as a fraction of
+# the time limit
+DEFAULT_TOLERANCES = {"win_rate": 0.05, "size_1": 0.05, "size_2": 0.05, "end_time": 0.05}
+
+
+class EquivalenceHarness:
+    """
+    Compares a candidate engine with the reference ``Simulation`` on a set of matchups.
+
+    Both engines run the same replicas (same seeds) of each matchup, and their outcome
+    distributions are compared with two-sample tests: a chi-square test of the winners (side 1,
+    side 2 or undecided) and Kolmogorov-Smirnov tests of the final sizes and durations. A metric
+    fails only if the difference is both significant (p-value below `alpha`) and larger than its
+    tolerance, so large replica counts do not flag negligible differences. The wall time of both
+    engines gives the candidate's speedup.
+
+    Reference distributions are cached as ``.npz`` files under `cache_dir`, keyed by the matchup,
+    the replica count and a fingerprint of the reference code, so repeated (CI) runs only run the
+    candidate and a change to the reference engine invalidates the cache.
+
+    Attributes:
+        matchups (List[dict]): Normalised scenarios (see ``BatchRunner.parse_scenario``).
+        replicas (int): Replicas run per matchup and engine.
+        alpha (float): Significance level of the tests.
+        tolerances (Dict[str, float]): Tolerance per metric (see DEFAULT_TOLERANCES).
+        cache_dir (Path | None): Directory of cached reference distributions.
+    """
+
+    def __init__(
+        self,
+        matchups: Optional[List[Dict[str, Any]]] = None,
+        replicas: int = 200,
+        alpha: float = 0.001,
+        tolerances: Optional[Dict[str, float]] = None,
+        cache_dir: Optional[Union[str, Path]] = None
+    ) -> None:
+        """
+        Initialize the EquivalenceHarness.
+
+        Args:
+            matchups (List[dict], optional): Scenario entries as in scenario files. Defaults to
+                CANONICAL_MATCHUPS.
+            replicas (int): Replicas per matchup. Defaults to 200.
+            alpha (float): Significance level. Defaults to 0.001.
+            tolerances (dict, optional): Overrides of DEFAULT_TOLERANCES.
+            cache_dir (str | Path, optional): Cache reference distributions here. Defaults to no cache.
+
+        Raises:
+            ValueError: If a matchup is malformed, replicas is not positive or alpha is not in (0, 1).
+        """
+        if replicas <= 0:
+            raise ValueError("replicas must be positive")
+        if not 0 < alpha < 1:
+            raise ValueError("alpha must be between 0 and 1")
+        entries = CANONICAL_MATCHUPS if matchups is None else matchups
+        self.matchups: List[Dict[str, Any]] = [
+            BatchRunner.parse_scenario(entry, f"matchup-{i}") for i, entry in enumerate(entries)
+        ]
+        self.replicas: int = replicas
+        self.alpha: float = alpha
+        self.tolerances: Dict[str, float] = {**DEFAULT_TOLERANCES, **(tolerances or {})}
+        self.cache_dir: Optional[Path] = None if cache_dir is None else Path(cache_dir)
+
+    def __str__(self) -> str:
+        return f"EquivalenceHarness({len(self.matchups)} matchups x {self.replicas} replicas)"
+
+    def __repr__(self) -> str:
+        return (
+            f"EquivalenceHarness(matchups={[m['id'] for m in self.matchups]!r}, replicas={self.replicas}, "
+            f"alpha={self.alpha}, cache_dir={self.cache_dir!r})"
+        )
+
+    @staticmethod
+    def fingerprint() -> str:
+        """Hash of the reference engine's source (the modules in REFERENCE_MODULES)."""
+        digest = hashlib.sha1()
+        for module in REFERENCE_MODULES:
+            digest.update(inspect.getsource(importlib.import_module(module)).encode())
+        return digest.hexdigest()[:12]
+
+    @staticmethod
+    def run_engine(engine: Engine, matchup: Dict[str, Any], replicas: int) -> Dict[str, Any]:
+        """
+        Run replicas 0..replicas-1 of a matchup.
+
+        Returns:
+            dict: One array per field in COMPARED_FIELDS, and the wall time in 'seconds'.
+        """
+        started = perf_counter()
+        records = [engine(matchup, replica) for replica in range(replicas)]
+        seconds = perf_counter() - started
+        samples = {field: np.array([record[field] for record in records]) for field in COMPARED_FIELDS}
+        samples["seconds"] = seconds
+        return samples
+
+    def _cache_path(self, matchup: Dict[str, Any]) -> Path:
+        key = json.dumps([matchup, self.replicas], sort_keys=True)
+        digest = hashlib.sha1(key.encode()).hexdigest()[:16]
+        return self.cache_dir / f"{self.fingerprint()}-{digest}.npz"
+
+    def reference(self, matchup: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Reference distribution of a matchup, from the cache if it has one.
+
+        Returns:
+            dict: As ``run_engine``; 'seconds' is the wall time of the run that filled the cache.
+        """
+        path = None if self.cache_dir is None else self._cache_path(matchup)
+        if path is not None and path.exists():
+            with np.load(path) as data:
+                samples = {field: data[field] for field in COMPARED_FIELDS}
+                samples["seconds"] = float(data["seconds"])
+            return samples
+
+        samples = self.run_engine(BatchRunner.run_replica, matchup, self.replicas)
+        if path is not None:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_name(path.name + ".tmp")
+            with open(tmp, "wb") as f:
+                np.savez(f, **samples)
+            os.replace(tmp, path)
+            logger.info(f"Cached reference distribution of {matchup['id']!r} in {path}")
+        return samples
+
+    def compare_samples(
+        self, matchup: Dict[str, Any], reference: Dict[str, Any], candidate: Dict[str, Any]
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Compare two outcome distributions of a matchup.
+
+        Returns:
+            dict: Per metric ('win_rate', 'size_1', 'size_2', 'end_time') the test 'statistic',
+                'p_value', 'effect' (largest win-rate difference, or difference of the means as a
+                fraction of the initial size or time limit), 'tolerance' and whether it 'passed'.
+        """
+        from scipy import stats
+
+        metrics = {}
+        outcomes = [0, 1, 2]
+        table = np.array([[np.sum(sample["winner"] == w) for w in outcomes] for sample in (reference, candidate)])
+        table = table[:, table.sum(axis=0) > 0]
+        if table.shape[1] > 1:
+            statistic, p_value, _, _ = stats.chi2_contingency(table)
+        else:
+            statistic, p_value = 0.0, 1.0 # both engines always give the same outcome
+        rates = [np.mean(sample["winner"][:, None] == np.array([1, 2]), axis=0) for sample in (reference, candidate)]
+        metrics["win_rate"] = self._metric("win_rate", statistic, p_value, float(np.max(np.abs(rates[0] - rates[1]))))
+
+        scales = {"size_1": matchup["units"][0]["size"], "size_2": matchup["units"][1]["size"], "end_time": matchup["time"]}
+        for field, scale in scales.items():
+            ref, cand = reference[field].astype(float), candidate[field].astype(float)
+            if np.array_equal(np.unique(ref), np.unique(cand)) and len(np.unique(ref)) == 1:
+                statistic, p_value = 0.0, 1.0
+            else:
+                result = stats.ks_2samp(ref, cand)
+                statistic, p_value = float(result.statistic), float(result.pvalue)
+            effect = abs(cand.mean() - ref.mean()) / scale
+            metrics[field] = self._metric(field, statistic, p_value, float(effect))
+        return metrics
+
+    def _metric(self, name: str, statistic: float, p_value: float, effect: float) -> Dict[str, Any]:
+        tolerance = self.tolerances[name]
+        return {
+            "statistic": float(statistic),
+            "p_value": float(p_value),
+            "effect": effect,
+            "tolerance": tolerance,
+            "passed": bool(p_value >= self.alpha or effect <= tolerance),
+        }
+
+    def compare(self, engine: Engine, name: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Run a candidate engine on every matchup and compare it with the reference.
+
+        Args:
+            engine (Engine): Candidate engine, called as ``engine(scenario, replica)``; it should
+                draw its randomness from ``BatchRunner.replica_seed(scenario, replica)``.
+            name (str, optional): Name in the report. Defaults to the engine's name.
+
+        Returns:
+            dict: 'engine', 'passed', overall 'speedup' (reference over candidate wall time) and
+                per matchup its 'passed', 'speedup', 'reference_seconds', 'candidate_seconds' and
+                'metrics' (see ``compare_samples``).
+        """
+        matchups = {}
+        reference_seconds = candidate_seconds = 0.0
+        for matchup in self.matchups:
+            reference = self.reference(matchup)
+            candidate = self.run_engine(engine, matchup, self.replicas)
+            metrics = self.compare_samples(matchup, reference, candidate)
+            matchups[matchup["id"]] = {
+                "passed": all(metric["passed"] for metric in metrics.values()),
+                "speedup": reference["seconds"] / max(candidate["seconds"], 1e-12),
+                "reference_seconds": reference["seconds"],
+                "candidate_seconds": candidate["seconds"],
+                "metrics": metrics,
+            }
+            reference_seconds += reference["seconds"]
+            candidate_seconds += candidate["seconds"]
+        return {
+            "engine": name or getattr(engine, "__qualname__", repr(engine)),
+            "passed": all(m["passed"] for m in matchups.values()),
+            "speedup": reference_seconds / max(candidate_seconds, 1e-12),
+            "matchups": matchups,
+        }
+
+    @staticmethod
+    def format_report(report: Dict[str, Any]) -> str:
+        """Render a ``compare`` report as a plain-text table."""
+        lines = [f"{report['engine']}: {'PASSED' if report['passed'] else 'FAILED'}, speedup x{report['speedup']:.2f}"]
+        for matchup_id, result in report["matchups"].items():
+            lines.append(f"  {matchup_id:<20} {'ok' if result['passed'] else 'FAIL':<5} x{result['speedup']:.2f}")
+            for metric, values in result["metrics"].items():
+                lines.append(
+                    f"    {metric:<10} p={values['p_value']:.4f}  effect={values['effect']:.4f}  "
+                    f"(tolerance {values['tolerance']}){'' if values['passed'] else '  <--'}"
+                )
+        return "\n".join(lines)
+
+    def assert_equivalent(self, engine: Engine, name: Optional[str] = None) -> Dict[str, Any]:
+        """
+        ``compare`` for tests: returns the report, or raises AssertionError with it if any metric failed.
+        """
+        report = self.compare(engine, name)
+        if not report["passed"]:
+            raise AssertionError(self.format_report(report))
+        return report
+
+
+if __name__ == "__main__":
+    import tempfile
+
+    def reseeded(scenario: Dict[str, Any], replica: int) -> Dict[str, Any]:
+        # the reference engine with other seeds: an independent sample of the same distribution
+        return BatchRunner.run_replica({**scenario, "seed": [scenario["seed"], 1]}, replica)
+
+    logging.disable(logging.INFO)
+    with tempfile.TemporaryDirectory() as tmp:
+        harness = EquivalenceHarness(replicas=100, cache_dir=tmp)
+        print(EquivalenceHarness.format_report(harness.compare(reseeded, "reseeded reference")))
+        print(EquivalenceHarness.format_report(harness.compare(reseeded, "reseeded reference (cached)")))
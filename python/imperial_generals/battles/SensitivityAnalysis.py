@@ -0,0 +1,269 @@
+"""
+Unit balancing: effects of small changes to a matchup, measured with common random numbers.
+"""
+
+# base libs
+from time import perf_counter
+from typing import Any, Dict, List, Optional, Tuple
+import logging
+import math
+
+# ext libs
+import numpy as np
+
+# local imports
+from imperial_generals.battles.BatchRunner import BatchRunner
+from imperial_generals.battles.Simulation import Simulation
+
+# Inherit logging configuration from the main application
+logger = logging.getLogger(__name__)
+
+# Stats of a regiment, in the order of its stats string (the inputs of get_combat_efficiency)
+STAT_NAMES = ("experience", "morale", "weapon", "melee")
+
+# Outcomes whose change is measured: side win indicators, final sizes and battle duration
+SENSITIVITY_METRICS = ("win_1", "win_2", "size_1", "size_2", "end_time")
+
+
+class SensitivityAnalysis:
+    """
+    Measures how perturbations of a baseline matchup change its outcome.
+
+    Every replica runs the baseline and each variant from the same seed, so all of them draw the
+    same stream of event clocks: with common random numbers a variant differs from the baseline
+    only through the perturbation, and the effect is estimated from the paired differences. Their
+    variance is far smaller than that of two independent samples, and so are the replicas needed
+    for a given confidence interval; the report gives this saving per metric.
+
+    A variant is a dict with an 'id' and any of:
+        - 'side' (0 or 1) with stat deltas ('experience', 'morale', 'weapon', 'melee') and/or a
+          'size' delta (or 'size_fraction' of the baseline size), applied to that side's regiment;
+        - 'constants': morale constants (``Simulation.MORALE_CONSTANTS``) and their new values.
+
+    Attributes:
+        baseline (dict): Normalised baseline scenario (see ``BatchRunner.parse_scenario``).
+        variants (List[dict]): The variants.
+        replicas (int): Paired replicas run per variant.
+        confidence (float): Confidence level of the intervals.
+    """
+
+    def __init__(
+        self,
+        baseline: Dict[str, Any],
+        variants: Optional[List[Dict[str, Any]]] = None,
+        replicas: int = 100,
+        confidence: float = 0.95
+    ) -> None:
+        """
+        Initialize the SensitivityAnalysis.
+
+        Args:
+            baseline (dict): Scenario entry as in scenario files.
+            variants (List[dict], optional): Variants (see the class docstring). Defaults to
+                ``one_at_a_time()``.
+            replicas (int): Replicas per variant. Defaults to 100.
+            confidence (float): Confidence level. Defaults to 0.95.
+
+        Raises:
+            ValueError: If the baseline or a variant is malformed, ids repeat, replicas is below 2
+                or confidence is not in (0, 1).
+        """
+        if replicas < 2:
+            raise ValueError("replicas must be at least 2")
+        if not 0 < confidence < 1:
+            raise ValueError("confidence must be between 0 and 1")
+        self.baseline: Dict[str, Any] = BatchRunner.parse_scenario(baseline, baseline.get("id", "baseline"))
+        self.variants: List[Dict[str, Any]] = self.one_at_a_time() if variants is None else variants
+        ids = [variant.get("id") for variant in self.variants]
+        if None in ids or len(set(ids)) != len(ids):
+            raise ValueError("Every variant needs a unique 'id'")
+        for variant in self.variants:
+            # fail before running anything
+            self.apply_variant(self.baseline, variant)
+        self.replicas: int = replicas
+        self.confidence: float = confidence
+
+    def __str__(self) -> str:
+        return f"SensitivityAnalysis({self.baseline['id']!r}: {len(self.variants)} variants x {self.replicas} replicas)"
+
+    def __repr__(self) -> str:
+        return (
+            f"SensitivityAnalysis(baseline={self.baseline['id']!r}, variants={[v['id'] for v in self.variants]!r}, "
+            f"replicas={self.replicas}, confidence={self.confidence})"
+        )
+
+    @staticmethod
+    def one_at_a_time(
+        sides: Tuple[int, ...] = (0, 1),
+        step: int = 1,
+        size_fraction: float = 0.1,
+        constant_scale: float = 1.1
+    ) -> List[Dict[str, Any]]:
+        """
+        Variants changing one thing at a time: each stat by `step` and the size by
+        `size_fraction` (as a 'size_fraction' entry, resolved against the baseline) for each side,
+        and each morale constant scaled by `constant_scale`.
+
+        Returns:
+            List[dict]: Variants with ids such as 'side_1:+1 experience' and 'MORALE_LOSS_CONSTANT_A x1.1'.
+        """
+        variants = []
+        for side in sides:
+            for stat in STAT_NAMES:
+                variants.append({"id": f"side_{side + 1}:{step:+d} {stat}", "side": side, stat: step})
+            variants.append({
+                "id": f"side_{side + 1}:{size_fraction:+.0%} size", "side": side, "size_fraction": size_fraction,
+            })
+        for name in Simulation.MORALE_CONSTANTS:
+            variants.append({
+                "id": f"{name} x{constant_scale:g}",
+                "constants": {name: getattr(Simulation, name) * constant_scale},
+            })
+        return variants
+
+    @staticmethod
+    def apply_variant(scenario: Dict[str, Any], variant: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, float]]:
+        """
+        Apply a variant to a scenario.
+
+        Returns:
+            tuple: The perturbed scenario (same id and seed, so replicas share their seeds) and
+                the morale constants to set on its simulations.
+
+        Raises:
+            ValueError: If the variant is malformed or leaves a stat or size negative.
+        """
+        known = {"id", "side", "size", "size_fraction", "constants", *STAT_NAMES}
+        unknown = set(variant) - known
+        if unknown:
+            raise ValueError(f"Unknown keys in variant {variant.get('id')!r}: {sorted(unknown)}")
+        constants = dict(variant.get("constants", {}))
+        bad = set(constants) - set(Simulation.MORALE_CONSTANTS)
+        if bad:
+            raise ValueError(f"Unknown morale constants in variant {variant.get('id')!r}: {sorted(bad)}")
+
+        units = [dict(unit) for unit in scenario["units"]]
+        deltas = {stat: variant[stat] for stat in STAT_NAMES if stat in variant}
+        if deltas or "size" in variant or "size_fraction" in variant:
+            side = variant.get("side")
+            if side not in (0, 1):
+                raise ValueError(f"Variant {variant.get('id')!r} changes a regiment but has no side (0 or 1)")
+            unit = units[side]
+            stats = [int(d) for d in unit["stats"].split("/")]
+            for stat, delta in deltas.items():
+                stats[STAT_NAMES.index(stat)] += delta
+            size = unit["size"] + variant.get("size", 0) + round(unit["size"] * variant.get("size_fraction", 0))
+            if min(stats) < 0 or size < 0:
+                raise ValueError(f"Variant {variant.get('id')!r} leaves a stat or the size negative")
+            unit.update(stats="/".join(str(d) for d in stats), size=size)
+        return {**scenario, "units": units}, constants
+
+    @staticmethod
+    def run_replica(scenario: Dict[str, Any], replica: int, constants: Optional[Dict[str, float]] = None) -> Dict[str, float]:
+        """
+        Run one replica of a scenario with the seed of ``BatchRunner.run_replica`` and the given
+        morale constants.
+
+        Returns:
+            dict: The SENSITIVITY_METRICS of the run.
+        """
+        sim = BatchRunner.build_simulation(scenario, BatchRunner.replica_seed(scenario, replica))
+        for name, value in (constants or {}).items():
+            setattr(sim, name, value)
+        sim.run_simulation(time=scenario["time"])
+        _, winner = BatchRunner.outcome(sim)
+        return {
+            "win_1": float(winner == 1),
+            "win_2": float(winner == 2),
+            "size_1": float(sim.forces[0].size),
+            "size_2": float(sim.forces[1].size),
+            "end_time": float(sim._trajectory['time'][-1]),
+        }
+
+    def _samples(self, scenario: Dict[str, Any], constants: Dict[str, float]) -> Dict[str, np.ndarray]:
+        records = [self.run_replica(scenario, replica, constants) for replica in range(self.replicas)]
+        return {metric: np.array([record[metric] for record in records]) for metric in SENSITIVITY_METRICS}
+
+    def effects(self, baseline: Dict[str, np.ndarray], variant: Dict[str, np.ndarray]) -> Dict[str, Dict[str, float]]:
+        """
+        Effect of a variant from paired samples.
+
+        Returns:
+            dict: Per metric the 'effect' (mean paired difference, variant minus baseline), its
+                'stderr', the confidence interval 'ci_low' / 'ci_high', the standard error
+                independent samples of the same size would have ('independent_stderr') and the
+                'replica_saving', how many times more replicas they would need for the same interval.
+        """
+        from scipy import stats
+
+        quantile = stats.t.ppf((1 + self.confidence) / 2, self.replicas - 1)
+        effects = {}
+        for metric in SENSITIVITY_METRICS:
+            differences = variant[metric] - baseline[metric]
+            stderr = float(differences.std(ddof=1) / math.sqrt(self.replicas))
+            independent = float(math.sqrt((baseline[metric].var(ddof=1) + variant[metric].var(ddof=1)) / self.replicas))
+            if stderr > 0:
+                saving = (independent / stderr) ** 2
+            else:
+                saving = math.inf if independent > 0 else 1.0
+            effect = float(differences.mean())
+            effects[metric] = {
+                "effect": effect,
+                "stderr": stderr,
+                "ci_low": effect - quantile * stderr,
+                "ci_high": effect + quantile * stderr,
+                "independent_stderr": independent,
+                "replica_saving": saving,
+            }
+        return effects
+
+    def run(self) -> Dict[str, Any]:
+        """
+        Run the baseline and every variant.
+
+        Returns:
+            dict: 'baseline' (mean of each metric), 'replicas', 'confidence', 'seconds' and
+                'variants', per variant id its effects (see ``effects``).
+        """
+        started = perf_counter()
+        baseline = self._samples(self.baseline, {})
+        report = {
+            "baseline": {metric: float(values.mean()) for metric, values in baseline.items()},
+            "replicas": self.replicas,
+            "confidence": self.confidence,
+            "variants": {},
+        }
+        for variant in self.variants:
+            scenario, constants = self.apply_variant(self.baseline, variant)
+            report["variants"][variant["id"]] = self.effects(baseline, self._samples(scenario, constants))
+            logger.info(f"Sensitivity of {self.baseline['id']!r} to {variant['id']!r} done")
+        report["seconds"] = perf_counter() - started
+        return report
+
+    @staticmethod
+    def format_report(report: Dict[str, Any], metrics: Tuple[str, ...] = SENSITIVITY_METRICS) -> str:
+        """Render a ``run`` report as a plain-text table of effects and confidence intervals."""
+        lines = [
+            f"baseline ({report['replicas']} paired replicas, {report['confidence']:.0%} intervals): "
+            + ", ".join(f"{metric}={report['baseline'][metric]:.4g}" for metric in metrics)
+        ]
+        for variant_id, effects in report["variants"].items():
+            lines.append(f"  {variant_id}")
+            for metric in metrics:
+                values = effects[metric]
+                lines.append(
+                    f"    {metric:<9} {values['effect']:+10.4g}  [{values['ci_low']:+.4g}, {values['ci_high']:+.4g}]"
+                    f"  x{values['replica_saving']:.3g} fewer replicas"
+                )
+        return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    logging.disable(logging.INFO)
+    analysis = SensitivityAnalysis(
+        {"id": "outnumbered", "time": 2.0, "seed": 3, "units": [
+            {"size": 300, "stats": "3/6/1/0", "law": "sq"}, {"size": 200, "stats": "6/7/1/0", "law": "sq"}]},
+        [{"id": "+1 xp", "side": 0, "experience": 1}, {"id": "+10 men", "side": 0, "size": 10}],
+        replicas=100,
+    )
+    print(SensitivityAnalysis.format_report(analysis.run()))
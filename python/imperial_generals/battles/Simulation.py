@@ -1,15 +1,25 @@
 # class to handle the lanchester simulations and markov chain simulations
 
 # base libs
+import heapq
+import json
 import logging
-from typing import Tuple
+import os
+from contextlib import nullcontext
+from pathlib import Path
+from time import perf_counter
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence, Tuple, Union
 
 # ext libs
 import numpy as np
-import pandas as pd
 
 # local imports
+from imperial_generals import units
 from imperial_generals.units import Regiment
+from imperial_generals.utils import trace_memory
+
+if TYPE_CHECKING:
+    import pandas as pd
 
 class Simulation:
     """
@@ -24,15 +34,63 @@ class Simulation:
                 - 'initial_size': tuple[int, int]
                 - 'losses': np.ndarray
                 - 'morale': tuple[int, int]
-        sim_output pd.DataFrame: Tracks simulation time, sizes, and morale history.
+        sim_output pd.DataFrame: Tracks simulation time, sizes, and morale history (built on access).
+        trajectory (dict[str, np.ndarray]): The same history as NumPy arrays, without pandas.
+        rng (np.random.Generator): Random generator drawing the event clocks.
+        front_width (float | None): Maximum width of the front (e.g. a bridge or a pass), limiting
+            the men engaged under the linear law.
+        events (List[tuple]): Scheduled events not yet applied, as a heap of
+            (time, sequence, kind, side, value) tuples (see schedule_event).
+        n_events (int): Number of steps (casualties and scheduled events) simulated so far; equal
+            to the trajectory rows minus one unless recording was coarsened.
+        memory_budget (int | None): Bytes the trajectory may take before recording switches to a
+            coarser time grid.
+        record_interval (float | None): Minimum time between recorded rows (None records every
+            step).
+        memory_profile (dict[str, dict] | None): Peak and retained allocation per phase of the
+            last run with ``profile_memory=True`` (see ``trace_memory``).
     """
 
-    def __init__(self, forces: Tuple[Regiment, Regiment]):
+    # constants of the morale rules (see update_morale_losses)
+    MORALE_LOSS_CONSTANT_A = 0.00007 # Rule A: Casualties Sustained
+    MORALE_GAIN_CONSTANT_B = 0.00005 # Rule B: Casualties Inflicted
+    MORALE_LOSS_CONSTANT_C = 0.0000040 # Rule C: Faster Casualties Sustained
+    MORALE_GAIN_CONSTANT_D = 0.0000040 # Rule D: Faster Casualties Inflicted
+    MORALE_CONSTANTS = ('MORALE_LOSS_CONSTANT_A', 'MORALE_GAIN_CONSTANT_B', 'MORALE_LOSS_CONSTANT_C', 'MORALE_GAIN_CONSTANT_D')
+
+    # kinds of scheduled events (see schedule_event)
+    EVENT_KINDS = ('reinforce', 'withdraw', 'stats')
+
+    # approximate bytes per trajectory row: five list slots, each pointing to a float or int
+    TRAJECTORY_ROW_BYTES = 160
+
+    # fewest rows a memory budget must leave room for
+    MIN_TRAJECTORY_ROWS = 64
+
+    def __init__(
+        self,
+        forces: Tuple[Regiment, Regiment],
+        seed: Optional[Union[int, Sequence[int], np.random.SeedSequence, np.random.Generator]] = None,
+        front_width: Optional[float] = None,
+        memory_budget: Optional[int] = None,
+        record_interval: Optional[float] = None
+    ):
         """
         Initialize the Simulation with two regiments.
 
         Args:
             forces (Tuple[Regiment, Regiment]): The two opposing Regiment instances.
+            seed (int | Sequence[int] | np.random.SeedSequence | np.random.Generator, optional):
+                Anything ``np.random.default_rng`` accepts, e.g. ``[seed, crc32(battle_id)]`` for
+                one stream per battle. Defaults to None (fresh OS entropy; the global
+                ``np.random.seed`` does not apply).
+            front_width (float, optional): Maximum width of the front. Defaults to None (unlimited).
+            memory_budget (int, optional): Bytes the recorded trajectory may use. Once it would
+                grow past the budget, recording switches to a coarser time grid (and the rows
+                already recorded are thinned to it) instead of growing further. Defaults to None
+                (record every step).
+            record_interval (float, optional): Minimum battle time between recorded rows. The
+                latest state is always kept as the last row. Defaults to None (every step).
 
         Sets:
             self.forces: Tuple[Regiment, Regiment]
@@ -41,13 +99,36 @@ class Simulation:
                 - 'initial_size': list[int, int]
                 - 'losses': np.ndarray
                 - 'morale': np.ndarray
-            self.sim_output: pd.DataFrame
+            self._trajectory: dict[str, list] (exposed as sim_output / trajectory)
+            self.rng: np.random.Generator
+            self.front_width: float | None
+            self.events: list (empty heap)
+            self.n_events: int
+            self.memory_budget: int | None
+            self.record_interval: float | None
+            self.memory_profile: dict | None
+
+        Raises:
+            ValueError: If forces, front_width, memory_budget or record_interval is invalid.
         """
         if not isinstance(forces, tuple) or not all(isinstance(r, Regiment) for r in forces) or len(forces) != 2:
             raise ValueError("forces must be a tuple of two Regiment instances.")
 
         self.forces: Tuple[Regiment, Regiment] = forces
         self.rate_funcs: Tuple[callable, callable] | None = None
+        self.rng: np.random.Generator = np.random.default_rng(seed)
+        if front_width is not None and front_width <= 0:
+            raise ValueError("front_width must be positive.")
+        self.front_width: Optional[float] = front_width
+        if memory_budget is not None and memory_budget < self.MIN_TRAJECTORY_ROWS * self.TRAJECTORY_ROW_BYTES:
+            raise ValueError(
+                f"memory_budget must leave room for at least {self.MIN_TRAJECTORY_ROWS} trajectory rows "
+                f"({self.MIN_TRAJECTORY_ROWS * self.TRAJECTORY_ROW_BYTES} bytes)."
+            )
+        if record_interval is not None and record_interval <= 0:
+            raise ValueError("record_interval must be positive.")
+        self.memory_budget: Optional[int] = memory_budget
+        self.record_interval: Optional[float] = record_interval
 
         reg1, reg2 = forces
         self.casualties: dict[str, list[int, int] | np.ndarray] = {
@@ -56,13 +137,21 @@ class Simulation:
             'morale': np.array([reg1.raw_morale, reg2.raw_morale])
         }
 
-        self.sim_output = pd.DataFrame({
+        # history is appended to plain lists; pandas is only imported if sim_output is read
+        self._trajectory: Dict[str, List[Any]] = {
             'time': [0],
             'size_1': [reg1.size],
             'size_2': [reg2.size],
             'morale_1': [reg1.raw_morale],
             'morale_2': [reg2.raw_morale]
-        })
+        }
+        self._sim_output = None
+        self._end_time: Optional[float] = None # target time of the current run, kept in checkpoints
+        self.events: List[Tuple[float, int, str, int, Any]] = []
+        self._event_seq: int = 0 # tie-breaker keeping events at the same time in scheduling order
+        self._pending_reinforcements: List[int] = [0, 0] # men still scheduled to arrive, per side
+        self.n_events: int = 0
+        self.memory_profile: Optional[Dict[str, Dict[str, Any]]] = None
 
         logging.info(f"Initialized Simulation with forces: {self.forces}")
 
@@ -82,17 +171,38 @@ class Simulation:
             f"losses={losses.tolist() if isinstance(losses, np.ndarray) else losses})"
         )
 
+    @property
+    def sim_output(self) -> "pd.DataFrame":
+        """Simulation history as a DataFrame with columns time, size_1, size_2, morale_1, morale_2."""
+        if self._sim_output is None or len(self._sim_output) != len(self._trajectory['time']):
+            import pandas as pd
+
+            self._sim_output = pd.DataFrame(self._trajectory)
+        return self._sim_output
+
+    @property
+    def trajectory(self) -> Dict[str, np.ndarray]:
+        """Simulation history as NumPy arrays keyed by column name."""
+        return {name: np.asarray(values) for name, values in self._trajectory.items()}
+
     # Internal method to create Lanchester differential equations
     @staticmethod
     def _lanchester_diffeq(
-        regiment: Regiment, opponent: Regiment
+        regiment: Regiment, opponent: Regiment, front_width: Optional[float] = None
     ) -> callable:
         """
         Create a rate function for a Regiment according to its Lanchester law.
 
+        Under the linear law only the men engaged along the front fire and take fire: the front is
+        as wide as the shorter of the two lines (each at most its regiment's frontage) and the
+        optional front width, so losses run at the opponent's coefficient times that width, and
+        reserves in depth rotate into the line until a regiment has fewer men than the front.
+        ``get_engaged_front`` is the vectorised form for batches and multi-regiment battles.
+
         Args:
             regiment (Regiment): The Regiment for which to compute the rate.
             opponent (Regiment): The opposing Regiment.
+            front_width (float, optional): Maximum width of the front.
 
         Returns:
             callable: A function computing the rate of change.
@@ -102,9 +212,11 @@ class Simulation:
         """
         logging.debug(f"Building Lanchester diffeq for {regiment} vs {opponent}")
         if regiment.law == 'ln':
-            # TODO - fix equation, should be linear, so -coef * size of battle front (engaged units). 
-            # will need to add front-size as attribute to Regiment to scale based on how many units are engaged
-            return lambda sizes, coef, idx: -coef[1 - idx] * sizes[0] * sizes[1 - idx]
+            # fixed widths; the sizes are taken at each event
+            widths = [
+                width for width in (regiment.frontage, opponent.frontage, front_width) if width is not None
+            ]
+            return lambda sizes, coef, idx: -coef[1 - idx] * min(sizes[0], sizes[1], *widths)
         elif regiment.law == 'sq':
             return lambda sizes, coef, idx: -coef[1 - idx] * sizes[1 - idx]
         else:
@@ -133,8 +245,8 @@ class Simulation:
                 raise ValueError("Each Regiment must have 'law', 'coef', and 'size' attributes.")
 
         self.rate_funcs = (
-            Simulation._lanchester_diffeq(reg1, reg2),
-            Simulation._lanchester_diffeq(reg2, reg1)
+            Simulation._lanchester_diffeq(reg1, reg2, self.front_width),
+            Simulation._lanchester_diffeq(reg2, reg1, self.front_width)
         )
 
     # Private method to update internal casualties value for dynamic morale tracking
@@ -156,12 +268,14 @@ class Simulation:
             • Calculate casualties_per_unit_time_inflicted = R_casualties_taken_this_step / delta_t. (Handle delta_t being zero or extremely small).
             • morale_change_for_B = morale_change_for_B + (casualties_per_unit_time_inflicted * Morale_Gain_Constant_2)
             • (Rationale: A rapid, successful advance or defense significantly boosts a unit's spirit.)
-        """
 
-        MORALE_LOSS_CONSTANT_A = 0.00007 # Rule A: Casualties Sustained
-        MORALE_GAIN_CONSTANT_B = 0.00005 # Rule B: Casualties Inflicted
-        MORALE_LOSS_CONSTANT_C = 0.0000040 # Rule C: Faster Casualties Sustained
-        MORALE_GAIN_CONSTANT_D = 0.0000040 # Rule D: Faster Casualties Inflicted
+        The constants are class attributes (MORALE_CONSTANTS); setting one on an instance
+        changes the rules for that simulation only.
+        """
+        MORALE_LOSS_CONSTANT_A = self.MORALE_LOSS_CONSTANT_A
+        MORALE_GAIN_CONSTANT_B = self.MORALE_GAIN_CONSTANT_B
+        MORALE_LOSS_CONSTANT_C = self.MORALE_LOSS_CONSTANT_C
+        MORALE_GAIN_CONSTANT_D = self.MORALE_GAIN_CONSTANT_D
 
         morale_changes = [0.0, 0.0]  # Initialize morale changes for both sides
 
@@ -196,81 +310,357 @@ class Simulation:
             self.casualties['morale'][side] = max(10, min(100, new_morale))
             self.forces[side].update_raw_morale(self.casualties['morale'][side])
 
+    def schedule_event(self, time: float, kind: str, side: int, value: Union[int, str]) -> None:
+        """
+        Schedule a change to one side at a given battle time.
 
-    def run_simulation(self, time: int) -> None:
+        Events are kept in a heap and merged with the casualty clocks in time order, so each step
+        only looks at the earliest event and scheduling or applying one costs O(log n).
 
-        if self.rate_funcs is None:
-            self.build_lanch_diffeq()
+        Args:
+            time (float): Battle time of the event; not earlier than the current time.
+            kind (str): 'reinforce' (add `value` men), 'withdraw' (remove up to `value` men, not
+                counted as losses) or 'stats' (replace the stats with the `value` string, e.g.
+                '5/6/1/0'; morale keeps following the raw morale).
+            side (int): 0 for the first regiment, 1 for the second.
+            value (int | str): Number of men, or the new stats.
 
-        # deconstruct forces
-        reg1, reg2 = self.forces
+        Raises:
+            ValueError: If the time is in the past, or the kind, side or value is invalid.
+        """
+        if time < self._trajectory['time'][-1]:
+            raise ValueError(f"cannot schedule an event at {time} before the current time {self._trajectory['time'][-1]}")
+        if kind not in self.EVENT_KINDS:
+            raise ValueError(f"Unknown event kind: {kind!r} (expected one of {self.EVENT_KINDS})")
+        if side not in (0, 1):
+            raise ValueError("side must be 0 or 1.")
+        if kind == 'stats':
+            # validate now rather than in the middle of the run
+            Regiment(1, value, self.forces[side].law)
+        elif not isinstance(value, int) or value < 0:
+            raise ValueError(f"{kind} events need a non-negative number of men.")
+
+        heapq.heappush(self.events, (float(time), self._event_seq, kind, side, value))
+        self._event_seq += 1
+        if kind == 'reinforce':
+            self._pending_reinforcements[side] += value
+
+    # Private method to apply the earliest scheduled event
+    def _apply_next_event(self) -> float:
+        """Pop the earliest scheduled event, apply it and return its time."""
+        time, _, kind, side, value = heapq.heappop(self.events)
+        reg = self.forces[side]
+        if kind == 'reinforce':
+            self._pending_reinforcements[side] -= value
+            reg.update_size(reg.size + value)
+            # losses are measured against every man committed to the battle
+            self.casualties['initial_size'][side] += value
+        elif kind == 'withdraw':
+            reg.update_size(max(reg.size - value, 0))
+        else:
+            reg.update_stats(value)
+        logging.info(f"Applied scheduled {kind} event ({value}) to side {side + 1} at time {time:.2f}")
+        return time
 
-        # Init local time
-        t = self.sim_output.loc[0, 'time']
+    # Private method to check whether a side has been wiped out
+    def _wiped_out(self) -> bool:
+        """
+        Whether a side has no men left and no scheduled reinforcements to wait for.
 
-        while t < time:
+        A side that starts empty (or is emptied by a withdrawal) and has men scheduled to arrive
+        has not lost yet; the battle goes on until its reinforcements arrive. The men still to
+        arrive are counted as events are scheduled and applied, so the check is O(1) per step.
+        """
+        return any(reg.size == 0 and not pending for reg, pending in zip(self.forces, self._pending_reinforcements))
 
-            sizes = [reg1.size, reg2.size]
-            coef = [reg1.coef, reg2.coef]
+    # Private method to log the current state to the trajectory
+    def _record(self, t: float, sizes: List[int]) -> None:
+        """
+        Record the state at time `t`. Off the recording grid the last row is overwritten instead
+        of appended, so the last row is always the current state and rows are at least
+        `record_interval` apart.
+        """
+        trajectory = self._trajectory
+        row = {
+            'time': t,
+            'size_1': sizes[0],
+            'size_2': sizes[1],
+            'morale_1': self.casualties['morale'][0],
+            'morale_2': self.casualties['morale'][1]
+        }
+        if self.record_interval is not None and len(trajectory['time']) > 1 and t - trajectory['time'][-2] < self.record_interval:
+            for name, value in row.items():
+                trajectory[name][-1] = value
+            self._sim_output = None
+        else:
+            for name, value in row.items():
+                trajectory[name].append(value)
+            if self.memory_budget is not None and len(trajectory['time']) * self.TRAJECTORY_ROW_BYTES > self.memory_budget:
+                self._coarsen()
 
-            logging.debug(f"At time {t:.2f}, sizes: {sizes}, coefs: {coef}, morale: {self.casualties['morale'].tolist()}, stats: {reg1.stats}, {reg2.stats}")
+    # Private method to fit the trajectory back into the memory budget
+    def _coarsen(self) -> None:
+        """
+        Double the recording interval (starting from the recorded span over the row budget) and
+        thin the recorded rows to the new grid, keeping the first and last rows, until the
+        trajectory takes at most half of the memory budget.
+        """
+        max_rows = self.memory_budget // self.TRAJECTORY_ROW_BYTES
+        times = self._trajectory['time']
+        span = times[-1] - times[0]
+        interval = self.record_interval or 0.0
+        while len(times) > max_rows // 2:
+            interval = max(2 * interval, 2 * span / max_rows)
+            keep, last = [0], times[0]
+            for i in range(1, len(times) - 1):
+                if times[i] - last >= interval:
+                    keep.append(i)
+                    last = times[i]
+            if len(times) > 1:
+                keep.append(len(times) - 1)
+            self._trajectory = {name: [values[i] for i in keep] for name, values in self._trajectory.items()}
+            times = self._trajectory['time']
+        self.record_interval = interval
+        self._sim_output = None
+        logging.warning(
+            f"Trajectory exceeded the memory budget of {self.memory_budget} bytes; "
+            f"recording every {interval:.4g} time units from time {times[-1]:.2f}"
+        )
 
-            # returns casualties on each side
-            full_casualties = [self.rate_funcs[i](sizes, coef, i) for i in (0, 1)]
-            
-            # get amount of casualties
-            casualty = [abs(d) for d in full_casualties]
+    def save_checkpoint(self, path: Union[str, Path]) -> None:
+        """
+        Snapshot the simulation (time, sizes, morale, losses, RNG state and the trajectory so far)
+        into a compressed ``.npz`` file, replaced atomically so a pre-empted write never leaves a
+        torn checkpoint.
 
-            # get direction (should be negative unless reinforcements are involved)
-            dir = [1 if d >= 0 else -1 for d in full_casualties]
+        Args:
+            path (str | Path): Checkpoint file.
+        """
+        path = Path(path)
+        forces = [
+            {
+                'class': type(reg).__name__,
+                'size': reg.size,
+                'stats': '/'.join(str(d) for d in reg.stats),
+                'law': reg.law,
+                'frontage': reg.frontage,
+                'raw_morale': reg.raw_morale,
+            }
+            for reg in self.forces
+        ]
+        state = {
+            'version': 1,
+            'forces': forces,
+            'initial_size': list(self.casualties['initial_size']),
+            'end_time': self._end_time,
+            'front_width': self.front_width,
+            'rng': self.rng.bit_generator.state,
+            'events': self.events,
+            'event_seq': self._event_seq,
+            'pending_reinforcements': self._pending_reinforcements,
+            'n_events': self.n_events,
+            'memory_budget': self.memory_budget,
+            'record_interval': self.record_interval,
+            'morale_constants': {name: getattr(self, name) for name in self.MORALE_CONSTANTS},
+        }
+        tmp = path.with_name(path.name + ".tmp")
+        with open(tmp, "wb") as f:
+            np.savez_compressed(
+                f,
+                state=np.array(json.dumps(state)),
+                losses=self.casualties['losses'],
+                morale=self.casualties['morale'],
+                **{f"trajectory_{name}": np.asarray(values) for name, values in self._trajectory.items()}
+            )
+        os.replace(tmp, path)
+        logging.debug(f"Saved checkpoint at time {self._trajectory['time'][-1]:.4f} to {path}")
+
+    @classmethod
+    def resume(cls, path: Union[str, Path]) -> "Simulation":
+        """
+        Restore a simulation from a checkpoint written by ``save_checkpoint``. Calling
+        ``run_simulation()`` on it continues bit-exactly where the checkpointed run was.
 
-            # `exponential` here introduces the randomness and continuous-time aspect to the Markov chain by sampling the time to the next event from an exponential distribution, where the rate of that distribution is determined by the current casualty rates calculated from the Lanchester equations -- allowing for the simulation to model the inherently unpredictable nature of combat
-            clocks = [np.random.exponential(scale=1/r) for r in casualty]
+        Args:
+            path (str | Path): Checkpoint file.
 
-            # replace any NA in clocks with infinity
-            clocks = [c if c == c else float('inf') for c in clocks]
+        Returns:
+            Simulation: The restored simulation, with new Regiment instances.
 
-            # increment time by the minimum clock
-            t += min(clocks)
+        Raises:
+            ValueError: If the file is not a Simulation checkpoint.
+        """
+        with np.load(path) as data:
+            if 'state' not in data:
+                raise ValueError(f"{path} is not a Simulation checkpoint")
+            state = json.loads(data['state'].item())
+            arrays = {name: data[name] for name in data.files if name != 'state'}
+
+        forces = []
+        for spec in state['forces']:
+            reg = getattr(units, spec['class'], Regiment)(
+                spec['size'], spec['stats'], spec['law'], frontage=spec.get('frontage')
+            )
+            reg.raw_morale = spec['raw_morale']
+            forces.append(reg)
+
+        bit_generator = getattr(np.random, state['rng']['bit_generator'])()
+        bit_generator.state = state['rng']
+        sim = cls(
+            tuple(forces),
+            seed=np.random.Generator(bit_generator),
+            front_width=state.get('front_width'),
+            memory_budget=state.get('memory_budget'),
+            record_interval=state.get('record_interval')
+        )
+        sim.casualties['initial_size'] = state['initial_size']
+        sim.casualties['losses'] = arrays['losses']
+        sim.casualties['morale'] = arrays['morale']
+        sim._trajectory = {
+            name[len("trajectory_"):]: values.tolist()
+            for name, values in arrays.items() if name.startswith("trajectory_")
+        }
+        sim._end_time = state['end_time']
+        # the heap is stored in heap order, so it is still a heap
+        sim.events = [tuple(event) for event in state.get('events', [])]
+        sim._event_seq = state.get('event_seq', 0)
+        sim._pending_reinforcements = state.get('pending_reinforcements') or [
+            sum(event[4] for event in sim.events if event[2] == 'reinforce' and event[3] == side) for side in (0, 1)
+        ]
+        sim.n_events = state.get('n_events', len(sim._trajectory['time']) - 1)
+        for name, value in state.get('morale_constants', {}).items():
+            if value != getattr(cls, name):
+                setattr(sim, name, value)
+        logging.info(f"Resumed Simulation from {path} at time {sim._trajectory['time'][-1]:.4f}")
+        return sim
+
+    def run_simulation(
+        self,
+        time: Optional[float] = None,
+        checkpoint_path: Optional[Union[str, Path]] = None,
+        checkpoint_interval: float = 600.0,
+        profile_memory: bool = False
+    ) -> None:
+        """
+        Run the simulation from its current time until `time` or until a side is wiped out or routed.
 
-            # few steps:
-                #  1) figure out which side had the fastest time to trigger an event
-                #  2) tabulate to get a vector of same length as init with 1 on side it occurred
-                #  3) multiply the dir by that side to get directionality
-                #  4) add to init vector, killing 1st man from fastest side
-            tab = np.array([0, 0])
-            tab[np.argmin(clocks)] = 1
-            sizes = (np.array(sizes) + dir * tab).tolist()
-            
-            # update reg sizes in Regiment instances
-            reg1.update_size(sizes[0])
-            reg2.update_size(sizes[1])
-
-            # update regiment losses - if < 0, set to 0 else add to losses
-            if all(d <= 0 for d in dir):
-                self.casualties['losses'] += tab
-
-            # update coefficients for next loop iteration based on casualties taken and initial size
-            # passing time - t for delta_t to get time left in step, this way as delta_t approaches 0, the faster casualty rules have more impact (since formula is casualties / (1 + delta_t))
-            self.update_morale_losses(time-t)
-
-            # log current state to sim_output by adding a new row
-            new_row = {
-                'time': t,
-                'size_1': sizes[0],
-                'size_2': sizes[1],
-                'morale_1': self.casualties['morale'][0],
-                'morale_2': self.casualties['morale'][1]
-            }
-            self.sim_output = pd.concat([self.sim_output, pd.DataFrame([new_row])], ignore_index=True)
+        Args:
+            time (float, optional): Time to run until. May be omitted for a simulation restored
+                with ``resume``, which continues to the checkpointed run's time.
+            checkpoint_path (str | Path, optional): Save a checkpoint here every
+                `checkpoint_interval` seconds of wall-clock time, and once the run ends.
+            checkpoint_interval (float): Seconds between checkpoints. Defaults to 600.
+            profile_memory (bool): Trace allocations with tracemalloc and store the peak and
+                retained memory of the 'setup' and 'events' phases in ``memory_profile``. Slows
+                the run down; defaults to False.
+
+        Raises:
+            ValueError: If time is omitted and there is no run to continue.
+        """
+        if time is None:
+            time = self._end_time
+            if time is None:
+                raise ValueError("time is required unless the simulation was resumed from a checkpoint")
+        self._end_time = time
+
+        profile: Dict[str, Dict[str, Any]] = {}
+        phase = (lambda name: trace_memory(profile, name)) if profile_memory else (lambda name: nullcontext())
+
+        with phase('setup'):
+            if self.rate_funcs is None:
+                self.build_lanch_diffeq()
+
+        with phase('events'):
+            # deconstruct forces
+            reg1, reg2 = self.forces
 
-            # short circuit if either side is wiped out
-            if np.any(np.array(sizes) == 0) or np.any(self.casualties['morale'] <= 10):
-                if np.any(np.array(sizes) == 0):
-                    logging.info(f"Simulation ended at time {t:.2f} due to a regiment being wiped out. Final sizes: {sizes}")
+            # Init local time (continues a resumed or earlier run)
+            t = self._trajectory['time'][-1]
+            last_checkpoint = perf_counter()
+            if len(self._trajectory['time']) > 1 and (self._wiped_out() or np.any(self.casualties['morale'] <= 10)):
+                # the battle already ended (e.g. resumed from a final checkpoint)
+                t = time
+
+            while t < time:
+
+                sizes = [reg1.size, reg2.size]
+                coef = [reg1.coef, reg2.coef]
+
+                logging.debug(f"At time {t:.2f}, sizes: {sizes}, coefs: {coef}, morale: {self.casualties['morale'].tolist()}, stats: {reg1.stats}, {reg2.stats}")
+
+                # returns casualties on each side
+                full_casualties = [self.rate_funcs[i](sizes, coef, i) for i in (0, 1)]
+            
+                # get amount of casualties
+                casualty = [abs(d) for d in full_casualties]
+
+                # get direction (should be negative unless reinforcements are involved)
+                dir = [1 if d >= 0 else -1 for d in full_casualties]
+
+                # `exponential` here introduces the randomness and continuous-time aspect to the Markov chain by sampling the time to the next event from an exponential distribution, where the rate of that distribution is determined by the current casualty rates calculated from the Lanchester equations -- allowing for the simulation to model the inherently unpredictable nature of combat
+                # a zero rate (e.g. against a side still waiting for its reinforcements) never
+                # fires, and neither does a loss on a side with no men left
+                clocks = [
+                    self.rng.exponential(scale=1/r) if r > 0 and (sizes[i] > 0 or dir[i] > 0) else float('inf')
+                    for i, r in enumerate(casualty)
+                ]
+
+                # replace any NA in clocks with infinity
+                clocks = [c if c == c else float('inf') for c in clocks]
+
+                # a scheduled event due before the next casualty is applied first; the clocks are
+                # memoryless, so the ones drawn here are simply redrawn on the next step
+                if self.events and self.events[0][0] <= min(t + min(clocks), time):
+                    t = max(t, self._apply_next_event())
+                    sizes = [reg1.size, reg2.size]
+                elif min(clocks) == float('inf'):
+                    # nothing can happen before the end of the run
+                    break
                 else:
-                    logging.info(f"Simulation ended at time {t:.2f} due to a regiment's morale dropping to minimum. Final morale: {self.casualties['morale'].tolist()}")
-                break
+                    # increment time by the minimum clock
+                    t += min(clocks)
+
+                    # few steps:
+                        #  1) figure out which side had the fastest time to trigger an event
+                        #  2) tabulate to get a vector of same length as init with 1 on side it occurred
+                        #  3) multiply the dir by that side to get directionality
+                        #  4) add to init vector, killing 1st man from fastest side
+                    tab = np.array([0, 0])
+                    tab[np.argmin(clocks)] = 1
+                    sizes = (np.array(sizes) + dir * tab).tolist()
+            
+                    # update reg sizes in Regiment instances
+                    reg1.update_size(sizes[0])
+                    reg2.update_size(sizes[1])
+
+                    # update regiment losses - if < 0, set to 0 else add to losses
+                    if all(d <= 0 for d in dir):
+                        self.casualties['losses'] += tab
+
+                    # update coefficients for next loop iteration based on casualties taken and initial size
+                    # passing time - t for delta_t to get time left in step, this way as delta_t approaches 0, the faster casualty rules have more impact (since formula is casualties / (1 + delta_t))
+                    self.update_morale_losses(time-t)
+
+                # log current state to the trajectory
+                self.n_events += 1
+                self._record(t, sizes)
+
+                if checkpoint_path is not None and perf_counter() - last_checkpoint >= checkpoint_interval:
+                    self.save_checkpoint(checkpoint_path)
+                    last_checkpoint = perf_counter()
+
+                # short circuit if either side is wiped out
+                if self._wiped_out() or np.any(self.casualties['morale'] <= 10):
+                    if self._wiped_out():
+                        logging.info(f"Simulation ended at time {t:.2f} due to a regiment being wiped out. Final sizes: {sizes}")
+                    else:
+                        logging.info(f"Simulation ended at time {t:.2f} due to a regiment's morale dropping to minimum. Final morale: {self.casualties['morale'].tolist()}")
+                    break
+
+        if checkpoint_path is not None:
+            self.save_checkpoint(checkpoint_path)
+        if profile_memory:
+            self.memory_profile = profile
 
 if __name__ == "__main__":
     reg1 = Regiment(4000, '4/4/0/0', 'sq')
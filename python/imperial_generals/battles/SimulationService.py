@@ -0,0 +1,405 @@
+"""
+Asyncio service answering battle prediction requests with micro-batched simulation runs.
+"""
+
+# base libs
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Any, Deque, Dict, List, Optional, Tuple
+import asyncio
+import json
+import logging
+import os
+import time
+
+# ext libs
+import numpy as np
+
+# local imports
+from imperial_generals.battles.BatchRunner import BatchRunner
+
+# Inherit logging configuration from the main application
+logger = logging.getLogger(__name__)
+
+# Requests kept for the latency percentiles in ``metrics``
+LATENCY_WINDOW = 1000
+
+
+class SimulationService:
+    """
+    Local prediction service that keeps simulations off the event loop.
+
+    ``predict`` validates a matchup request and puts it on a bounded queue. A batcher task collects
+    the requests arriving within ``batch_window`` seconds (up to ``max_batch_size``) and splits
+    them into one task per worker, so the per-task IPC cost is paid once per worker and batch
+    rather than once per request; each caller's future is resolved from its task's result.
+    Compatible requests (same units, time, front width, events and seed, whatever their replicas)
+    are coalesced into one run of the most replicas any of them asked for: replica seeds only
+    depend on the scenario seed and the replica number (``BatchRunner.replica_seed``), so the
+    first n replicas of that run are exactly the run of n, and each caller is answered from its
+    prefix. A request joins a run while it is queued, or while it is running if the run has
+    enough replicas. Requests without a seed get a fixed default one, so predictions are
+    reproducible.
+
+    ``serve`` exposes the service as JSON lines over TCP or a Unix socket. Each line is a request
+    object (see ``BatchRunner.parse_scenario``) with an optional 'id' echoed in the response, or
+    ``{"op": "metrics"}``; responses ``{"id": ..., "result": {...}}`` or ``{"id": ..., "error":
+    {...}}`` are written as they complete, possibly out of order.
+
+    Attributes:
+        workers (int): Worker processes; 0 runs batches on a thread of this process.
+        batch_window (float): Seconds to wait for more requests after the first one of a batch.
+        max_batch_size (int): Maximum requests per batch.
+        max_queue (int): Maximum queued requests; further requests are rejected with QueueFull.
+        max_batches_in_flight (int): Batches submitted to the pool at once.
+        timeout (float): Default seconds a caller waits for its result.
+    """
+
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        batch_window: float = 0.005,
+        max_batch_size: int = 64,
+        max_queue: int = 1024,
+        max_batches_in_flight: Optional[int] = None,
+        timeout: float = 30.0
+    ) -> None:
+        """
+        Initialize the SimulationService (call ``start`` or use ``async with`` before predicting).
+
+        Args:
+            workers (int, optional): Worker processes. Defaults to the CPU count.
+            batch_window (float): Batching window in seconds. Defaults to 5 ms.
+            max_batch_size (int): Requests per batch. Defaults to 64.
+            max_queue (int): Queued requests before rejecting. Defaults to 1024.
+            max_batches_in_flight (int, optional): Concurrent batches. Defaults to twice the workers.
+            timeout (float): Default request timeout in seconds. Defaults to 30.
+
+        Raises:
+            ValueError: If a size or duration is not positive.
+        """
+        self.workers: int = (os.cpu_count() or 1) if workers is None else workers
+        if self.workers < 0:
+            raise ValueError("workers must be non-negative")
+        if batch_window < 0:
+            raise ValueError("batch_window must be non-negative")
+        if max_batch_size <= 0 or max_queue <= 0:
+            raise ValueError("max_batch_size and max_queue must be positive")
+        if timeout <= 0:
+            raise ValueError("timeout must be positive")
+        self.batch_window: float = batch_window
+        self.max_batch_size: int = max_batch_size
+        self.max_queue: int = max_queue
+        self.max_batches_in_flight: int = max_batches_in_flight or 2 * max(self.workers, 1)
+        self.timeout: float = timeout
+
+        self._queue: Optional[asyncio.Queue] = None
+        # request key -> latest run of that scenario, queued or running:
+        # {'scenario': dict, 'future': records of its replicas, 'dispatched': bool}
+        self._pending: Dict[str, Dict[str, Any]] = {}
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._pool: Optional[Executor] = None
+        self._batcher: Optional[asyncio.Task] = None
+        self._dispatches: set = set()
+        self._started_at: Optional[float] = None
+        self._counts: Dict[str, int] = dict.fromkeys(
+            ("requests", "coalesced", "rejected", "timeouts", "errors", "completed", "batches", "batched_requests"), 0
+        )
+        self._latencies: Deque[float] = deque(maxlen=LATENCY_WINDOW)
+
+    def __str__(self) -> str:
+        return f"SimulationService(workers={self.workers}, {'running' if self._batcher else 'stopped'})"
+
+    def __repr__(self) -> str:
+        return (
+            f"<SimulationService(workers={self.workers}, batch_window={self.batch_window}, "
+            f"max_batch_size={self.max_batch_size}, max_queue={self.max_queue}, timeout={self.timeout})>"
+        )
+
+    async def __aenter__(self) -> "SimulationService":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.stop()
+
+    async def start(self) -> None:
+        """Create the queue, the worker pool and the batcher task."""
+        if self._batcher is not None:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._slots = asyncio.Semaphore(self.max_batches_in_flight)
+        self._pool = ProcessPoolExecutor(max_workers=self.workers) if self.workers > 0 else None
+        self._started_at = time.perf_counter()
+        self._batcher = asyncio.create_task(self._run_batcher())
+        logger.info(f"Started {self!r}")
+
+    async def stop(self) -> None:
+        """Stop batching, fail queued requests, wait for running batches and shut the pool down."""
+        if self._batcher is None:
+            return
+        self._batcher.cancel()
+        try:
+            await self._batcher
+        except asyncio.CancelledError:
+            pass
+        self._batcher = None
+        while not self._queue.empty():
+            key, run = self._queue.get_nowait()
+            if self._pending.get(key) is run:
+                del self._pending[key]
+            if not run["future"].done():
+                run["future"].set_exception(RuntimeError("SimulationService stopped"))
+        if self._dispatches:
+            await asyncio.gather(*self._dispatches, return_exceptions=True)
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+        logger.info(f"Stopped {self!r}")
+
+    async def predict(self, request: Dict[str, Any], timeout: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Predict the outcome of a matchup.
+
+        Args:
+            request (dict): Scenario entry with 'units', 'time' and optionally 'replicas' and 'seed';
+                other keys (such as a client's 'id') are ignored.
+            timeout (float, optional): Seconds to wait. Defaults to the service timeout.
+
+        Returns:
+            dict: Summary over the replicas (see ``summarize``).
+
+        Raises:
+            ValueError: If the request is malformed.
+            asyncio.QueueFull: If the queue is full (the caller should back off).
+            TimeoutError: If the result is not ready in time.
+            RuntimeError: If the service is not running.
+        """
+        if self._batcher is None:
+            raise RuntimeError("SimulationService is not running")
+        if not isinstance(request, dict):
+            raise ValueError("request must be a dict")
+        request = {k: request[k] for k in ("units", "time", "replicas", "front_width", "events", "seed", "inputs") if k in request}
+        scenario = BatchRunner.parse_scenario(request, default_id="request")
+        replicas = scenario["replicas"]
+        # replicas are left out: runs of the same scenario share their replica prefix
+        key = json.dumps([scenario[k] for k in ("units", "time", "front_width", "events", "seed")], sort_keys=True)
+        started = time.perf_counter()
+        self._counts["requests"] += 1
+
+        run = self._pending.get(key)
+        if run is not None and (not run["dispatched"] or run["scenario"]["replicas"] >= replicas):
+            # a queued run grows to the largest request; a running one must already cover it
+            run["scenario"]["replicas"] = max(run["scenario"]["replicas"], replicas)
+            self._counts["coalesced"] += 1
+        else:
+            future = asyncio.get_running_loop().create_future()
+            # mark exceptions as retrieved in case every caller has timed out
+            future.add_done_callback(lambda f: f.cancelled() or f.exception())
+            run = {"scenario": scenario, "future": future, "dispatched": False}
+            try:
+                self._queue.put_nowait((key, run))
+            except asyncio.QueueFull:
+                self._counts["rejected"] += 1
+                raise
+            self._pending[key] = run
+
+        try:
+            # shielded: a caller timing out must not cancel the run other callers share
+            records = await asyncio.wait_for(asyncio.shield(run["future"]), timeout or self.timeout)
+            result = self.summarize(records[:replicas])
+        except TimeoutError:
+            self._counts["timeouts"] += 1
+            raise
+        except Exception:
+            self._counts["errors"] += 1
+            raise
+        self._counts["completed"] += 1
+        self._latencies.append(time.perf_counter() - started)
+        return result
+
+    async def _run_batcher(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.batch_window
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - loop.time()
+                try:
+                    batch.append(self._queue.get_nowait() if remaining <= 0 else
+                                 await asyncio.wait_for(self._queue.get(), remaining))
+                except (asyncio.QueueEmpty, TimeoutError):
+                    break
+            # bounded batches in flight; the queue absorbs (and then rejects) the rest
+            await self._slots.acquire()
+            task = asyncio.create_task(self._dispatch(batch))
+            self._dispatches.add(task)
+            task.add_done_callback(self._dispatches.discard)
+
+    async def _dispatch(self, batch: List[Tuple[str, Dict[str, Any]]]) -> None:
+        self._counts["batches"] += 1
+        self._counts["batched_requests"] += len(batch)
+        loop = asyncio.get_running_loop()
+        for _, run in batch:
+            # from here on the replica count is fixed; larger requests start a run of their own
+            run["dispatched"] = True
+        n_tasks = min(max(self.workers, 1), len(batch))
+        chunks = [batch[i::n_tasks] for i in range(n_tasks)]
+        try:
+            results = await asyncio.gather(
+                *(loop.run_in_executor(self._pool, SimulationService.simulate, [run["scenario"] for _, run in chunk])
+                  for chunk in chunks),
+                return_exceptions=True,
+            )
+        finally:
+            self._slots.release()
+        outcomes = []
+        for chunk, result in zip(chunks, results):
+            if isinstance(result, BaseException):
+                logger.error(f"Simulation batch failed: {result!r}")
+                outcomes.extend((item, None, result) for item in chunk)
+            else:
+                outcomes.extend((item, value, None) for item, value in zip(chunk, result))
+        for (key, run), result, error in outcomes:
+            if self._pending.get(key) is run:
+                del self._pending[key]
+            if run["future"].done():
+                continue
+            if error is not None:
+                run["future"].set_exception(error)
+            else:
+                run["future"].set_result(result)
+
+    @staticmethod
+    def simulate(scenarios: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+        """Run every replica of each scenario and return their records (executed in a worker)."""
+        return [[BatchRunner.run_replica(s, r) for r in range(s["replicas"])] for s in scenarios]
+
+    @staticmethod
+    def summarize(records: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Summarise the result records of a matchup's replicas.
+
+        Returns:
+            dict: 'replicas'; 'win_probability' of sides 1 and 2 and 'undecided' share; 'outcomes'
+                counts ('wipeout', 'rout', 'time'); 'mean_size' and 'mean_morale' per side;
+                'mean_end_time' and 'mean_events'.
+        """
+        winner = np.array([r["winner"] for r in records])
+        n = len(records)
+        return {
+            "replicas": n,
+            "win_probability": [float((winner == 1).mean()), float((winner == 2).mean())],
+            "undecided": float((winner == 0).mean()),
+            "outcomes": {o: sum(r["outcome"] == o for r in records) for o in ("wipeout", "rout", "time")},
+            "mean_size": [float(np.mean([r[f"size_{side}"] for r in records])) for side in (1, 2)],
+            "mean_morale": [float(np.mean([r[f"morale_{side}"] for r in records])) for side in (1, 2)],
+            "mean_end_time": float(np.mean([r["end_time"] for r in records])),
+            "mean_events": float(np.mean([r["events"] for r in records])),
+        }
+
+    def metrics(self) -> Dict[str, Any]:
+        """
+        Service counters, queue state, latency percentiles (last requests) and throughput.
+
+        Returns:
+            dict: Counters ('requests', 'coalesced', 'rejected', 'timeouts', 'errors', 'completed',
+                'batches'), 'mean_batch_size', 'queue_depth', 'batches_in_flight', 'latency_ms'
+                (p50/p95/p99/max) and 'throughput_rps' (completed requests per second of uptime).
+        """
+        uptime = time.perf_counter() - self._started_at if self._started_at is not None else 0.0
+        metrics: Dict[str, Any] = {name: count for name, count in self._counts.items() if name != "batched_requests"}
+        metrics["mean_batch_size"] = self._counts["batched_requests"] / max(self._counts["batches"], 1)
+        metrics["queue_depth"] = self._queue.qsize() if self._queue is not None else 0
+        metrics["batches_in_flight"] = len(self._dispatches)
+        if self._latencies:
+            p50, p95, p99 = np.percentile(np.array(self._latencies) * 1000, [50, 95, 99])
+            metrics["latency_ms"] = {
+                "p50": float(p50), "p95": float(p95), "p99": float(p99), "max": max(self._latencies) * 1000
+            }
+        else:
+            metrics["latency_ms"] = {}
+        metrics["uptime_s"] = uptime
+        metrics["throughput_rps"] = self._counts["completed"] / uptime if uptime > 0 else 0.0
+        return metrics
+
+    async def serve(
+        self,
+        host: Optional[str] = None,
+        port: Optional[int] = None,
+        path: Optional[str] = None,
+        max_requests_per_connection: int = 256
+    ) -> asyncio.AbstractServer:
+        """
+        Listen for JSON-lines requests on a Unix socket (path) or TCP (host, port).
+
+        Args:
+            host (str, optional): TCP host. Defaults to 127.0.0.1.
+            port (int, optional): TCP port (0 picks a free one).
+            path (str, optional): Unix socket path; takes precedence over host/port.
+            max_requests_per_connection (int): Unanswered requests per connection before the
+                service stops reading from it. Defaults to 256.
+
+        Returns:
+            asyncio.AbstractServer: The started server.
+        """
+        await self.start()
+
+        async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+            slots = asyncio.Semaphore(max_requests_per_connection)
+            tasks = set()
+
+            async def answer(line: bytes) -> None:
+                response: Dict[str, Any] = {"id": None}
+                try:
+                    message = json.loads(line)
+                    if not isinstance(message, dict):
+                        raise ValueError("request must be a JSON object")
+                    response["id"] = message.get("id")
+                    if message.get("op", "predict") == "metrics":
+                        response["result"] = self.metrics()
+                    else:
+                        response["result"] = await self.predict(message, message.get("timeout"))
+                except Exception as e:
+                    response["error"] = {"type": type(e).__name__, "message": str(e)}
+                finally:
+                    slots.release()
+                writer.write(json.dumps(response).encode() + b"\n")
+                await writer.drain()
+
+            try:
+                while line := await reader.readline():
+                    if not line.strip():
+                        continue
+                    await slots.acquire()
+                    task = asyncio.create_task(answer(line))
+                    tasks.add(task)
+                    task.add_done_callback(tasks.discard)
+                if tasks:
+                    await asyncio.gather(*tasks, return_exceptions=True)
+            except (ConnectionError, asyncio.LimitOverrunError, ValueError) as e:
+                logger.warning(f"Dropping connection: {e}")
+            finally:
+                writer.close()
+
+        if path is not None:
+            server = await asyncio.start_unix_server(handle, path=path)
+        else:
+            server = await asyncio.start_server(handle, host or "127.0.0.1", port or 0)
+        logger.info(f"Serving on {path or server.sockets[0].getsockname()}")
+        return server
+
+
+if __name__ == "__main__":
+    async def demo() -> None:
+        request = {
+            "units": [{"size": 500, "stats": "4/5/2/1", "law": "sq"}, {"size": 400, "stats": "3/6/1/0", "law": "sq"}],
+            "time": 0.5,
+            "replicas": 20,
+        }
+        async with SimulationService(workers=2) as service:
+            results = await asyncio.gather(*(service.predict({**request, "seed": i % 4}) for i in range(16)))
+            print(results[0])
+            print(service.metrics())
+
+    asyncio.run(demo())
@@ -0,0 +1,164 @@
+"""
+Reading trajectory datasets written by TrajectoryWriter.
+"""
+
+# base libs
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Union
+from urllib.parse import unquote
+import json
+import logging
+
+# ext libs
+import numpy as np
+
+# local imports
+from imperial_generals.battles.TrajectoryWriter import METADATA_KEY, TRAJECTORY_DTYPES, _import_pyarrow, matchup_dir
+
+# Inherit logging configuration from the main application
+logger = logging.getLogger(__name__)
+
+
+class TrajectoryReader:
+    """
+    Reads a Parquet trajectory dataset, selecting matchups by partition directory (only their files
+    are opened) and replicas with a row filter pushed down to the row groups. Files can be
+    memory-mapped instead of read into memory.
+
+    Attributes:
+        root (Path): Dataset directory.
+        memory_map (bool): Memory-map part files when reading.
+    """
+
+    def __init__(self, root: Union[str, Path], memory_map: bool = False) -> None:
+        """
+        Initialize the TrajectoryReader.
+
+        Args:
+            root (str | Path): Dataset directory.
+            memory_map (bool): Memory-map part files when reading. Defaults to False.
+
+        Raises:
+            ImportError: If pyarrow is not installed.
+            FileNotFoundError: If root does not exist.
+        """
+        self._pa, self._pq = _import_pyarrow()
+        self.root: Path = Path(root)
+        if not self.root.is_dir():
+            raise FileNotFoundError(f"No trajectory dataset at {self.root}")
+        self.memory_map: bool = memory_map
+
+    def __str__(self) -> str:
+        return f"TrajectoryReader({self.root})"
+
+    def __repr__(self) -> str:
+        return f"<TrajectoryReader(root={str(self.root)!r}, memory_map={self.memory_map})>"
+
+    def matchups(self) -> List[str]:
+        """Matchup ids in the dataset, sorted."""
+        return sorted(
+            unquote(d.name.split("=", 1)[1])
+            for d in self.root.glob("matchup=*")
+            if any(d.glob("part-*.parquet"))
+        )
+
+    def _parts(self, matchup: str) -> List[Path]:
+        # part names sort in the order the writers created them
+        return sorted(matchup_dir(self.root, matchup).glob("part-*.parquet"))
+
+    def metadata(self, matchup: str) -> Dict[str, Any]:
+        """
+        Metadata stored with a matchup.
+
+        Raises:
+            KeyError: If the matchup is not in the dataset.
+        """
+        parts = self._parts(matchup)
+        if not parts:
+            raise KeyError(f"Unknown matchup: {matchup!r}")
+        for part in parts:
+            meta = json.loads(self._pq.read_schema(part).metadata[METADATA_KEY])['metadata']
+            if meta:
+                return meta
+        return {}
+
+    def iter_batches(
+        self,
+        matchups: Optional[Iterable[str]] = None,
+        replicas: Optional[Sequence[int]] = None,
+        columns: Optional[Sequence[str]] = None
+    ) -> Iterator[Any]:
+        """
+        Stream the selected rows as pyarrow Tables, one per part file, with a 'matchup' column.
+
+        Args:
+            matchups (Iterable[str], optional): Matchups to read. Defaults to all.
+            replicas (Sequence[int], optional): Replicas to keep. Defaults to all.
+            columns (Sequence[str], optional): Stored columns to read. Defaults to all.
+
+        Yields:
+            pyarrow.Table: Rows of one part file.
+        """
+        pa = self._pa
+        columns = list(TRAJECTORY_DTYPES) if columns is None else list(columns)
+        unknown = set(columns) - set(TRAJECTORY_DTYPES)
+        if unknown:
+            raise ValueError(f"Unknown columns: {sorted(unknown)}")
+        filters = None if replicas is None else [('replica', 'in', [int(r) for r in replicas])]
+        for matchup in (self.matchups() if matchups is None else matchups):
+            for part in self._parts(matchup):
+                table = self._pq.read_table(part, columns=columns, filters=filters, memory_map=self.memory_map)
+                if table.num_rows == 0:
+                    continue
+                ids = pa.DictionaryArray.from_arrays(
+                    pa.array(np.zeros(table.num_rows, dtype=np.int32)), pa.array([matchup])
+                )
+                yield table.replace_schema_metadata(None).append_column('matchup', ids)
+
+    def read(
+        self,
+        matchups: Optional[Iterable[str]] = None,
+        replicas: Optional[Sequence[int]] = None,
+        columns: Optional[Sequence[str]] = None
+    ) -> Any:
+        """
+        Read the selected rows into one pyarrow Table (see ``iter_batches`` for the arguments).
+
+        Returns:
+            pyarrow.Table: Stored columns plus a dictionary-encoded 'matchup' column.
+        """
+        tables = list(self.iter_batches(matchups, replicas, columns))
+        if not tables:
+            columns = list(TRAJECTORY_DTYPES) if columns is None else list(columns)
+            schema = self._pa.schema(
+                [(name, self._pa.from_numpy_dtype(TRAJECTORY_DTYPES[name])) for name in columns]
+                + [('matchup', self._pa.dictionary(self._pa.int32(), self._pa.string()))]
+            )
+            return schema.empty_table()
+        return self._pa.concat_tables(tables, promote_options="permissive").unify_dictionaries()
+
+    def trajectory(self, matchup: str, replica: int) -> Dict[str, np.ndarray]:
+        """
+        One replica's history as NumPy arrays, in the layout of ``Simulation.trajectory``.
+
+        Raises:
+            KeyError: If the replica is not in the dataset.
+        """
+        table = self.read([matchup], [replica])
+        if table.num_rows == 0:
+            raise KeyError(f"No trajectory for matchup {matchup!r}, replica {replica}")
+        columns = {
+            name: table.column(name).to_numpy()
+            for name in TRAJECTORY_DTYPES if name != 'replica'
+        }
+        # parts written by concurrent writers may interleave; time orders the rows of a replica
+        order = np.argsort(columns['time'], kind='stable')
+        return {name: column[order] for name, column in columns.items()}
+
+
+if __name__ == "__main__":
+    import sys
+
+    reader = TrajectoryReader(sys.argv[1] if len(sys.argv) > 1 else "trajectories")
+    for matchup in reader.matchups():
+        print(matchup, reader.metadata(matchup), reader.read([matchup], columns=['replica']).num_rows, "rows")
@@ -0,0 +1,251 @@
+"""
+Streaming Parquet export of simulation trajectories.
+"""
+
+# base libs
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, List, Mapping, Optional, Union
+from urllib.parse import quote
+import json
+import logging
+import os
+import shutil
+import time
+
+# ext libs
+import numpy as np
+
+if TYPE_CHECKING:
+    from imperial_generals.battles.Simulation import Simulation
+
+# Inherit logging configuration from the main application
+logger = logging.getLogger(__name__)
+
+# Stored columns and their compact dtypes
+TRAJECTORY_DTYPES = {
+    'replica': np.int32,
+    'time': np.float32,
+    'size_1': np.int32,
+    'size_2': np.int32,
+    'morale_1': np.float32,
+    'morale_2': np.float32,
+}
+
+# Parquet schema metadata key holding the matchup id and metadata as JSON
+METADATA_KEY = b"imperial_generals.matchup"
+
+
+def _import_pyarrow():
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise ImportError("Parquet trajectories require pyarrow (pip install pyarrow)") from e
+    return pa, pq
+
+
+def matchup_dir(root: Path, matchup: str) -> Path:
+    """Partition directory of a matchup (hive style, ``matchup=<url-quoted id>``)."""
+    return root / f"matchup={quote(matchup, safe='')}"
+
+
+class TrajectoryWriter:
+    """
+    Streams simulation trajectories into a Parquet dataset partitioned by matchup.
+
+    Rows are buffered per matchup and written as one row group whenever a buffer reaches
+    ``row_group_size`` rows, so memory stays bounded however many replicas are written. Each writer
+    session adds its own part files per matchup, named
+    ``<root>/matchup=<id>/part-<session start in ns>-<pid>-<sequence>.parquet`` so that sorting
+    the names gives the order they were written in (rows of one replica may span parts); a part is written under a temporary name and renamed on close, so readers never see a partial
+    file and several processes can write to the same dataset. The matchup metadata (units, seeds,
+    ...) is stored as JSON in the schema metadata of every part.
+
+    Use as a context manager, or call ``close`` when done.
+
+    Attributes:
+        root (Path): Dataset directory.
+        row_group_size (int): Rows per Parquet row group.
+        max_buffered_rows (int): Rows buffered over all matchups; beyond that the largest buffer is
+            written early as a smaller row group.
+        max_open_files (int): Matchup part files kept open at once; the least recently written
+            one is closed beyond that (a later write to it starts a new part).
+        compression (str): Parquet compression codec.
+    """
+
+    def __init__(
+        self,
+        root: Union[str, Path],
+        row_group_size: int = 65_536,
+        max_open_files: int = 64,
+        max_buffered_rows: Optional[int] = None,
+        compression: str = "zstd",
+        overwrite: bool = False
+    ) -> None:
+        """
+        Initialize the TrajectoryWriter.
+
+        Args:
+            root (str | Path): Dataset directory (created if missing).
+            row_group_size (int): Rows per row group. Defaults to 65536.
+            max_open_files (int): Part files open at once. Defaults to 64.
+            max_buffered_rows (int, optional): Rows buffered in total. Defaults to four row groups.
+            compression (str): Parquet compression codec. Defaults to 'zstd'.
+            overwrite (bool): Delete the existing matchup partitions first; otherwise new parts are added to it.
+
+        Raises:
+            ImportError: If pyarrow is not installed.
+            ValueError: If row_group_size or max_open_files is not positive.
+        """
+        self._pa, self._pq = _import_pyarrow()
+        if row_group_size <= 0:
+            raise ValueError("row_group_size must be positive")
+        if max_open_files <= 0:
+            raise ValueError("max_open_files must be positive")
+        self.root: Path = Path(root)
+        self.row_group_size: int = row_group_size
+        self.max_open_files: int = max_open_files
+        self.max_buffered_rows: int = max_buffered_rows or 4 * row_group_size
+        self.compression: str = compression
+        self.root.mkdir(parents=True, exist_ok=True)
+        if overwrite:
+            for partition in self.root.glob("matchup=*"):
+                shutil.rmtree(partition)
+
+        self._schema = self._pa.schema([(name, self._pa.from_numpy_dtype(dtype)) for name, dtype in TRAJECTORY_DTYPES.items()])
+        self._buffers: Dict[str, List[Dict[str, np.ndarray]]] = {} # matchup -> pending column chunks
+        self._buffered_rows: Dict[str, int] = {}
+        self._metadata: Dict[str, Dict[str, Any]] = {}
+        self._files: Dict[str, Any] = {} # matchup -> open ParquetWriter, least recently written first
+        self._paths: Dict[str, Path] = {} # matchup -> temporary path of its open part
+        self.rows_written: int = 0
+        self._session: str = f"{time.time_ns():020d}-{os.getpid()}"
+        self._next_part: int = 0
+
+    def __str__(self) -> str:
+        return f"TrajectoryWriter({self.root})"
+
+    def __repr__(self) -> str:
+        return (
+            f"<TrajectoryWriter(root={str(self.root)!r}, row_group_size={self.row_group_size}, "
+            f"open_files={len(self._files)}, rows_written={self.rows_written})>"
+        )
+
+    def __enter__(self) -> "TrajectoryWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def write(
+        self,
+        trajectory: Union["Simulation", Mapping[str, Any]],
+        matchup: str,
+        replica: int,
+        metadata: Optional[Dict[str, Any]] = None
+    ) -> None:
+        """
+        Add one replica's trajectory.
+
+        Args:
+            trajectory (Simulation | Mapping[str, array-like]): A simulation, or its ``trajectory``
+                (columns time, size_1, size_2, morale_1, morale_2).
+            matchup (str): Matchup id (the partition key).
+            replica (int): Replica number, stored on every row.
+            metadata (dict, optional): JSON-serialisable matchup metadata; the first metadata given
+                for a matchup is kept.
+
+        Raises:
+            ValueError: If columns are missing or of different lengths.
+        """
+        if hasattr(trajectory, "trajectory"):
+            trajectory = trajectory.trajectory
+        columns = {}
+        for name, dtype in TRAJECTORY_DTYPES.items():
+            if name == 'replica':
+                continue
+            if name not in trajectory:
+                raise ValueError(f"trajectory is missing column {name!r}")
+            columns[name] = np.asarray(trajectory[name], dtype=dtype)
+        lengths = {len(column) for column in columns.values()}
+        if len(lengths) != 1:
+            raise ValueError("trajectory columns must have the same length")
+        n = lengths.pop()
+        columns = {'replica': np.full(n, replica, dtype=np.int32), **columns}
+
+        if metadata is not None:
+            self._metadata.setdefault(matchup, metadata)
+        self._buffers.setdefault(matchup, []).append(columns)
+        self._buffered_rows[matchup] = self._buffered_rows.get(matchup, 0) + n
+        while self._buffered_rows.get(matchup, 0) >= self.row_group_size:
+            self._write_row_group(matchup, self.row_group_size)
+        while sum(self._buffered_rows.values()) > self.max_buffered_rows:
+            self._write_row_group(max(self._buffered_rows, key=self._buffered_rows.get))
+
+    def _write_row_group(self, matchup: str, rows: Optional[int] = None) -> None:
+        """Write the first rows (default: all) of a matchup's buffer as one row group."""
+        chunks = self._buffers.pop(matchup, [])
+        merged = {name: np.concatenate([c[name] for c in chunks]) for name in TRAJECTORY_DTYPES}
+        total = len(merged['replica'])
+        rows = total if rows is None else min(rows, total)
+        if rows < total:
+            self._buffers[matchup] = [{name: column[rows:] for name, column in merged.items()}]
+            self._buffered_rows[matchup] = total - rows
+        else:
+            self._buffered_rows.pop(matchup, None)
+        if rows == 0:
+            return
+
+        writer = self._files.pop(matchup, None)
+        if writer is None:
+            if len(self._files) >= self.max_open_files:
+                self._close_part(next(iter(self._files)))
+            directory = matchup_dir(self.root, matchup)
+            directory.mkdir(exist_ok=True)
+            path = directory / f"part-{self._session}-{self._next_part:06d}.parquet.tmp"
+            self._next_part += 1
+            meta = {'matchup': matchup, 'metadata': self._metadata.get(matchup, {})}
+            schema = self._schema.with_metadata({METADATA_KEY: json.dumps(meta).encode()})
+            writer = self._pq.ParquetWriter(path, schema, compression=self.compression)
+            self._paths[matchup] = path
+        # re-inserted last: dict order tracks the least recently written file
+        self._files[matchup] = writer
+
+        table = self._pa.Table.from_arrays(
+            [self._pa.array(merged[name][:rows]) for name in TRAJECTORY_DTYPES], schema=writer.schema
+        )
+        writer.write_table(table, row_group_size=rows)
+        self.rows_written += rows
+
+    def _close_part(self, matchup: str) -> None:
+        self._files.pop(matchup).close()
+        path = self._paths.pop(matchup)
+        os.replace(path, path.with_suffix(""))
+
+    def flush(self) -> None:
+        """Write all buffered rows and finalise the open part files."""
+        for matchup in list(self._buffers):
+            self._write_row_group(matchup)
+        for matchup in list(self._files):
+            self._close_part(matchup)
+
+    def close(self) -> None:
+        """Flush; the writer can still be used afterwards (new writes start new parts)."""
+        self.flush()
+        logger.info(f"Wrote {self.rows_written} trajectory rows to {self.root}")
+
+
+if __name__ == "__main__":
+    import tempfile
+    from imperial_generals.units import Regiment
+    from imperial_generals.battles.Simulation import Simulation
+    from imperial_generals.battles.TrajectoryReader import TrajectoryReader
+
+    with tempfile.TemporaryDirectory() as tmp:
+        with TrajectoryWriter(tmp, row_group_size=10_000) as writer:
+            for replica in range(20):
+                sim = Simulation((Regiment(1000, '4/5/2/1', 'sq'), Regiment(800, '3/6/1/0', 'sq')), seed=replica)
+                sim.run_simulation(time=1)
+                writer.write(sim, matchup="1000 sq vs 800 sq", replica=replica, metadata={'time': 1})
+        reader = TrajectoryReader(tmp)
+        print(reader.matchups(), reader.read().num_rows, "rows")
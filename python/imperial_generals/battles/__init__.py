@@ -1,5 +1,21 @@
 from .Simulation import Simulation
+from .BatchRunner import BatchRunner
+from .SimulationService import SimulationService
+from .CampaignScheduler import CampaignScheduler
+from .EquivalenceHarness import EquivalenceHarness
+from .EnginePlanner import EnginePlanner
+from .SensitivityAnalysis import SensitivityAnalysis
+from .TrajectoryWriter import TrajectoryWriter
+from .TrajectoryReader import TrajectoryReader
 
 __all__ = [
     'Simulation',
-]
\ No newline at end of file
+    'BatchRunner',
+    'SimulationService',
+    'CampaignScheduler',
+    'EquivalenceHarness',
+    'EnginePlanner',
+    'SensitivityAnalysis',
+    'TrajectoryWriter',
+    'TrajectoryReader',
+]
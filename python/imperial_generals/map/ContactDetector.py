@@ -0,0 +1,296 @@
+"""
+Contact detection between moving armies on the Voronoi map.
+"""
+
+# base libs
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Tuple
+import logging
+
+# ext libs
+import numpy as np
+
+# local imports
+from imperial_generals.map.VoronoiMap import VoronoiMap
+
+# Inherit logging configuration from the main application
+logger = logging.getLogger(__name__)
+
+# Offsets of the neighbouring hash buckets visited from each bucket (each unordered pair once)
+_FORWARD_BUCKETS = ((1, -1), (1, 0), (1, 1), (0, 1))
+
+
+def _group_pairs(
+    starts: np.ndarray, counts: np.ndarray, group_a: np.ndarray, group_b: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Every pair of one member of group a and one of group b, for each (a, b) in the group pairs.
+
+    Members are positions in an array sorted by group, with group g at
+    ``starts[g]:starts[g] + counts[g]``; the pairs are returned as two aligned position arrays.
+    """
+    n_pairs = counts[group_a] * counts[group_b]
+    offsets = np.cumsum(n_pairs) - n_pairs
+    k = np.arange(n_pairs.sum()) - np.repeat(offsets, n_pairs)
+    width = np.repeat(counts[group_b], n_pairs)
+    return np.repeat(starts[group_a], n_pairs) + k // width, np.repeat(starts[group_b], n_pairs) + k % width
+
+
+def _grouped(keys: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Sort order of keys, and the unique keys with the start and size of each group."""
+    order = np.argsort(keys, kind="stable")
+    unique, starts, counts = np.unique(keys[order], return_index=True, return_counts=True)
+    return order, unique, starts, counts
+
+
+class ContactDetector:
+    """
+    Finds which armies come into contact on each campaign tick.
+
+    Positions, factions and cells of all armies are kept in NumPy arrays indexed by slot, and
+    moving armies only relocates (KD-tree lookup) the armies that moved. Two armies of different
+    factions are in contact when they stand in the same or adjacent Voronoi cells and, if a
+    ``contact_range`` is set, no further apart than that.
+
+    Candidate pairs come from one of two broad phases, each a sort plus work proportional to the
+    candidates, instead of comparing all pairs:
+        - Without a contact range, armies are grouped by cell and paired with the armies of their
+          own cell and of every adjacent cell (each edge of the cell adjacency graph once).
+        - With a contact range, armies are hashed into a uniform grid of ``contact_range``
+          buckets and paired within each bucket and its eight neighbours; the pairs are then
+          kept only if their cells are the same or adjacent.
+
+    Attributes:
+        contact_range (float | None): Maximum distance between armies in contact.
+        n_armies (int): Number of armies tracked.
+    """
+
+    def __init__(self, voronoi: VoronoiMap, contact_range: Optional[float] = None, capacity: int = 1024) -> None:
+        """
+        Initialize the ContactDetector from a generated VoronoiMap.
+
+        Args:
+            voronoi (VoronoiMap): Map whose diagram has been generated.
+            contact_range (float, optional): Maximum contact distance. Defaults to None (cells only).
+            capacity (int): Initial number of army slots; grown as needed.
+
+        Raises:
+            ValueError: If contact_range or capacity is not positive.
+        """
+        if contact_range is not None and contact_range <= 0:
+            raise ValueError("contact_range must be positive")
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self.voronoi: VoronoiMap = voronoi
+        self.contact_range: Optional[float] = contact_range
+        self.indptr, self.indices = voronoi.get_adjacency()
+        n_cells = len(self.indptr) - 1
+        sources = np.repeat(np.arange(n_cells), np.diff(self.indptr))
+        # sorted keys of the directed edges (the CSR arrays are sorted by source, then target)
+        self._edge_keys: np.ndarray = sources.astype(np.int64) * n_cells + self.indices
+        self._n_cells: int = n_cells
+
+        self.positions: np.ndarray = np.zeros((capacity, 2))
+        self.cells: np.ndarray = np.full(capacity, -1, dtype=np.intp)
+        self.factions: np.ndarray = np.full(capacity, -1, dtype=np.intp)
+        self._ids: List[Optional[Hashable]] = [None] * capacity
+        self._slots: Dict[Hashable, int] = {}
+        self._free: List[int] = list(range(capacity - 1, -1, -1))
+        self._faction_codes: Dict[Hashable, int] = {}
+        self._contacts: np.ndarray = np.empty(0, dtype=np.int64) # pair keys as of the last update
+        logger.info(f"Initialized ContactDetector over {n_cells} cells (contact_range={contact_range})")
+
+    def __str__(self) -> str:
+        return f"ContactDetector with {self.n_armies} armies, {len(self._contacts)} contacts"
+
+    def __repr__(self) -> str:
+        return f"<ContactDetector(cells={self._n_cells}, armies={self.n_armies}, contact_range={self.contact_range})>"
+
+    @property
+    def n_armies(self) -> int:
+        return len(self._slots)
+
+    def _grow(self, needed: int) -> None:
+        old = len(self.cells)
+        capacity = max(2 * old, old + needed)
+        self.positions = np.concatenate([self.positions, np.zeros((capacity - old, 2))])
+        self.cells = np.concatenate([self.cells, np.full(capacity - old, -1, dtype=np.intp)])
+        self.factions = np.concatenate([self.factions, np.full(capacity - old, -1, dtype=np.intp)])
+        self._ids.extend([None] * (capacity - old))
+        self._free = list(range(capacity - 1, old - 1, -1)) + self._free
+
+    def _lookup(self, ids: Iterable[Hashable]) -> np.ndarray:
+        try:
+            return np.fromiter((self._slots[army_id] for army_id in ids), dtype=np.intp)
+        except KeyError as e:
+            raise KeyError(f"Unknown army: {e.args[0]!r}") from None
+
+    def add(self, ids: Iterable[Hashable], positions: Any, factions: Iterable[Hashable]) -> None:
+        """
+        Start tracking armies.
+
+        Args:
+            ids (Iterable[Hashable]): Unique army ids (e.g. names).
+            positions (Any): Array-like of shape (n, 2) with their (x, y) positions.
+            factions (Iterable[Hashable]): Faction of each army (e.g. ``Army.faction``).
+
+        Raises:
+            ValueError: If an id is already tracked or the lengths differ.
+        """
+        ids, factions = list(ids), list(factions)
+        positions = np.asarray(positions, dtype=float).reshape(-1, 2)
+        if not len(ids) == len(positions) == len(factions):
+            raise ValueError("ids, positions and factions must have the same length")
+        if len(set(ids)) != len(ids) or any(army_id in self._slots for army_id in ids):
+            raise ValueError("army ids must be unique")
+        if len(ids) > len(self._free):
+            self._grow(len(ids) - len(self._free))
+
+        slots = np.array([self._free.pop() for _ in ids], dtype=np.intp)
+        for slot, army_id in zip(slots.tolist(), ids):
+            self._ids[slot] = army_id
+            self._slots[army_id] = slot
+        codes = [self._faction_codes.setdefault(faction, len(self._faction_codes)) for faction in factions]
+        self.factions[slots] = codes
+        self.positions[slots] = positions
+        self.cells[slots] = self.voronoi.locate_points(positions)
+
+    def move(self, ids: Iterable[Hashable], positions: Any) -> None:
+        """
+        Update the positions of some armies; only those that actually moved are relocated.
+
+        Args:
+            ids (Iterable[Hashable]): Ids of the armies that moved.
+            positions (Any): Array-like of shape (n, 2) with their new positions.
+
+        Raises:
+            KeyError: If an army is not tracked.
+        """
+        slots = self._lookup(ids)
+        positions = np.asarray(positions, dtype=float).reshape(-1, 2)
+        if len(slots) != len(positions):
+            raise ValueError("ids and positions must have the same length")
+        moved = np.any(self.positions[slots] != positions, axis=1)
+        slots, positions = slots[moved], positions[moved]
+        self.positions[slots] = positions
+        self.cells[slots] = self.voronoi.locate_points(positions)
+
+    def remove(self, ids: Iterable[Hashable]) -> None:
+        """
+        Stop tracking armies (e.g. destroyed or merged), dropping their contacts.
+
+        Raises:
+            KeyError: If an army is not tracked.
+        """
+        slots = self._lookup(ids)
+        for slot in slots.tolist():
+            del self._slots[self._ids[slot]]
+            self._ids[slot] = None
+            self._free.append(slot)
+        self.cells[slots] = -1
+        self.factions[slots] = -1
+        first, second = self._contacts >> 32, self._contacts & 0xFFFFFFFF
+        self._contacts = self._contacts[~(np.isin(first, slots) | np.isin(second, slots))]
+
+    def position(self, army_id: Hashable) -> np.ndarray:
+        """Position of an army."""
+        return self.positions[self._lookup([army_id])[0]].copy()
+
+    def cell(self, army_id: Hashable) -> int:
+        """Cell of an army (-1 if it is off the map)."""
+        return int(self.cells[self._lookup([army_id])[0]])
+
+    def _candidates(self, slots: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Broad phase: candidate slot pairs among the given (on-map) slots."""
+        if self.contact_range is None:
+            order, cells, starts, counts = _grouped(self.cells[slots])
+            group_of = np.full(self._n_cells, -1, dtype=np.intp)
+            group_of[cells] = np.arange(len(cells))
+            # occupied cells paired with themselves and with each occupied neighbour of a higher index
+            degrees = self.indptr[cells + 1] - self.indptr[cells]
+            sources = np.repeat(cells, degrees)
+            edges = np.arange(degrees.sum()) + np.repeat(self.indptr[cells] - (np.cumsum(degrees) - degrees), degrees)
+            neighbours = self.indices[edges]
+            keep = (neighbours > sources) & (group_of[neighbours] >= 0)
+            group_a = np.concatenate([np.arange(len(cells)), group_of[sources[keep]]])
+            group_b = np.concatenate([np.arange(len(cells)), group_of[neighbours[keep]]])
+        else:
+            buckets = np.floor(self.positions[slots] / self.contact_range).astype(np.int64) + 1
+            n_rows = int(buckets[:, 1].max()) + 2 if len(slots) else 1
+            keys = buckets[:, 0] * n_rows + buckets[:, 1]
+            order, unique, starts, counts = _grouped(keys)
+            neighbour_groups = []
+            for dx, dy in _FORWARD_BUCKETS:
+                target = unique + dx * n_rows + dy
+                found = np.minimum(np.searchsorted(unique, target), len(unique) - 1)
+                hit = unique[found] == target if len(unique) else np.zeros(0, dtype=bool)
+                neighbour_groups.append((np.flatnonzero(hit), found[hit]))
+            group_a = np.concatenate([np.arange(len(unique))] + [a for a, _ in neighbour_groups])
+            group_b = np.concatenate([np.arange(len(unique))] + [b for _, b in neighbour_groups])
+
+        i, j = _group_pairs(starts, counts, group_a, group_b)
+        # within a group, each unordered pair once
+        same = np.repeat(group_a == group_b, counts[group_a] * counts[group_b])
+        keep = ~same | (i < j)
+        return slots[order[i[keep]]], slots[order[j[keep]]]
+
+    def contacts(self) -> np.ndarray:
+        """
+        Narrow phase: slot pairs of armies currently in contact.
+
+        Returns:
+            np.ndarray: Sorted pair keys ``(low slot << 32) | high slot``.
+        """
+        slots = np.flatnonzero(self.cells >= 0)
+        a, b = self._candidates(slots)
+        keep = self.factions[a] != self.factions[b]
+        if self.contact_range is not None:
+            delta = self.positions[a] - self.positions[b]
+            keep &= np.einsum("ij,ij->i", delta, delta) <= self.contact_range ** 2
+            # the cells must be the same or adjacent
+            cell_a, cell_b = self.cells[a], self.cells[b]
+            edge_keys = cell_a.astype(np.int64) * self._n_cells + cell_b
+            found = np.minimum(np.searchsorted(self._edge_keys, edge_keys), max(len(self._edge_keys) - 1, 0))
+            adjacent = self._edge_keys[found] == edge_keys if len(self._edge_keys) else np.zeros(len(a), dtype=bool)
+            keep &= (cell_a == cell_b) | adjacent
+        a, b = a[keep], b[keep]
+        low, high = np.minimum(a, b).astype(np.int64), np.maximum(a, b).astype(np.int64)
+        return np.unique((low << 32) | high)
+
+    def update(self) -> List[Tuple[Hashable, Hashable]]:
+        """
+        Detect contacts for this tick.
+
+        Returns:
+            List[Tuple[Hashable, Hashable]]: Pairs of army ids that came into contact since the last
+                update (new engagements); pairs still in contact are not repeated.
+        """
+        current = self.contacts()
+        new = np.setdiff1d(current, self._contacts, assume_unique=True)
+        self._contacts = current
+        logger.debug(f"{len(current)} contacts, {len(new)} new")
+        return [(self._ids[key >> 32], self._ids[key & 0xFFFFFFFF]) for key in new.tolist()]
+
+    def engaged(self) -> List[Tuple[Hashable, Hashable]]:
+        """Pairs of army ids in contact as of the last update."""
+        return [(self._ids[key >> 32], self._ids[key & 0xFFFFFFFF]) for key in self._contacts.tolist()]
+
+
+if __name__ == "__main__":
+    from imperial_generals.map.PoissonDiscSampler import PoissonDiscSampler
+
+    points = PoissonDiscSampler.generate(1000, 1000, 20, seed=1)
+    voronoi = VoronoiMap(points, width=1000, height=1000)
+    voronoi.generate_diagram()
+
+    rng = np.random.default_rng(0)
+    n = 5000
+    positions = rng.uniform(0, 1000, (n, 2))
+    detector = ContactDetector(voronoi, contact_range=15)
+    detector.add(range(n), positions, rng.integers(0, 2, n))
+    print(f"{len(detector.update())} engagements at the start")
+    for tick in range(3):
+        moving = rng.choice(n, n // 10, replace=False)
+        positions[moving] = np.clip(positions[moving] + rng.normal(0, 10, (len(moving), 2)), 0, 1000)
+        detector.move(moving, positions[moving])
+        print(f"tick {tick}: {len(detector.update())} new engagements")
+    print(detector)
@@ -0,0 +1,185 @@
+"""
+Lloyd (centroidal Voronoi) relaxation of map point sets.
+"""
+
+# base libs
+from typing import Tuple
+import logging
+
+# ext libs
+import numpy as np
+from scipy.spatial import Delaunay
+
+# Inherit logging configuration from the main application
+logger = logging.getLogger(__name__)
+
+
+class LloydRelaxation:
+    """
+    Moves every point to the centroid of its Voronoi cell (clipped to the map rectangle), repeatedly,
+    which evens out cell sizes and shapes.
+
+    Each iteration triangulates the points once, together with their mirror images across the
+    nearby map edges; the mirrors close every cell exactly along the map boundary. Cell areas and
+    centroids then come from a triangle fan around each site over its Voronoi edges (the
+    circumcentres of the two triangles sharing each Delaunay edge), accumulated for all cells at
+    once with ``np.bincount``. No polygons are built.
+
+    Attributes:
+        iterations (int): Maximum number of relaxation steps.
+        tolerance (float): Stop early once the root-mean-square point displacement of a step falls
+            below this fraction of the mean point spacing.
+    """
+
+    def __init__(self, iterations: int = 5, tolerance: float = 1e-3) -> None:
+        """
+        Initialize the LloydRelaxation.
+
+        Args:
+            iterations (int): Maximum number of relaxation steps.
+            tolerance (float): Early-exit threshold, as a fraction of the mean point spacing.
+
+        Raises:
+            ValueError: If iterations is negative or tolerance is negative.
+        """
+        if not isinstance(iterations, int) or iterations < 0:
+            raise ValueError("iterations must be a non-negative integer")
+        if tolerance < 0:
+            raise ValueError("tolerance must be non-negative")
+        self.iterations: int = iterations
+        self.tolerance: float = tolerance
+
+    def __str__(self) -> str:
+        return f"LloydRelaxation(iterations={self.iterations})"
+
+    def __repr__(self) -> str:
+        return f"<LloydRelaxation(iterations={self.iterations!r}, tolerance={self.tolerance!r})>"
+
+    @staticmethod
+    def cell_centroids(points: np.ndarray, width: float, height: float) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Compute the centroid and area of every Voronoi cell clipped to the map rectangle.
+
+        Args:
+            points (np.ndarray): Array of shape (n, 2) with points inside the map.
+            width (float): Width of the map.
+            height (float): Height of the map.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: Centroids of shape (n, 2) and areas of shape (n,).
+                Points dropped by the triangulation (exact duplicates) keep their position and get area 0.
+        """
+        points = np.asarray(points, dtype=float).reshape(-1, 2)
+        n = len(points)
+        if n == 0:
+            return np.empty((0, 2)), np.empty(0)
+        size = np.array([width, height], dtype=float)
+        spacing = np.sqrt(width * height / n)
+        band = 4 * spacing
+
+        while True:
+            # mirror the points near each edge; the bisector of a point and its mirror is the edge
+            mirrors = [points]
+            for axis in (0, 1):
+                for edge in (0.0, size[axis]):
+                    near = np.abs(points[:, axis] - edge) < band
+                    mirrored = points[near].copy()
+                    mirrored[:, axis] = 2 * edge - mirrored[:, axis]
+                    mirrors.append(mirrored)
+            sites = np.vstack(mirrors)
+            tri = Delaunay(sites)
+            simplices = tri.simplices
+            circumcentres = LloydRelaxation._circumcentres(sites[simplices])
+
+            # a cell is exact once it is closed and none of its vertices lies outside the map
+            tol = 1e-9 * max(width, height)
+            outside = ((circumcentres < -tol) | (circumcentres > size + tol)).any(axis=1)
+            open_cells = np.concatenate([simplices[outside].ravel(), tri.convex_hull.ravel()])
+            if not (open_cells < n).any() or band >= size.max():
+                break
+            band *= 2
+
+        # each Delaunay edge (a, b) shared by triangles t and u is the Voronoi edge (c_t, c_u)
+        m = len(simplices)
+        tri_index = np.repeat(np.arange(m), 3)
+        corner = np.tile(np.arange(3), m)
+        other = tri.neighbors.ravel()
+        once = other > tri_index  # also drops hull edges (-1)
+        t, u = tri_index[once], other[once]
+        a = simplices[t, (corner[once] + 1) % 3]
+        b = simplices[t, (corner[once] + 2) % 3]
+
+        owner = np.concatenate([a, b])
+        owner_sites = sites[owner]
+        c1 = np.tile(circumcentres[t], (2, 1))
+        c2 = np.tile(circumcentres[u], (2, 1))
+        # the site lies inside its (convex) cell, so fan triangles need no orientation
+        d1, d2 = c1 - owner_sites, c2 - owner_sites
+        fan_area = 0.5 * np.abs(d1[:, 0] * d2[:, 1] - d1[:, 1] * d2[:, 0])
+        fan_centroid = (owner_sites + c1 + c2) / 3
+
+        keep = owner < n
+        owner, fan_area, fan_centroid = owner[keep], fan_area[keep], fan_centroid[keep]
+        areas = np.bincount(owner, weights=fan_area, minlength=n)
+        centroids = points.copy()
+        has_area = areas > 0
+        for axis in (0, 1):
+            moments = np.bincount(owner, weights=fan_area * fan_centroid[:, axis], minlength=n)
+            centroids[has_area, axis] = moments[has_area] / areas[has_area]
+        return centroids, areas
+
+    @staticmethod
+    def _circumcentres(triangles: np.ndarray) -> np.ndarray:
+        """
+        Circumcentres of an array of triangles of shape (m, 3, 2).
+        Returns:
+            np.ndarray: Array of shape (m, 2).
+        """
+        a = triangles[:, 0]
+        b = triangles[:, 1] - a
+        c = triangles[:, 2] - a
+        d = 2 * (b[:, 0] * c[:, 1] - b[:, 1] * c[:, 0])
+        b2 = (b * b).sum(axis=1)
+        c2 = (c * c).sum(axis=1)
+        ux = (c[:, 1] * b2 - b[:, 1] * c2) / d
+        uy = (b[:, 0] * c2 - c[:, 0] * b2) / d
+        return a + np.column_stack([ux, uy])
+
+    def relax(self, points: np.ndarray, width: float, height: float) -> np.ndarray:
+        """
+        Run Lloyd relaxation.
+
+        Args:
+            points (np.ndarray): Array of shape (n, 2) with the initial points.
+            width (float): Width of the map.
+            height (float): Height of the map.
+
+        Returns:
+            np.ndarray: Relaxed points of shape (n, 2), in the same order as the input.
+        """
+        points = np.asarray(points, dtype=float).reshape(-1, 2)
+        if len(points) == 0 or self.iterations == 0:
+            return points.copy()
+        spacing = np.sqrt(width * height / len(points))
+        # keep points strictly inside so that no point coincides with its own mirror
+        margin = 1e-6 * spacing
+        points = np.clip(points, margin, np.array([width, height]) - margin)
+
+        steps = 0
+        for steps in range(1, self.iterations + 1):
+            centroids, _ = self.cell_centroids(points, width, height)
+            shift = np.sqrt(((centroids - points) ** 2).sum(axis=1).mean())
+            points = centroids
+            if shift <= self.tolerance * spacing:
+                break
+        logger.info(f"Relaxed {len(points)} points in {steps} Lloyd iterations (last shift {shift:.3g}).")
+        return points
+
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(0)
+    initial = rng.uniform(0, 100, size=(500, 2))
+    relaxed = LloydRelaxation(iterations=20).relax(initial, 100, 100)
+    _, before = LloydRelaxation.cell_centroids(initial, 100, 100)
+    _, after = LloydRelaxation.cell_centroids(relaxed, 100, 100)
+    print(f"Cell area std: {before.std():.2f} before, {after.std():.2f} after relaxation")
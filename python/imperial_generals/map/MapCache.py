@@ -0,0 +1,131 @@
+"""
+On-disk cache of generated maps keyed by their configuration and seed.
+"""
+
+# base libs
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+import hashlib
+import json
+import logging
+
+# ext libs
+import numpy as np
+
+# local imports
+from imperial_generals.map.MapStore import FORMAT_VERSION, MapStore
+from imperial_generals.map.VoronoiMap import VoronoiMap
+
+# Inherit logging configuration from the main application
+logger = logging.getLogger(__name__)
+
+# Bumped whenever map generation produces different maps for the same configuration and seed
+# (e.g. a new sampler), so entries generated by older code are not served
+GENERATOR_VERSION = 2
+
+
+class MapCache:
+    """
+    Stores generated maps under a directory, one MapStore entry per (MapConfig, seed) key.
+
+    Entries are written atomically and never modified afterwards, so several worker processes can
+    load (memory-map) the same entry concurrently. Configurations without a seed describe a new
+    random map on every run and are never cached.
+
+    Attributes:
+        directory (Path): Root directory of the cache.
+        mmap (bool): Whether cached maps are memory-mapped on load.
+    """
+
+    def __init__(self, directory: Union[str, Path], mmap: bool = True) -> None:
+        """
+        Initialize the MapCache.
+
+        Args:
+            directory (str | Path): Root directory of the cache (created if missing).
+            mmap (bool): Whether cached maps are memory-mapped on load.
+        """
+        self.directory: Path = Path(directory)
+        self.mmap: bool = mmap
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def __str__(self) -> str:
+        return f"MapCache({self.directory})"
+
+    def __repr__(self) -> str:
+        return f"<MapCache(directory={str(self.directory)!r}, mmap={self.mmap})>"
+
+    @staticmethod
+    def key(config: Any, **params: Any) -> Optional[str]:
+        """
+        Build the cache key of a map configuration.
+
+        Args:
+            config (MapConfig): Map configuration (must have a seed, and no callable
+                min_distance_field, to be cacheable).
+            **params: Extra generation parameters that change the output (e.g. stage settings).
+
+        Returns:
+            str | None: Hex digest identifying the map, or None if the map is not reproducible.
+        """
+        seed = getattr(config, 'seed', None)
+        field = getattr(config, 'min_distance_field', None)
+        if seed is None or (field is not None and not isinstance(field, np.ndarray)):
+            # unseeded maps and callable density fields are not reproducible from the key
+            return None
+        description: Dict[str, Any] = {
+            'format_version': FORMAT_VERSION,
+            'generator_version': GENERATOR_VERSION,
+            'width': config.width,
+            'height': config.height,
+            'min_distance': config.min_distance,
+            'seed': seed,
+            'params': {name: str(value) for name, value in sorted(params.items())},
+        }
+        if field is not None:
+            raster = np.ascontiguousarray(field, dtype=np.float64)
+            description['min_distance_field'] = f"{raster.shape}:{hashlib.sha256(raster.tobytes()).hexdigest()}"
+        return hashlib.sha256(json.dumps(description, sort_keys=True).encode()).hexdigest()[:32]
+
+    def path(self, key: str) -> Path:
+        """Return the directory of a cache entry."""
+        return self.directory / key
+
+    def get(self, key: Optional[str]) -> Optional[VoronoiMap]:
+        """
+        Load a cached map.
+
+        Args:
+            key (str | None): Key from ``MapCache.key``.
+
+        Returns:
+            VoronoiMap | None: The cached map, or None on a miss.
+        """
+        if key is None or not self.path(key).is_dir():
+            return None
+        try:
+            voronoi = MapStore.load(self.path(key), mmap=self.mmap)
+        except (OSError, ValueError) as exc:
+            logger.warning(f"Ignoring unreadable map cache entry {key}: {exc}")
+            return None
+        logger.info(f"Loaded map {key} from cache")
+        return voronoi
+
+    def put(self, key: Optional[str], voronoi: VoronoiMap, metadata: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Store a map unless the key is None or another process already stored it.
+
+        Args:
+            key (str | None): Key from ``MapCache.key``.
+            voronoi (VoronoiMap): The map to store.
+            metadata (dict, optional): JSON-serialisable metadata stored in the manifest.
+        """
+        if key is None or self.path(key).is_dir():
+            return
+        try:
+            MapStore.save(voronoi, self.path(key), metadata=metadata, overwrite=False)
+        except OSError as exc:
+            # another process won the race to create the entry
+            logger.debug(f"Map cache entry {key} not written: {exc}")
+        else:
+            logger.info(f"Stored map {key} in cache")
@@ -1,14 +1,42 @@
+from typing import Any, Callable, Optional, Union
+
+import numpy as np
+
+
 class MapConfig:
     """
     Holds configuration for map generation.
+
+    ``min_distance_field`` optionally replaces the global ``min_distance`` with a per-location
+    minimum distance: a callable mapping an (n, 2) array of points to (n,) distances, or a 2D
+    raster of distances covering the map with row 0 at the top (see PoissonDiscSampler.generate).
     """
-    def __init__(self, width, height, min_distance):
+    def __init__(
+        self,
+        width,
+        height,
+        min_distance,
+        seed: Optional[int] = None,
+        lloyd_iterations: int = 0,
+        min_distance_field: Optional[Union[Callable[[np.ndarray], Any], np.ndarray]] = None
+    ):
         if not isinstance(width, int):
             raise TypeError("width must be an int")
         if not isinstance(height, int):
             raise TypeError("height must be an int")
         if not isinstance(min_distance, int):
             raise TypeError("min_distance must be an int")
+        if seed is not None and not isinstance(seed, int):
+            raise TypeError("seed must be an int or None")
+        if not isinstance(lloyd_iterations, int):
+            raise TypeError("lloyd_iterations must be an int")
+        if lloyd_iterations < 0:
+            raise ValueError("lloyd_iterations must be non-negative")
+        if min_distance_field is not None and not (callable(min_distance_field) or isinstance(min_distance_field, np.ndarray)):
+            raise TypeError("min_distance_field must be a callable, a numpy array or None")
         self.width = width
         self.height = height
-        self.min_distance = min_distance
\ No newline at end of file
+        self.min_distance = min_distance
+        self.seed = seed
+        self.lloyd_iterations = lloyd_iterations
+        self.min_distance_field = min_distance_field
@@ -4,9 +4,15 @@ MapGenerator: Generates a set of points using Poisson disc sampling and creates
 """
 
 from imperial_generals.map import PoissonDiscSampler, VoronoiMap
-from typing import Any, Dict
+from imperial_generals.map.TerrainGenerator import TerrainGenerator, TERRAIN_TYPES
+from imperial_generals.map.HydrologyGenerator import HydrologyGenerator
+from imperial_generals.map.LloydRelaxation import LloydRelaxation
+from imperial_generals.map.MapCache import MapCache
+from typing import Any, Dict, Optional
 import logging
 
+import numpy as np
+
 # Configure logging for this module
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
@@ -16,7 +22,14 @@ class MapGenerator:
     """
     Generates a map using Poisson disc sampling and Voronoi diagrams.
     """
-    def __init__(self, config: Any) -> None:
+    def __init__(
+        self,
+        config: Any,
+        terrain_generator: Optional[TerrainGenerator] = None,
+        hydrology_generator: Optional[HydrologyGenerator] = None,
+        cache: Optional[MapCache] = None,
+        relaxation: Optional[LloydRelaxation] = None
+    ) -> None:
         """
         Initialize MapGenerator with configuration.
 
@@ -25,8 +38,28 @@ class MapGenerator:
                 - width (int): Width of the map.
                 - height (int): Height of the map.
                 - min_distance (float): Minimum distance between points.
+                - min_distance_field (callable | np.ndarray, optional): Per-location minimum
+                  distance used instead of min_distance.
+                - seed (int | None, optional): Seed for reproducible maps.
+                - lloyd_iterations (int, optional): Lloyd relaxation steps applied to the points (0 to skip).
+            terrain_generator (TerrainGenerator, optional): Custom terrain stage. Defaults to a
+                TerrainGenerator seeded from the config.
+            hydrology_generator (HydrologyGenerator, optional): Custom drainage stage. Defaults to
+                a HydrologyGenerator with default thresholds.
+            cache (MapCache, optional): Cache consulted before generating seeded maps. Maps built
+                with a custom terrain_generator or a callable min_distance_field are not cached,
+                since they cannot be part of the key.
+            relaxation (LloydRelaxation, optional): Custom relaxation stage. Defaults to a
+                LloydRelaxation running ``config.lloyd_iterations`` steps, if any.
         """
         self.config: Any = config
+        self.terrain_generator: Optional[TerrainGenerator] = terrain_generator
+        self.hydrology_generator: HydrologyGenerator = hydrology_generator or HydrologyGenerator()
+        self.cache: Optional[MapCache] = cache
+        lloyd_iterations = getattr(config, 'lloyd_iterations', 0)
+        self.relaxation: Optional[LloydRelaxation] = relaxation or (
+            LloydRelaxation(iterations=lloyd_iterations) if lloyd_iterations else None
+        )
         logger.info(f"MapGenerator initialized with width={config.width}, height={config.height}, min_distance={config.min_distance}")
 
     def __str__(self) -> str:
@@ -45,24 +78,86 @@ class MapGenerator:
 
     def generate_map(self) -> Dict[str, Any]:
         """
-        Generates Poisson disc points and computes Voronoi cells.
+        Generates Poisson disc points, optionally relaxes them towards their cell centroids,
+        computes Voronoi cells, assigns terrain to each cell and routes rivers over the cell graph.
 
         Returns:
             dict: {
                 'points': List of (x, y) tuples,
-                'voronoi': VoronoiMap object (see voronoi.py)
+                'voronoi': VoronoiMap object (see voronoi.py),
+                'elevation': per-cell elevation array,
+                'terrain': per-cell terrain class array (see TerrainGenerator.TERRAIN_TYPES),
+                'rivers': (n_edges, 2) array of (cell, downstream cell) river segments
             }
         """
+        # Independent random streams for each stage, all derived from the map seed
+        sampler_seed, terrain_seed = np.random.SeedSequence(getattr(self.config, 'seed', None)).spawn(2)
+        terrain_generator = self.terrain_generator or TerrainGenerator(seed=np.random.default_rng(terrain_seed))
+
+        cache_key = None
+        if self.cache is not None and self.terrain_generator is None:
+            params = {'hydrology': repr(self.hydrology_generator)}
+            if self.relaxation is not None:
+                params['relaxation'] = repr(self.relaxation)
+            cache_key = MapCache.key(self.config, **params)
+            voronoi = self.cache.get(cache_key)
+            if voronoi is not None:
+                self._register_updaters(voronoi, terrain_generator)
+                return self._map_dict(voronoi, [tuple(p) for p in voronoi.points.tolist()])
+
         # Generate points using Poisson disc sampling
+        min_distance_field = getattr(self.config, 'min_distance_field', None)
         points = PoissonDiscSampler.generate(
-            self.config.width, self.config.height, self.config.min_distance
+            self.config.width, self.config.height,
+            self.config.min_distance if min_distance_field is None else min_distance_field,
+            seed=np.random.default_rng(sampler_seed)
         )
         logger.info(f"Generated {len(points)} Poisson disc points.")
+        if self.relaxation is not None:
+            # Even out cell sizes by moving the points towards their cell centroids
+            points = [
+                tuple(p) for p in
+                self.relaxation.relax(points, self.config.width, self.config.height).tolist()
+            ]
         # Create Voronoi diagram from points
         voronoi = VoronoiMap(points, self.config.width, self.config.height)
         voronoi.generate_diagram()
         logger.info("Voronoi diagram generated.")
-        return {'points': points, 'voronoi': voronoi}
+        # Evaluate elevation and terrain over all cell centroids at once
+        voronoi.cell_data.update(
+            terrain_generator.generate(voronoi.get_centroids(), self.config.width, self.config.height)
+        )
+        logger.info("Terrain generated.")
+        # Drain water from high to low ground; the map edge and open water are outlets
+        indptr, indices = voronoi.get_adjacency()
+        voronoi.cell_data.update(
+            self.hydrology_generator.generate(
+                voronoi.cell_data['elevation'], indptr, indices,
+                outlets=voronoi.get_boundary_cells(),
+                water=voronoi.cell_data['terrain'] == TERRAIN_TYPES.index('water')
+            )
+        )
+        logger.info("Rivers generated.")
+        if cache_key is not None:
+            self.cache.put(cache_key, voronoi)
+        self._register_updaters(voronoi, terrain_generator)
+        return self._map_dict(voronoi, points)
+
+    def _register_updaters(self, voronoi: VoronoiMap, terrain_generator: TerrainGenerator) -> None:
+        """Keep the stage outputs in cell_data in step with cells reshaped by VoronoiMap.add_points."""
+        voronoi.cell_updaters.append(terrain_generator.update_cells)
+        voronoi.cell_updaters.append(self.hydrology_generator.invalidate)
+
+    @staticmethod
+    def _map_dict(voronoi: VoronoiMap, points: list) -> Dict[str, Any]:
+        """Assemble the generate_map result from a finished VoronoiMap."""
+        return {
+            'points': points,
+            'voronoi': voronoi,
+            'elevation': voronoi.cell_data['elevation'],
+            'terrain': voronoi.cell_data['terrain'],
+            'rivers': HydrologyGenerator.river_edges(voronoi.cell_data['receivers'], voronoi.cell_data['river']),
+        }
 
 
 if __name__ == "__main__":
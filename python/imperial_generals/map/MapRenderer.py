@@ -0,0 +1,269 @@
+"""
+Headless rendering of Voronoi maps to image files or buffers.
+"""
+
+# base libs
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import logging
+
+# ext libs
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.collections import LineCollection, PolyCollection
+from matplotlib.colors import to_rgba, to_rgba_array
+from matplotlib.figure import Figure
+import matplotlib.image as mpimg
+import matplotlib
+
+# local imports
+from imperial_generals.map.TerrainGenerator import TERRAIN_TYPES
+from imperial_generals.map.VoronoiMap import VoronoiMap
+
+# Inherit logging configuration from the main application
+logger = logging.getLogger(__name__)
+
+# Default fill colour per terrain class
+TERRAIN_COLORS = {
+    'water': '#4a7db3',
+    'plains': '#c9d58f',
+    'forest': '#4f7a3a',
+    'hills': '#a68f5b',
+    'mountains': '#8e8a86',
+}
+
+RIVER_COLOR = '#2f5f9e'
+
+
+class MapRenderer:
+    """
+    Renders VoronoiMaps without a display, using the Agg backend directly (no pyplot state).
+
+    Two paths are available:
+        - ``render``: vector drawing of every cell as one ``PolyCollection`` with per-cell colours,
+          saved as PNG or SVG.
+        - ``render_raster``: rasterised fast path that colours a pixel grid through the map's
+          point-location index, for thumbnails of many maps in batch.
+
+    Attributes:
+        size (Tuple[int, int]): Output image size in pixels (width, height).
+        dpi (int): Resolution used for vector output.
+        edgecolor (str): Cell outline colour ('none' to disable outlines).
+        linewidth (float): Cell outline width in points.
+        background (str): Colour of pixels outside every cell.
+    """
+
+    def __init__(
+        self,
+        size: Tuple[int, int] = (600, 600),
+        dpi: int = 100,
+        edgecolor: str = 'black',
+        linewidth: float = 0.2,
+        background: str = 'white'
+    ) -> None:
+        """
+        Initialize the MapRenderer.
+
+        Args:
+            size (Tuple[int, int]): Output image size in pixels (width, height).
+            dpi (int): Resolution used for vector output.
+            edgecolor (str): Cell outline colour ('none' to disable outlines).
+            linewidth (float): Cell outline width in points.
+            background (str): Colour of pixels outside every cell.
+        """
+        if len(size) != 2 or min(size) <= 0:
+            raise ValueError("size must be a (width, height) pair of positive integers")
+        self.size: Tuple[int, int] = (int(size[0]), int(size[1]))
+        self.dpi: int = dpi
+        self.edgecolor: str = edgecolor
+        self.linewidth: float = linewidth
+        self.background: str = background
+
+    def __str__(self) -> str:
+        return f"MapRenderer(size={self.size})"
+
+    def __repr__(self) -> str:
+        return (
+            f"<MapRenderer(size={self.size}, dpi={self.dpi}, edgecolor={self.edgecolor!r}, "
+            f"linewidth={self.linewidth}, background={self.background!r})>"
+        )
+
+    @staticmethod
+    def cell_colors(
+        voronoi: VoronoiMap,
+        colors: Optional[Any] = None,
+        ownership: Optional[np.ndarray] = None,
+        palette: Optional[Dict[str, str]] = None
+    ) -> np.ndarray:
+        """
+        Resolve an RGBA colour for every cell.
+
+        Priority: explicit ``colors``, then ``ownership``, then the terrain stored in
+        ``voronoi.cell_data``, then a single neutral colour.
+
+        Args:
+            voronoi (VoronoiMap): The map being drawn.
+            colors (Any, optional): One colour per cell (any matplotlib colour spec or RGBA array).
+            ownership (np.ndarray, optional): Owner id per cell (-1 for unowned), mapped to a qualitative colormap.
+            palette (dict, optional): Terrain name to colour overrides for TERRAIN_COLORS.
+
+        Returns:
+            np.ndarray: RGBA array of shape (n_cells, 4).
+        """
+        n = len(voronoi.points)
+        if colors is not None:
+            rgba = to_rgba_array(colors)
+            if len(rgba) == 1:
+                rgba = np.repeat(rgba, n, axis=0)
+        elif ownership is not None:
+            ownership = np.asarray(ownership, dtype=np.intp)
+            cmap = matplotlib.colormaps['tab20']
+            rgba = cmap(np.mod(ownership, cmap.N))
+            rgba[ownership < 0] = to_rgba('lightgrey')
+        elif 'terrain' in voronoi.cell_data:
+            table = to_rgba_array([{**TERRAIN_COLORS, **(palette or {})}[t] for t in TERRAIN_TYPES])
+            rgba = table[np.asarray(voronoi.cell_data['terrain'], dtype=np.intp)]
+        else:
+            rgba = np.tile(to_rgba('tab:blue', alpha=0.4), (n, 1))
+        if len(rgba) != n:
+            raise ValueError(f"expected {n} cell colours, got {len(rgba)}")
+        return rgba
+
+    @staticmethod
+    def cell_collection(voronoi: VoronoiMap, facecolors: np.ndarray, **kwargs: Any) -> PolyCollection:
+        """
+        Build a single PolyCollection holding every cell polygon.
+
+        Args:
+            voronoi (VoronoiMap): The map being drawn.
+            facecolors (np.ndarray): RGBA colour per cell (aligned with ``voronoi.points``).
+            **kwargs: Passed to PolyCollection (e.g. edgecolor, linewidth).
+
+        Returns:
+            PolyCollection: The cell collection.
+        """
+        vertices, offsets = voronoi.get_polygon_arrays()
+        verts = np.split(np.asarray(vertices), np.asarray(offsets)[1:-1]) if len(offsets) > 1 else []
+        return PolyCollection(verts, facecolors=facecolors[voronoi.polygon_sites], **kwargs)
+
+    def _figure(self, voronoi: VoronoiMap) -> Figure:
+        """Create an Agg-backed figure whose single axes spans the whole map."""
+        fig = Figure(figsize=(self.size[0] / self.dpi, self.size[1] / self.dpi), dpi=self.dpi)
+        FigureCanvasAgg(fig)
+        ax = fig.add_axes((0, 0, 1, 1))
+        ax.set_xlim(0, voronoi.width)
+        ax.set_ylim(0, voronoi.height)
+        ax.set_axis_off()
+        fig.patch.set_facecolor(self.background)
+        return fig
+
+    def render(
+        self,
+        voronoi: VoronoiMap,
+        target: Any,
+        fmt: str = 'png',
+        colors: Optional[Any] = None,
+        ownership: Optional[np.ndarray] = None,
+        show_rivers: bool = True,
+        show_points: bool = False
+    ) -> None:
+        """
+        Draw every cell in one PolyCollection and write the image.
+
+        Args:
+            voronoi (VoronoiMap): The map to draw (diagram generated or loaded from a MapStore).
+            target (Any): File path or writable binary buffer.
+            fmt (str): Output format ('png' or 'svg').
+            colors (Any, optional): One colour per cell (see ``cell_colors``).
+            ownership (np.ndarray, optional): Owner id per cell (see ``cell_colors``).
+            show_rivers (bool): Overlay river segments from ``cell_data`` when present.
+            show_points (bool): Draw the cell sites.
+        """
+        if fmt not in ('png', 'svg'):
+            raise ValueError("fmt must be 'png' or 'svg'")
+        fig = self._figure(voronoi)
+        ax = fig.axes[0]
+        facecolors = self.cell_colors(voronoi, colors=colors, ownership=ownership)
+        ax.add_collection(self.cell_collection(
+            voronoi, facecolors, edgecolor=self.edgecolor, linewidth=self.linewidth
+        ))
+        if show_rivers and 'river' in voronoi.cell_data and 'receivers' in voronoi.cell_data:
+            receivers = np.asarray(voronoi.cell_data['receivers'])
+            cells = np.flatnonzero(np.asarray(voronoi.cell_data['river']) & (receivers >= 0))
+            centroids = voronoi.get_centroids()
+            segments = np.stack([centroids[cells], centroids[receivers[cells]]], axis=1)
+            ax.add_collection(LineCollection(segments, colors=RIVER_COLOR, linewidths=1.0))
+        if show_points and len(voronoi.points):
+            ax.scatter(voronoi.points[:, 0], voronoi.points[:, 1], c='black', s=2, zorder=10)
+        fig.savefig(target, format=fmt, dpi=self.dpi, facecolor=fig.get_facecolor())
+        logger.debug(f"Rendered {len(facecolors)} cells to {target!r} as {fmt}")
+
+    def render_raster(
+        self,
+        voronoi: VoronoiMap,
+        target: Any,
+        colors: Optional[Any] = None,
+        ownership: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """
+        Rasterised fast path: colour each pixel by the cell containing its centre.
+
+        Skips polygon drawing entirely, so the cost is one batched point-location query per image.
+        Cell outlines and rivers are not drawn.
+
+        Args:
+            voronoi (VoronoiMap): The map to draw.
+            target (Any): File path or writable binary buffer for a PNG, or None to only return the image.
+            colors (Any, optional): One colour per cell (see ``cell_colors``).
+            ownership (np.ndarray, optional): Owner id per cell (see ``cell_colors``).
+
+        Returns:
+            np.ndarray: RGBA image of shape (height_px, width_px, 4) with north up.
+        """
+        cells = voronoi.rasterize(self.size)
+        palette = np.vstack([
+            self.cell_colors(voronoi, colors=colors, ownership=ownership),
+            to_rgba(self.background),
+        ])
+        image = palette[cells]  # -1 (outside every cell) picks the background row
+        if target is not None:
+            mpimg.imsave(target, image, format='png')
+        return image
+
+    def render_batch(
+        self,
+        maps: Iterable[VoronoiMap],
+        targets: Iterable[Any],
+        raster: bool = True,
+        **kwargs: Any
+    ) -> List[Any]:
+        """
+        Render many maps, e.g. thumbnails for a batch of games.
+
+        Args:
+            maps (Iterable[VoronoiMap]): Maps to draw.
+            targets (Iterable[Any]): One file path or buffer per map.
+            raster (bool): Use the rasterised fast path (PNG) instead of vector drawing.
+            **kwargs: Passed to ``render_raster`` or ``render``.
+
+        Returns:
+            List[Any]: The targets written, in order.
+        """
+        written = []
+        for voronoi, target in zip(maps, targets):
+            if raster:
+                self.render_raster(voronoi, target, **kwargs)
+            else:
+                self.render(voronoi, target, **kwargs)
+            written.append(target)
+        logger.info(f"Rendered {len(written)} maps")
+        return written
+
+
+if __name__ == "__main__":
+    from imperial_generals.map import MapConfig, MapGenerator
+
+    game_map = MapGenerator(MapConfig(width=100, height=100, min_distance=3, seed=1)).generate_map()
+    renderer = MapRenderer()
+    renderer.render(game_map['voronoi'], "map.png")
+    renderer.render_raster(game_map['voronoi'], "map_thumbnail.png")
+    print("Wrote map.png and map_thumbnail.png")
@@ -0,0 +1,161 @@
+"""
+Binary save/load of generated maps as raw NumPy arrays.
+"""
+
+# base libs
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+import json
+import logging
+import os
+import shutil
+import tempfile
+
+# ext libs
+import numpy as np
+
+# local imports
+from imperial_generals.map.VoronoiMap import VoronoiMap
+
+# Inherit logging configuration from the main application
+logger = logging.getLogger(__name__)
+
+# Bumped whenever the on-disk layout changes, so stale caches are not misread
+FORMAT_VERSION = 1
+
+MANIFEST_NAME = "manifest.json"
+
+
+class MapStore:
+    """
+    Saves a VoronoiMap as a directory of ``.npy`` files plus a JSON manifest.
+
+    Each array (points, polygon vertex arrays with offsets, adjacency CSR arrays and every
+    per-cell attribute) is stored uncompressed in its own ``.npy`` file, so loading maps the
+    files with ``np.memmap`` (via ``np.load(mmap_mode='r')``) instead of reading them. Worker
+    processes loading the same map share the OS page cache rather than private copies, and
+    loading is independent of the map size. Shapely polygons are only rebuilt if accessed.
+    """
+
+    @staticmethod
+    def save(
+        voronoi: VoronoiMap,
+        path: Union[str, Path],
+        metadata: Optional[Dict[str, Any]] = None,
+        extra_arrays: Optional[Dict[str, np.ndarray]] = None,
+        overwrite: bool = True
+    ) -> Path:
+        """
+        Save a map to a directory.
+
+        Arrays are written to a temporary sibling directory that is then renamed into place, so
+        readers never observe a partially written map.
+
+        Args:
+            voronoi (VoronoiMap): The map to save.
+            path (str | Path): Target directory.
+            metadata (dict, optional): JSON-serialisable metadata stored in the manifest.
+            extra_arrays (dict, optional): Additional named arrays stored alongside the map.
+            overwrite (bool): Replace an existing directory. If False, an existing target raises OSError.
+
+        Returns:
+            Path: The directory written.
+        """
+        path = Path(path)
+        arrays = voronoi.to_arrays()
+        for name, values in (extra_arrays or {}).items():
+            if name in arrays:
+                raise ValueError(f"extra array name '{name}' clashes with a map array")
+            arrays[name] = np.asarray(values)
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = Path(tempfile.mkdtemp(prefix=f".{path.name}.", dir=path.parent))
+        try:
+            for name, values in arrays.items():
+                np.save(tmp / f"{name}.npy", np.ascontiguousarray(values), allow_pickle=False)
+            manifest = {
+                'format_version': FORMAT_VERSION,
+                'width': voronoi.width,
+                'height': voronoi.height,
+                'arrays': {name: {'dtype': str(v.dtype), 'shape': list(v.shape)} for name, v in arrays.items()},
+                'metadata': metadata or {},
+            }
+            (tmp / MANIFEST_NAME).write_text(json.dumps(manifest, indent=2))
+            if overwrite and path.exists():
+                shutil.rmtree(path)
+            os.replace(tmp, path)
+        except BaseException:
+            shutil.rmtree(tmp, ignore_errors=True)
+            raise
+        logger.info(f"Saved map with {len(arrays['points'])} cells to {path}")
+        return path
+
+    @staticmethod
+    def read_manifest(path: Union[str, Path]) -> Dict[str, Any]:
+        """
+        Read and validate the manifest of a saved map.
+
+        Args:
+            path (str | Path): Directory written by ``save``.
+
+        Returns:
+            dict: The manifest.
+
+        Raises:
+            FileNotFoundError: If the directory has no manifest.
+            ValueError: If the manifest was written by an incompatible format version.
+        """
+        manifest = json.loads((Path(path) / MANIFEST_NAME).read_text())
+        if manifest.get('format_version') != FORMAT_VERSION:
+            raise ValueError(
+                f"Unsupported map format version {manifest.get('format_version')} (expected {FORMAT_VERSION})"
+            )
+        return manifest
+
+    @staticmethod
+    def load_arrays(path: Union[str, Path], mmap: bool = True) -> Dict[str, np.ndarray]:
+        """
+        Load every array of a saved map.
+
+        Args:
+            path (str | Path): Directory written by ``save``.
+            mmap (bool): Memory-map the arrays read-only instead of reading them into memory.
+
+        Returns:
+            Dict[str, np.ndarray]: Arrays by name.
+        """
+        path = Path(path)
+        manifest = MapStore.read_manifest(path)
+        arrays = {}
+        for name, info in manifest['arrays'].items():
+            # empty files cannot be memory-mapped
+            mode = 'r' if mmap and np.prod(info['shape']) > 0 else None
+            arrays[name] = np.load(path / f"{name}.npy", mmap_mode=mode, allow_pickle=False)
+        return arrays
+
+    @staticmethod
+    def load(path: Union[str, Path], mmap: bool = True) -> VoronoiMap:
+        """
+        Load a map saved with ``save``.
+
+        Memory-mapped arrays are read-only; copy them before modifying in place.
+
+        Args:
+            path (str | Path): Directory written by ``save``.
+            mmap (bool): Memory-map the arrays instead of reading them into memory.
+
+        Returns:
+            VoronoiMap: The restored map.
+        """
+        manifest = MapStore.read_manifest(path)
+        arrays = MapStore.load_arrays(path, mmap=mmap)
+        return VoronoiMap.from_arrays(arrays, manifest['width'], manifest['height'])
+
+
+if __name__ == "__main__":
+    from imperial_generals.map import MapConfig, MapGenerator
+
+    game_map = MapGenerator(MapConfig(width=100, height=100, min_distance=5, seed=1)).generate_map()
+    target = MapStore.save(game_map['voronoi'], Path(tempfile.gettempdir()) / "imperial_generals_map")
+    restored = MapStore.load(target)
+    print(f"Restored {restored} from {target}")
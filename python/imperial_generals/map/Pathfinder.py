@@ -0,0 +1,244 @@
+"""
+Pathfinding over the Voronoi cell graph.
+"""
+
+# base libs
+from collections import OrderedDict
+from heapq import heappop, heappush
+from typing import Iterable, List, Optional, Tuple
+import logging
+
+# ext libs
+import numpy as np
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import dijkstra
+
+# local imports
+from imperial_generals.map.VoronoiMap import VoronoiMap
+
+# Inherit logging configuration from the main application
+logger = logging.getLogger(__name__)
+
+
+class Pathfinder:
+    """
+    Routes units across the cells of a VoronoiMap.
+
+    The cell graph is held as CSR arrays (``indptr``, ``indices``, ``weights``). Moving between two
+    adjacent cells costs the distance between their centroids scaled by the mean movement cost of
+    the two cells; cells with an infinite cost are impassable.
+
+    Distance fields (multi-source Dijkstra) are cached per source set, so frequently used targets
+    such as depots and capitals are searched once and then shared by every unit routing to them.
+    The cache is cleared whenever movement costs change.
+
+    Attributes:
+        centroids (np.ndarray): Cell centroids, shape (n_cells, 2).
+        indptr (np.ndarray): CSR row pointer of the cell graph.
+        indices (np.ndarray): CSR neighbour indices of the cell graph.
+        costs (np.ndarray): Movement cost per cell.
+        weights (np.ndarray): Edge weights aligned with ``indices``.
+    """
+
+    def __init__(
+        self,
+        voronoi: VoronoiMap,
+        costs: Optional[np.ndarray] = None,
+        cache_size: int = 64
+    ) -> None:
+        """
+        Initialize the Pathfinder from a generated VoronoiMap.
+
+        Args:
+            voronoi (VoronoiMap): Map whose diagram has been generated.
+            costs (np.ndarray, optional): Movement cost per cell. Defaults to 1 everywhere.
+            cache_size (int): Maximum number of distance fields kept in the cache.
+        """
+        if cache_size < 0:
+            raise ValueError("cache_size must be non-negative")
+        self.centroids: np.ndarray = voronoi.get_centroids()
+        self.indptr, self.indices = voronoi.get_adjacency()
+        self.cache_size: int = cache_size
+        self._fields: OrderedDict[Tuple[int, ...], Tuple[np.ndarray, np.ndarray]] = OrderedDict()
+        self._edge_lengths: np.ndarray = np.linalg.norm(
+            self.centroids[self._edge_sources()] - self.centroids[self.indices], axis=1
+        )
+        self.set_costs(np.ones(len(self.centroids)) if costs is None else costs)
+        logger.info(f"Initialized Pathfinder with {len(self.centroids)} cells and {len(self.indices)} directed edges")
+
+    def __str__(self) -> str:
+        return f"Pathfinder with {len(self.centroids)} cells, {len(self._fields)} cached fields"
+
+    def __repr__(self) -> str:
+        return f"<Pathfinder(cells={len(self.centroids)}, edges={len(self.indices)}, cache_size={self.cache_size})>"
+
+    def _edge_sources(self) -> np.ndarray:
+        """Return the source cell of each directed edge in CSR order."""
+        return np.repeat(np.arange(len(self.indptr) - 1), np.diff(self.indptr))
+
+    def set_costs(self, costs: np.ndarray) -> None:
+        """
+        Replace the movement cost of every cell and invalidate cached distance fields.
+
+        Args:
+            costs (np.ndarray): Movement cost per cell (positive, ``np.inf`` for impassable).
+
+        Raises:
+            ValueError: If costs has the wrong shape or contains non-positive values.
+        """
+        costs = np.asarray(costs, dtype=float)
+        if costs.shape != (len(self.centroids),):
+            raise ValueError(f"costs must have shape ({len(self.centroids)},), got {costs.shape}")
+        if np.isnan(costs).any() or (costs <= 0).any():
+            raise ValueError("costs must be positive")
+        self.costs: np.ndarray = costs
+        self._rebuild_weights()
+
+    def update_costs(self, cells: Iterable[int], costs: Iterable[float]) -> None:
+        """
+        Change the movement cost of some cells (e.g. after terrain changes) and invalidate the cache.
+
+        Args:
+            cells (Iterable[int]): Cell indices to update.
+            costs (Iterable[float]): New movement cost for each cell.
+        """
+        new_costs = self.costs.copy()
+        new_costs[np.asarray(list(cells), dtype=np.intp)] = np.asarray(list(costs), dtype=float)
+        self.set_costs(new_costs)
+
+    def _rebuild_weights(self) -> None:
+        """Recompute edge weights from the current costs and drop cached fields."""
+        src = self._edge_sources()
+        self.weights: np.ndarray = self._edge_lengths * (self.costs[src] + self.costs[self.indices]) / 2
+        passable = np.isfinite(self.weights)
+        n = len(self.centroids)
+        self._graph = csr_matrix(
+            (self.weights[passable], (src[passable], self.indices[passable])), shape=(n, n)
+        )
+        finite_costs = self.costs[np.isfinite(self.costs)]
+        self._min_cost: float = float(finite_costs.min()) if len(finite_costs) else 1.0
+        self.clear_cache()
+
+    def clear_cache(self) -> None:
+        """Drop all cached distance fields."""
+        if self._fields:
+            logger.debug(f"Clearing {len(self._fields)} cached distance fields")
+        self._fields.clear()
+
+    def distance_field(self, sources: Iterable[int]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Compute (or fetch from cache) the travel cost from every cell to the nearest source.
+
+        Args:
+            sources (Iterable[int]): Source cell indices (e.g. depots or a capital).
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: (distances, next_hop) per cell. ``next_hop`` is the
+            neighbour to move to on a cheapest route towards the sources (-1 at sources and
+            unreachable cells).
+        """
+        key = tuple(sorted(set(int(s) for s in sources)))
+        if not key:
+            raise ValueError("sources must not be empty")
+        if key in self._fields:
+            self._fields.move_to_end(key)
+            return self._fields[key]
+
+        dist, pred, _ = dijkstra(
+            self._graph, directed=True, indices=list(key), min_only=True, return_predecessors=True
+        )
+        # edge weights are symmetric, so the predecessor towards a source is the next hop from the cell
+        pred = np.where(pred < 0, -1, pred).astype(np.intp)
+        field = (dist, pred)
+        if self.cache_size:
+            self._fields[key] = field
+            if len(self._fields) > self.cache_size:
+                self._fields.popitem(last=False)
+        logger.debug(f"Computed distance field for {len(key)} sources")
+        return field
+
+    def route_to(self, sources: Iterable[int], start: int) -> Tuple[List[int], float]:
+        """
+        Route from a cell to the nearest of the sources using the cached distance field.
+
+        Args:
+            sources (Iterable[int]): Target cell indices.
+            start (int): Starting cell index.
+
+        Returns:
+            Tuple[List[int], float]: Cell indices from start to the reached source and the total cost
+            (empty list and ``inf`` if no source is reachable).
+        """
+        dist, next_hop = self.distance_field(sources)
+        if not np.isfinite(dist[start]):
+            return [], float('inf')
+        path = [int(start)]
+        while next_hop[path[-1]] >= 0:
+            path.append(int(next_hop[path[-1]]))
+        return path, float(dist[start])
+
+    def find_path(self, start: int, goal: int) -> Tuple[List[int], float]:
+        """
+        Find a cheapest path between two cells with A*.
+
+        The heuristic is the straight-line centroid distance scaled by the cheapest movement cost,
+        which never overestimates the remaining cost. If a distance field towards the goal is
+        already cached, the path is read from it instead of searching.
+
+        Args:
+            start (int): Starting cell index.
+            goal (int): Goal cell index.
+
+        Returns:
+            Tuple[List[int], float]: Cell indices from start to goal and the total cost
+            (empty list and ``inf`` if the goal is unreachable).
+        """
+        n = len(self.centroids)
+        if not (0 <= start < n and 0 <= goal < n):
+            raise IndexError("start and goal must be valid cell indices")
+        if (goal,) in self._fields:
+            return self.route_to((goal,), start)
+
+        goal_xy = self.centroids[goal]
+        g = np.full(n, np.inf)
+        came_from = np.full(n, -1, dtype=np.intp)
+        closed = np.zeros(n, dtype=bool)
+        g[start] = 0.0
+        heap = [(0.0, start)]
+        while heap:
+            _, u = heappop(heap)
+            if closed[u]:
+                continue
+            if u == goal:
+                break
+            closed[u] = True
+            lo, hi = self.indptr[u], self.indptr[u + 1]
+            nbrs = self.indices[lo:hi]
+            cand = g[u] + self.weights[lo:hi]
+            better = cand < g[nbrs]
+            if not better.any():
+                continue
+            nbrs, cand = nbrs[better], cand[better]
+            g[nbrs] = cand
+            came_from[nbrs] = u
+            h = np.linalg.norm(self.centroids[nbrs] - goal_xy, axis=1) * self._min_cost
+            for v, f in zip(nbrs.tolist(), (cand + h).tolist()):
+                heappush(heap, (f, v))
+
+        if not np.isfinite(g[goal]):
+            return [], float('inf')
+        path = [int(goal)]
+        while path[-1] != start:
+            path.append(int(came_from[path[-1]]))
+        return path[::-1], float(g[goal])
+
+
+if __name__ == "__main__":
+    from imperial_generals.map import PoissonDiscSampler
+
+    sample_points = PoissonDiscSampler.generate(100, 100, 5)
+    voronoi = VoronoiMap(sample_points, width=100, height=100)
+    voronoi.generate_diagram()
+    finder = Pathfinder(voronoi)
+    path, cost = finder.find_path(0, len(sample_points) - 1)
+    print(f"Path of {len(path)} cells with cost {cost:.2f}")
@@ -3,28 +3,80 @@ Poisson disc sampling for 2D point generation.
 """
 
 # base libs
-from typing import List, Tuple
+from typing import Callable, Dict, List, Optional, Tuple, Union
 import logging
-from collections import defaultdict
 
 # ext libs
 import numpy as np
-from scipy.spatial import KDTree
 
 # Inherit logging configuration from the main application
 logger = logging.getLogger(__name__)
 
+# A minimum distance: one number, a callable mapping (n, 2) points to (n,) distances, or a raster
+MinDistance = Union[float, Callable[[np.ndarray], np.ndarray], np.ndarray]
+
+
 class PoissonDiscSampler:
     """
     Implements Poisson disc sampling for generating evenly distributed 2D points.
+
+    The minimum distance may vary over the map (dense cells around cities, sparse cells in the
+    wilderness). Two points p and q must then be at least ``min(r_p, r_q)`` apart, where r is the
+    minimum distance at each point, and new points are drawn in the annulus [r, 2r) around an
+    active point. Accepted points are kept in a multi-resolution grid: a point of radius r goes to
+    the level whose cells are r/2 wide (rounded down to a power of two times the first point's
+    radius), where it is the only point in its cell. A neighbour check therefore looks at a small,
+    fixed window of cells per level, however much the radii differ.
     """
 
+    @staticmethod
+    def _radius_field(min_distance: MinDistance, width: float, height: float) -> Callable[[np.ndarray], np.ndarray]:
+        """
+        Wrap a minimum distance specification as a vectorised function of point coordinates.
+
+        Raster fields cover the whole map, with row 0 at the top (y = height) as in
+        ``VoronoiMap.rasterize``; each point takes the value of the pixel it falls in.
+
+        Raises:
+            TypeError: If min_distance is not a number, callable or 2D array.
+            ValueError: If a scalar or raster distance is not positive.
+        """
+        if callable(min_distance):
+            def field(points: np.ndarray) -> np.ndarray:
+                radii = np.broadcast_to(np.asarray(min_distance(points), dtype=float), (len(points),))
+                if not (np.isfinite(radii) & (radii > 0)).all():
+                    raise ValueError("min_distance field must return positive, finite distances")
+                return radii
+            return field
+
+        if isinstance(min_distance, np.ndarray):
+            raster = np.asarray(min_distance, dtype=float)
+            if raster.ndim != 2 or raster.size == 0:
+                raise ValueError("min_distance raster must be a non-empty 2D array")
+            if not (np.isfinite(raster) & (raster > 0)).all():
+                raise ValueError("min_distance raster must be positive and finite")
+            rows, cols = raster.shape
+
+            def field(points: np.ndarray) -> np.ndarray:
+                col = np.clip((points[:, 0] * (cols / width)).astype(np.intp), 0, cols - 1)
+                row = np.clip(((height - points[:, 1]) * (rows / height)).astype(np.intp), 0, rows - 1)
+                return raster[row, col]
+            return field
+
+        if not isinstance(min_distance, (int, float)):
+            raise TypeError("min_distance must be a number, a callable or a 2D array")
+        if min_distance <= 0:
+            raise ValueError("min_distance must be positive")
+        radius = float(min_distance)
+        return lambda points: np.full(len(points), radius)
+
     @staticmethod
     def generate(
         width: float,
         height: float,
-        min_distance: float,
-        k: int = 20
+        min_distance: MinDistance,
+        k: int = 20,
+        seed: Optional[Union[int, np.random.Generator]] = None
     ) -> List[Tuple[float, float]]:
         """
         Generate 2D points using Poisson disc sampling.
@@ -32,8 +84,11 @@ class PoissonDiscSampler:
         Args:
             width (float): Width of the sampling area.
             height (float): Height of the sampling area.
-            min_distance (float): Minimum allowed distance between points.
-            k (int, optional): Number of attempts per active point. Defaults to 30.
+            min_distance (float | callable | np.ndarray): Minimum allowed distance between points:
+                a number, a callable taking an (n, 2) array of points and returning their (n,)
+                distances, or a 2D raster of distances covering the map (row 0 at the top).
+            k (int, optional): Number of attempts per active point. Defaults to 20.
+            seed (int | np.random.Generator, optional): Seed or generator for reproducible sampling.
 
         Returns:
             List[Tuple[float, float]]: List of sampled (x, y) points.
@@ -43,90 +98,111 @@ class PoissonDiscSampler:
             raise TypeError("width must be a number")
         if not isinstance(height, (int, float)):
             raise TypeError("height must be a number")
-        if not isinstance(min_distance, (int, float)):
-            raise TypeError("min_distance must be a number")
         if not isinstance(k, int):
             raise TypeError("k must be an integer")
+        if seed is not None and not isinstance(seed, (int, np.random.Generator)):
+            raise TypeError("seed must be an int, a numpy Generator or None")
         # Value checks
         if width < 0:
             raise ValueError("width must be non-negative")
         if height < 0:
             raise ValueError("height must be non-negative")
-        if min_distance <= 0:
-            raise ValueError("min_distance must be positive")
+        field = PoissonDiscSampler._radius_field(min_distance, width, height)
         if k <= 0:
             raise ValueError("k must be positive")
         if width == 0 or height == 0:
             return []
 
-        cell_size = min_distance / 2 # Cell size for grid
-        grid_width = int(np.ceil(width / cell_size)) # Number of cells in x direction
-        grid_height = int(np.ceil(height / cell_size)) # Number of cells in y direction
-        grid: defaultdict[Tuple[int, int], List[Tuple[float, float]]] = defaultdict(list) # Spatial grid initialization
-        points: List[Tuple[float, float]] = [] # Final list of points
-        active: List[Tuple[float, float]] = [] # List of active points
-
-        logger.info("Starting Poisson disc sampling: width=%s, height=%s, min_distance=%s, k=%s", width, height, min_distance, k)
-        logger.debug("Cell size: %s, Grid size: (%s, %s)", cell_size, grid_width, grid_height)
-
-        # Generate the initial random point
-        pt = (np.random.uniform(0, width), np.random.uniform(0, height))
-        points.append(pt)
-        active.append(pt)
-        grid[(int(pt[0] // cell_size), int(pt[1] // cell_size))].append(pt)
-        logger.info("Initial point: %s", pt)
+        rng = np.random.default_rng(seed)
+        logger.info("Starting Poisson disc sampling: width=%s, height=%s, k=%s", width, height, k)
+
+        # Generate the initial random point; its radius anchors the grid levels
+        pt = np.array([[rng.uniform(0, width), rng.uniform(0, height)]])
+        base = float(field(pt)[0])
+        grids: Dict[int, np.ndarray] = {} # level -> cell grid holding point indices (-1 empty)
+        coords = np.zeros((1024, 2)) # accepted points (first n rows used)
+        radii = np.zeros(1024) # minimum distance at each accepted point
+        n = 0
+        pad = 4 # conflicts lie within 4 cells (radius < 4 cell widths on each level)
+
+        def cell_size(level: int) -> float:
+            return base * 2.0 ** level / 2
+
+        def insert(point: np.ndarray, radius: float) -> None:
+            nonlocal coords, radii, n
+            if n == len(coords):
+                coords = np.concatenate([coords, np.zeros_like(coords)])
+                radii = np.concatenate([radii, np.zeros_like(radii)])
+            coords[n], radii[n] = point, radius
+            level = int(np.floor(np.log2(radius / base)))
+            size = cell_size(level)
+            if level not in grids:
+                # padded so that neighbour windows never need bounds checks
+                grids[level] = np.full(
+                    (int(np.ceil(height / size)) + 1 + 2 * pad, int(np.ceil(width / size)) + 1 + 2 * pad),
+                    -1, dtype=np.int32
+                )
+            grids[level][int(point[1] // size) + pad, int(point[0] // size) + pad] = n
+            n += 1
+
+        def blocked(candidates: np.ndarray, cand_radii: np.ndarray) -> np.ndarray:
+            # a candidate conflicts with p if closer than min(r_p, r_candidate)
+            hit = np.zeros(len(candidates), dtype=bool)
+            for level, grid in grids.items():
+                size = cell_size(level)
+                # points on this level have radius < 4 * size, so nothing further can conflict
+                reach = np.minimum(cand_radii.max(), 4 * size)
+                offsets = np.arange(-int(np.ceil(reach / size)), int(np.ceil(reach / size)) + 1)
+                gx = (candidates[:, 0] // size).astype(np.intp)[:, None, None] + (offsets + pad)[None, None, :]
+                gy = (candidates[:, 1] // size).astype(np.intp)[:, None, None] + (offsets + pad)[None, :, None]
+                idx = grid[gy, gx].reshape(len(candidates), -1)
+                d2 = ((coords[idx] - candidates[:, None, :]) ** 2).sum(axis=2)
+                limit = np.minimum(radii[idx], cand_radii[:, None]) - 1e-8
+                hit |= ((idx >= 0) & (d2 <= limit * limit)).any(axis=1)
+            return hit
+
+        insert(pt[0], base)
+        active: List[int] = [0] # Indices of active points
+        logger.info("Initial point: %s", tuple(pt[0]))
 
         # Main loop: process active points
         while active:
-            idx = np.random.randint(len(active))
+            idx = rng.integers(len(active))
             center = active[idx]
-            found = False
-            logger.debug("Processing active point: %s (index %s)", center, idx)
-
-            # Build KDTree from current points (if any)
-            tree = KDTree(points) if points else None
-
-            # Try up to k times to generate a valid new point
-            for attempt in range(k):
-                angle = np.random.uniform(0, 2 * np.pi)
-                r = np.random.uniform(min_distance, 2 * min_distance)
-                new_pt = (
-                    center[0] + r * np.cos(angle),
-                    center[1] + r * np.sin(angle)
-                )
-                logger.debug("Attempt %s: Generated candidate point %s", attempt, new_pt)
-
-                # Check if the new point is within bounds
-                if not (0 <= new_pt[0] < width and 0 <= new_pt[1] < height):
-                    logger.debug("Candidate point %s out of bounds", new_pt)
-                    continue
-
-                gx, gy = int(new_pt[0] // cell_size), int(new_pt[1] // cell_size)
-
-                # Use KDTree to check for neighbors within min_distance
-                if tree is not None:
-                    close_idx = tree.query_ball_point(new_pt, min_distance - 1e-8)
-                    if close_idx:
-                        logger.debug("Candidate point %s too close to KDTree neighbors", new_pt)
-                        continue
-                
-                # Accept the new point:
-                points.append(new_pt)
-                active.append(new_pt)
-                grid[(gx, gy)].append(new_pt)
-                found = True
-                logger.info("Accepted new point: %s", new_pt)
-                break
-
-            # If no valid point was found, remove the center from active list
-            if not found:
-                logger.debug("No valid point found for active point %s, removing from active list", center)
-                active.pop(idx)
-
-        logger.info("Sampling complete. Generated %d points.", len(points))
-        return points
+
+            # Try k candidates in the annulus [r, 2r) around the active point, keep the first valid one
+            u = rng.random((k, 2))
+            angle = 2 * np.pi * u[:, 0]
+            r = radii[center] * (1 + u[:, 1])
+            candidates = coords[center] + np.column_stack([r * np.cos(angle), r * np.sin(angle)])
+            inside = (
+                (candidates[:, 0] >= 0) & (candidates[:, 0] < width)
+                & (candidates[:, 1] >= 0) & (candidates[:, 1] < height)
+            )
+            candidates = candidates[inside]
+            accepted = -1
+            if len(candidates):
+                cand_radii = field(candidates)
+                free = np.flatnonzero(~blocked(candidates, cand_radii))
+                if len(free):
+                    accepted = free[0]
+
+            if accepted >= 0:
+                insert(candidates[accepted], float(cand_radii[accepted]))
+                active.append(n - 1)
+                logger.debug("Accepted new point: %s", tuple(candidates[accepted]))
+            else:
+                # If no valid point was found, remove the center from the active list
+                active[idx] = active[-1]
+                active.pop()
+
+        logger.info("Sampling complete. Generated %d points.", n)
+        return [tuple(p) for p in coords[:n].tolist()]
 
 
 if __name__ == "__main__":
     samples = PoissonDiscSampler.generate(100, 100, 5)
     print(f"Generated {len(samples)} points.")
+    # denser towards the left edge
+    varied = PoissonDiscSampler.generate(100, 100, lambda p: 1 + p[:, 0] / 10)
+    print(f"Generated {len(varied)} points with a variable minimum distance.")
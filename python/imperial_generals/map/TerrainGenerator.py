@@ -0,0 +1,228 @@
+"""
+Noise-based elevation and terrain classification for map cells.
+"""
+
+# base libs
+from typing import TYPE_CHECKING, Dict, Optional, Union
+import logging
+
+# ext libs
+import numpy as np
+
+if TYPE_CHECKING:
+    from imperial_generals.map.VoronoiMap import VoronoiMap
+
+# Inherit logging configuration from the main application
+logger = logging.getLogger(__name__)
+
+# Terrain classes, indexed by the integer codes stored in the terrain array
+TERRAIN_TYPES = ('water', 'plains', 'forest', 'hills', 'mountains')
+
+# Movement cost multiplier per terrain class (np.inf = impassable)
+TERRAIN_MOVE_COSTS = {
+    'water': np.inf,
+    'plains': 1.0,
+    'forest': 2.0,
+    'hills': 2.5,
+    'mountains': 4.0,
+}
+
+
+class TerrainGenerator:
+    """
+    Generates elevation and terrain classes from fractal gradient (Perlin) noise.
+
+    Noise is evaluated for all query points at once with NumPy, so a whole map is a handful of
+    array operations per octave regardless of the number of cells. Elevation lies in [0, 1].
+    A second, independent noise field (moisture) separates forest from plains on low ground.
+
+    Attributes:
+        octaves (int): Number of noise layers summed.
+        frequency (float): Noise features across the longer map side in the first octave.
+        persistence (float): Amplitude multiplier between octaves.
+        lacunarity (float): Frequency multiplier between octaves.
+        sea_level (float): Elevation below which cells are water.
+        hill_level (float): Elevation above which cells are hills.
+        mountain_level (float): Elevation above which cells are mountains.
+        forest_moisture (float): Moisture above which low ground is forest.
+    """
+
+    def __init__(
+        self,
+        seed: Optional[Union[int, np.random.Generator]] = None,
+        octaves: int = 5,
+        frequency: float = 3.0,
+        persistence: float = 0.5,
+        lacunarity: float = 2.0,
+        sea_level: float = 0.3,
+        hill_level: float = 0.65,
+        mountain_level: float = 0.8,
+        forest_moisture: float = 0.55
+    ) -> None:
+        """
+        Initialize the TerrainGenerator.
+
+        Args:
+            seed (int | np.random.Generator, optional): Seed or generator for reproducible terrain.
+            octaves (int): Number of noise layers summed.
+            frequency (float): Noise features across the longer map side in the first octave.
+            persistence (float): Amplitude multiplier between octaves.
+            lacunarity (float): Frequency multiplier between octaves.
+            sea_level (float): Elevation below which cells are water.
+            hill_level (float): Elevation above which cells are hills.
+            mountain_level (float): Elevation above which cells are mountains.
+            forest_moisture (float): Moisture above which low ground is forest.
+
+        Raises:
+            ValueError: If octaves is not positive or the elevation levels are not increasing.
+        """
+        if not isinstance(octaves, int) or octaves <= 0:
+            raise ValueError("octaves must be a positive integer")
+        if frequency <= 0:
+            raise ValueError("frequency must be positive")
+        if not 0 <= sea_level <= hill_level <= mountain_level <= 1:
+            raise ValueError("levels must satisfy 0 <= sea_level <= hill_level <= mountain_level <= 1")
+        self.octaves: int = octaves
+        self.frequency: float = frequency
+        self.persistence: float = persistence
+        self.lacunarity: float = lacunarity
+        self.sea_level: float = sea_level
+        self.hill_level: float = hill_level
+        self.mountain_level: float = mountain_level
+        self.forest_moisture: float = forest_moisture
+
+        rng = np.random.default_rng(seed)
+        # one permutation table per field plus random per-octave offsets to decorrelate the layers
+        self._perms = {field: rng.permutation(256) for field in ('elevation', 'moisture')}
+        self._offsets = {field: rng.uniform(0, 256, size=(octaves, 2)) for field in ('elevation', 'moisture')}
+        angles = rng.uniform(0, 2 * np.pi, size=256)
+        self._gradients = np.column_stack([np.cos(angles), np.sin(angles)])
+
+    def __str__(self) -> str:
+        return f"TerrainGenerator(octaves={self.octaves}, frequency={self.frequency}, sea_level={self.sea_level})"
+
+    def __repr__(self) -> str:
+        return (
+            f"<TerrainGenerator(octaves={self.octaves}, frequency={self.frequency}, "
+            f"persistence={self.persistence}, lacunarity={self.lacunarity}, sea_level={self.sea_level}, "
+            f"hill_level={self.hill_level}, mountain_level={self.mountain_level}, "
+            f"forest_moisture={self.forest_moisture})>"
+        )
+
+    def _gradient_noise(self, x: np.ndarray, y: np.ndarray, perm: np.ndarray) -> np.ndarray:
+        """
+        Evaluate single-octave 2D gradient noise at arrays of coordinates.
+        Returns:
+            np.ndarray: Noise values, roughly in [-0.71, 0.71].
+        """
+        xi = np.floor(x).astype(np.int64)
+        yi = np.floor(y).astype(np.int64)
+        xf = x - xi
+        yf = y - yi
+
+        def corner(dx: int, dy: int) -> np.ndarray:
+            h = perm[(perm[(xi + dx) & 255] + yi + dy) & 255]
+            g = self._gradients[h]
+            return g[:, 0] * (xf - dx) + g[:, 1] * (yf - dy)
+
+        # quintic fade curve for smooth interpolation
+        u = xf * xf * xf * (xf * (xf * 6 - 15) + 10)
+        v = yf * yf * yf * (yf * (yf * 6 - 15) + 10)
+        bottom = corner(0, 0) + u * (corner(1, 0) - corner(0, 0))
+        top = corner(0, 1) + u * (corner(1, 1) - corner(0, 1))
+        return bottom + v * (top - bottom)
+
+    def fractal_noise(self, points: np.ndarray, scale: float, field: str = 'elevation') -> np.ndarray:
+        """
+        Evaluate multi-octave fractal noise at every point.
+
+        Args:
+            points (np.ndarray): Array of shape (n, 2) with (x, y) coordinates.
+            scale (float): Reference length (the longer map side); the first octave has
+                ``frequency`` noise periods across it.
+            field (str): Which noise field to sample, 'elevation' or 'moisture'.
+
+        Returns:
+            np.ndarray: Noise values in [0, 1].
+        """
+        points = np.asarray(points, dtype=float).reshape(-1, 2)
+        perm, offsets = self._perms[field], self._offsets[field]
+        total = np.zeros(len(points))
+        amplitude, frequency, norm = 1.0, self.frequency / scale, 0.0
+        for octave in range(self.octaves):
+            x = points[:, 0] * frequency + offsets[octave, 0]
+            y = points[:, 1] * frequency + offsets[octave, 1]
+            total += amplitude * self._gradient_noise(x, y, perm)
+            norm += amplitude
+            amplitude *= self.persistence
+            frequency *= self.lacunarity
+        return np.clip(0.5 + total / norm * np.sqrt(2), 0.0, 1.0)
+
+    def generate(self, centroids: np.ndarray, width: float, height: float) -> Dict[str, np.ndarray]:
+        """
+        Assign elevation, moisture and terrain class to every cell.
+
+        Args:
+            centroids (np.ndarray): Cell centroids of shape (n_cells, 2).
+            width (float): Width of the map.
+            height (float): Height of the map.
+
+        Returns:
+            dict: {
+                'elevation': float32 array in [0, 1],
+                'moisture': float32 array in [0, 1],
+                'terrain': int8 array of indices into TERRAIN_TYPES
+            }, all aligned with the cell indices.
+        """
+        scale = float(max(width, height, 1))
+        elevation = self.fractal_noise(centroids, scale, 'elevation')
+        moisture = self.fractal_noise(centroids, scale, 'moisture')
+
+        terrain = np.where(moisture > self.forest_moisture, TERRAIN_TYPES.index('forest'), TERRAIN_TYPES.index('plains'))
+        terrain[elevation >= self.hill_level] = TERRAIN_TYPES.index('hills')
+        terrain[elevation >= self.mountain_level] = TERRAIN_TYPES.index('mountains')
+        terrain[elevation < self.sea_level] = TERRAIN_TYPES.index('water')
+
+        logger.info(f"Generated terrain for {len(elevation)} cells.")
+        return {
+            'elevation': elevation.astype(np.float32),
+            'moisture': moisture.astype(np.float32),
+            'terrain': terrain.astype(np.int8),
+        }
+
+    def update_cells(self, voronoi: "VoronoiMap", cells: np.ndarray) -> None:
+        """
+        Recompute elevation, moisture and terrain of some cells in ``voronoi.cell_data``, in place.
+
+        Values depend only on the cell centroid, so the result matches a full ``generate`` over the
+        reshaped map. Registered in ``VoronoiMap.cell_updaters`` by MapGenerator.
+
+        Args:
+            voronoi (VoronoiMap): Map whose cell_data holds the fields from ``generate``.
+            cells (np.ndarray): Indices of the cells to recompute.
+        """
+        fields = self.generate(voronoi.get_centroids(cells), voronoi.width, voronoi.height)
+        for name, values in fields.items():
+            if name in voronoi.cell_data:
+                voronoi.cell_data[name][cells] = values
+
+    @staticmethod
+    def movement_costs(terrain: np.ndarray) -> np.ndarray:
+        """
+        Map terrain class codes to movement costs (see TERRAIN_MOVE_COSTS), e.g. for a Pathfinder.
+
+        Args:
+            terrain (np.ndarray): Terrain class codes.
+
+        Returns:
+            np.ndarray: Movement cost per cell.
+        """
+        table = np.array([TERRAIN_MOVE_COSTS[t] for t in TERRAIN_TYPES])
+        return table[np.asarray(terrain, dtype=np.intp)]
+
+
+if __name__ == "__main__":
+    points = np.random.default_rng(0).uniform(0, 100, size=(10, 2))
+    terrain = TerrainGenerator(seed=0).generate(points, 100, 100)
+    for (x, y), elev, code in zip(points, terrain['elevation'], terrain['terrain']):
+        print(f"({x:5.1f}, {y:5.1f}) elevation={elev:.2f} terrain={TERRAIN_TYPES[code]}")
@@ -4,10 +4,10 @@ Voronoi diagram computation utilities.
 """
 
 import numpy as np
-from scipy.spatial import Voronoi
+import shapely
+from scipy.spatial import Voronoi, cKDTree
 from shapely.geometry import Polygon, box
-import matplotlib.pyplot as plt
-from typing import List, Tuple, Any, Optional
+from typing import Callable, Dict, List, Tuple, Any, Optional
 import logging
 
 # Configure logging for this module
@@ -15,6 +15,14 @@ logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 
 
+def __getattr__(name: str) -> Any:
+    # matplotlib is only needed for the visualize_* methods; load pyplot on first use
+    if name == "plt":
+        import matplotlib.pyplot as plt
+        return plt
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 class VoronoiMap:
     def __init__(self, points: List[Tuple[float, float]], width: int = 100, height: int = 100) -> None:
         """
@@ -29,7 +37,18 @@ class VoronoiMap:
         self.width: int = width
         self.height: int = height
         self.diagram: Optional[Voronoi] = None
-        self.polygons: List[Polygon] = []
+        self._polygons: Optional[List[Polygon]] = []
+        self._polygon_arrays: Optional[Tuple[np.ndarray, np.ndarray]] = None
+        self.polygon_sites: np.ndarray = np.empty(0, dtype=np.intp)
+        self.cell_data: Dict[str, np.ndarray] = {}
+        self._tree: Optional[cKDTree] = None
+        self._extra_tree: Optional[cKDTree] = None
+        self._adjacency: Optional[Tuple[np.ndarray, np.ndarray]] = None
+        # per-cell adjacency rows, site -> polygon index and growable buffers used by add_points
+        self._neighbours: Optional[List[np.ndarray]] = None
+        self._site_position: Optional[np.ndarray] = None
+        self._buffers: Dict[str, np.ndarray] = {}
+        self.cell_updaters: List[Callable[["VoronoiMap", np.ndarray], None]] = []
         logger.info(f"Initialized VoronoiMap with {len(points)} points, width={width}, height={height}")
 
 
@@ -45,15 +64,296 @@ class VoronoiMap:
         )
 
 
+    @property
+    def polygons(self) -> List[Polygon]:
+        """
+        Clipped cell polygons, one per entry of ``polygon_sites``.
+
+        Maps loaded from arrays (see ``from_arrays``) build their Shapely polygons on first access.
+        """
+        if self._polygons is None:
+            vertices, offsets = self._polygon_arrays
+            ring_index = np.repeat(np.arange(len(offsets) - 1), np.diff(offsets))
+            rings = shapely.linearrings(np.asarray(vertices), indices=ring_index)
+            self._polygons = list(shapely.polygons(rings))
+        return self._polygons
+
+
+    @polygons.setter
+    def polygons(self, polygons: List[Polygon]) -> None:
+        self._polygons = polygons
+        self._polygon_arrays = None
+
+
     def add_points(self, points: List[Tuple[float, float]]) -> None:
         """
         Add points to the diagram.
+
+        If the map has cells (generated, or restored with ``from_arrays``), each new site is
+        inserted locally, at a cost that grows with the cells it changes rather than with the map:
+            - its parent cell is found by walking the adjacency graph from the nearest site in
+              the KD-tree;
+            - the cells the new site takes ground from are collected breadth-first from the
+              parent (a cell is reached only through a neighbour that also lost ground, and loses
+              ground itself iff one of its vertices is closer to the new site than to its own);
+            - the new cell is the map box clipped by the half-planes against those cells, and
+              each of them is clipped by the half-plane against the new site;
+            - only their adjacency rows change: the new cell borders the cells it took ground
+              from, and two of those stay neighbours while their common edge survives.
+        Points, cell attributes and polygon indices live in growable buffers, and adjacency is
+        kept as one row per cell, so no per-call copy of a whole-map array remains; the CSR
+        arrays of ``get_adjacency`` are rebuilt on the next call. The first insertion into a map
+        builds these structures once, and the Qhull ``diagram`` is dropped (it is not updated;
+        ``generate_diagram`` rebuilds it).
+
+        ``cell_data`` is extended with the values of the cell each new site was placed in. Stages
+        deriving attributes from the cell geometry register a callback in ``cell_updaters``,
+        called once per call with the indices of the new and reshaped cells to recompute (or
+        invalidate) their fields; ``MapGenerator`` registers the terrain and hydrology stages.
+
+        On a map without cells the points are only appended.
+
         Args:
             points (List[Tuple[float, float]]): Points to add.
+
+        Raises:
+            ValueError: If the map has cells and a point lies outside the map bounds or on an
+                existing site.
+        """
+        new_points = np.asarray(points, dtype=float).reshape(-1, 2)
+        if not self._has_cells() or len(new_points) == 0:
+            self.points = np.vstack([np.asarray(self.points, dtype=float).reshape(-1, 2), new_points])
+            self._tree = None
+            self._extra_tree = None
+            self._adjacency = None
+            self._neighbours = None
+            logger.info(f"Added {len(new_points)} points. Total now: {len(self.points)}")
+            return
+        outside = (new_points < 0).any(axis=1) | (new_points[:, 0] > self.width) | (new_points[:, 1] > self.height)
+        if outside.any():
+            raise ValueError(f"Cannot add points outside the map bounds: {new_points[outside].tolist()}")
+
+        if self._neighbours is None:
+            indptr, indices = self.get_adjacency()
+            self._neighbours = np.split(np.asarray(indices, dtype=np.intp), np.asarray(indptr[1:-1]))
+        # restored maps build their polygons now, since insertions edit them in place
+        self._polygons = self.polygons
+        self._cell_positions()
+        # parents are looked up before any new site is indexed, so all inherit from existing cells
+        parents = [self._walk_to_nearest(point) for point in new_points]
+        duplicate = (self.points[parents] == new_points).all(axis=1)
+        if duplicate.any() or len(np.unique(new_points, axis=0)) < len(new_points):
+            raise ValueError(f"Cannot add a point on an existing site: {new_points[duplicate].tolist()}")
+        n_old = len(self.points)
+        self.points = self._grow('points', np.asarray(self.points, dtype=float), new_points)
+        for name, values in self.cell_data.items():
+            values = np.asarray(values)
+            self.cell_data[name] = self._grow(f"cell_{name}", values, values[parents])
+
+        changed = set()
+        for site, parent in zip(range(n_old, len(self.points)), parents):
+            changed.update(self._insert_site(site, parent))
+        self._adjacency = None
+        self._polygon_arrays = None
+        self.diagram = None
+
+        cells = np.array(sorted(changed), dtype=np.intp)
+        for updater in self.cell_updaters:
+            updater(self, cells)
+        logger.info(
+            f"Added {len(new_points)} points. Total now: {len(self.points)}; "
+            f"reshaped {len(cells) - len(new_points)} cells"
+        )
+
+
+    def _cell_positions(self) -> np.ndarray:
+        """Index into ``polygons`` of each site's cell (-1 for sites without a cell), built on first use."""
+        if self._site_position is None or len(self._site_position) != len(self.points):
+            position = np.full(len(self.points), -1, dtype=np.intp)
+            position[self.polygon_sites] = np.arange(len(self.polygon_sites))
+            self._site_position = position
+        return self._site_position
+
+
+    def _has_cells(self) -> bool:
+        """Whether the map has clipped cells (generated, or restored from arrays)."""
+        return self._polygon_arrays is not None or bool(self._polygons)
+
+
+    def _grow(self, name: str, values: np.ndarray, extra: np.ndarray) -> np.ndarray:
+        """
+        Append rows to an array, in place when it is a prefix of the named buffer with room left.
+
+        Buffers double when full, so appending costs amortised O(len(extra)).
+        Returns:
+            np.ndarray: A view of the first ``len(values) + len(extra)`` rows of the buffer.
+        """
+        n, k = len(values), len(extra)
+        buffer = self._buffers.get(name)
+        if (
+            buffer is None or values.base is not buffer or values.ctypes.data != buffer.ctypes.data
+            or values.dtype != buffer.dtype or len(buffer) < n + k
+        ):
+            buffer = np.empty((max(2 * (n + k), 16),) + values.shape[1:], dtype=values.dtype)
+            buffer[:n] = values
+            self._buffers[name] = buffer
+        buffer[n:n + k] = extra
+        return buffer[:n + k]
+
+
+    def _walk_to_nearest(self, point: np.ndarray) -> int:
+        """
+        Index of the site nearest to a point inside the map.
+
+        Starts from the nearest site in the KD-tree (which may predate recent insertions) and
+        walks the adjacency graph to ever closer sites: inside the map the segment from a site to
+        the point crosses the edge of a closer neighbour until the nearest site is reached.
+        """
+        n_tree = 0 if self._tree is None else self._tree.n
+        if self._tree is None or len(self.points) - n_tree > max(1024, n_tree // 8):
+            self._tree = cKDTree(self.points)
+            self._extra_tree = None
+        _, current = self._tree.query(point)
+        if self._site_position[current] < 0:
+            # a site whose cell was swallowed by later insertions has no neighbours to walk
+            current = self._nearest_sites(point[None])[0]
+        best = float(np.sum((self.points[current] - point) ** 2))
+        while True:
+            neighbours = self._neighbours[current]
+            if not len(neighbours):
+                return int(current)
+            distances = np.sum((self.points[neighbours] - point) ** 2, axis=1)
+            closest = int(np.argmin(distances))
+            if distances[closest] >= best:
+                return int(current)
+            current, best = neighbours[closest], float(distances[closest])
+
+
+    def _insert_site(self, site: int, parent: int) -> List[int]:
+        """
+        Insert an indexed site into the cells and adjacency rows around its parent cell.
+        Args:
+            site (int): Index of the new site in ``self.points``.
+            parent (int): Index of the site whose cell contains it.
+        Returns:
+            List[int]: The new cell and the cells it took ground from.
+        """
+        p = self.points[site]
+        tol = 1e-9 * max(self.width, self.height, 1)
+        position = self._site_position
+
+        # cells losing ground to the new site, breadth-first from its parent
+        vertices = {parent: self._cell_vertices(parent)}
+        affected, queue, seen = [], [parent], {parent}
+        while queue:
+            cell = queue.pop()
+            affected.append(cell)
+            for neighbour in self._neighbours[cell].tolist():
+                if neighbour in seen or position[neighbour] < 0:
+                    continue
+                seen.add(neighbour)
+                vertices[neighbour] = self._cell_vertices(neighbour)
+                if (self._bisector_distance(vertices[neighbour], self.points[neighbour], p) > tol).any():
+                    queue.append(neighbour)
+
+        # the new cell, and what each affected cell keeps
+        cell = np.array([[0, 0], [self.width, 0], [self.width, self.height], [0, self.height]], dtype=float)
+        for other in affected:
+            cell = self._clip_half_plane(cell, p, self.points[other])
+        kept = {other: self._clip_half_plane(vertices[other], self.points[other], p) for other in affected}
+
+        # adjacency: the new cell borders the cells it took ground from along their bisectors,
+        # and two affected cells stay neighbours while their common edge survives
+        row = [other for other in affected if self._shares_edge(cell, p, self.points[other], tol)]
+        rows = {other: set(self._neighbours[other].tolist()) for other in affected}
+        for other in affected:
+            for neighbour in rows[other] & rows.keys():
+                if other > neighbour:
+                    continue
+                if not self._shares_edge(kept[other], self.points[other], self.points[neighbour], tol):
+                    rows[other].discard(neighbour)
+                    rows[neighbour].discard(other)
+        for other in row:
+            rows[other].add(site)
+        for other in affected:
+            if len(kept[other]) < 3 or Polygon(kept[other]).area <= 0:
+                # the cell was swallowed whole and no longer borders anything
+                for neighbour in rows[other]:
+                    rows.get(neighbour, set()).discard(other)
+                rows[other] = set()
+
+        self._neighbours.append(np.array(sorted(row), dtype=np.intp))
+        self._site_position = self._grow('site_position', position, np.array([-1], dtype=np.intp))
+        self._set_cell(site, cell)
+        for other in affected:
+            self._neighbours[other] = np.array(sorted(rows[other]), dtype=np.intp)
+            self._set_cell(other, kept[other])
+        return [site, *affected]
+
+
+    def _cell_vertices(self, site: int) -> np.ndarray:
+        """Exterior ring of a cell's polygon, without the closing vertex."""
+        return np.asarray(self._polygons[self._site_position[site]].exterior.coords)[:-1]
+
+
+    def _set_cell(self, site: int, vertices: np.ndarray) -> None:
+        """
+        Store the polygon of a cell, appending it for a new cell; cells left without area are
+        removed (the last polygon takes their place, so the removal is O(1)).
         """
-        # Note: np.ndarray does not have 'extend', so this may need to be np.vstack or np.concatenate in real usage.
-        self.points = np.vstack([self.points, np.array(points)])
-        logger.info(f"Added {len(points)} points. Total now: {len(self.points)}")
+        polygon = Polygon(vertices) if len(vertices) >= 3 else None
+        if polygon is not None and polygon.area <= 0:
+            polygon = None
+        pos = int(self._site_position[site])
+        if polygon is not None and pos >= 0:
+            self._polygons[pos] = polygon
+        elif polygon is not None:
+            self._polygons.append(polygon)
+            self.polygon_sites = self._grow('polygon_sites', self.polygon_sites, np.array([site], dtype=np.intp))
+            self._site_position[site] = len(self._polygons) - 1
+        elif pos >= 0:
+            last = len(self._polygons) - 1
+            self._polygons[pos] = self._polygons[last]
+            self.polygon_sites[pos] = self.polygon_sites[last]
+            self._site_position[self.polygon_sites[pos]] = pos
+            self._polygons.pop()
+            self.polygon_sites = self.polygon_sites[:last]
+            self._site_position[site] = -1
+
+
+    @staticmethod
+    def _bisector_distance(vertices: np.ndarray, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+        """Signed distance of each vertex past the bisector of sites a and b, towards b."""
+        normal = (b - a) / np.linalg.norm(b - a)
+        return (vertices - (a + b) / 2) @ normal
+
+
+    @staticmethod
+    def _clip_half_plane(vertices: np.ndarray, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+        """Part of a convex polygon at least as close to site a as to site b (one Sutherland-Hodgman pass)."""
+        distance = VoronoiMap._bisector_distance(vertices, a, b)
+        keep = distance <= 0
+        if keep.all():
+            return vertices
+        clipped = []
+        for i in range(len(vertices)):
+            j = (i + 1) % len(vertices)
+            if keep[i]:
+                clipped.append(vertices[i])
+            if keep[i] != keep[j]:
+                t = distance[i] / (distance[i] - distance[j])
+                clipped.append(vertices[i] + t * (vertices[j] - vertices[i]))
+        return np.array(clipped).reshape(-1, 2)
+
+
+    @staticmethod
+    def _shares_edge(vertices: np.ndarray, a: np.ndarray, b: np.ndarray, tol: float) -> bool:
+        """Whether the cell of site a (given by its vertices) has an edge of positive length on the a-b bisector."""
+        on_bisector = vertices[np.abs(VoronoiMap._bisector_distance(vertices, a, b)) <= tol]
+        if len(on_bisector) < 2:
+            return False
+        direction = np.array([a[1] - b[1], b[0] - a[0]])
+        return float(np.ptp(on_bisector @ direction)) / np.linalg.norm(direction) > tol
 
 
     def _order_region(self, vertices: np.ndarray) -> np.ndarray:
@@ -81,55 +381,174 @@ class VoronoiMap:
 
         self.diagram = Voronoi(self.points)
         bbox = box(0, 0, self.width, self.height)
-        self.polygons = []
-
-        center = self.diagram.points.mean(axis=0)
-        radius = np.linalg.norm(self.diagram.points - center, axis=1).max() * 2
-
-        for point_idx, region_idx in enumerate(self.diagram.point_region):
-            region = self.diagram.regions[region_idx]
-            if not region or len(region) == 0:
-                continue
-
-            if -1 not in region:
-                # Finite region: create polygon from vertices
-                polygon = Polygon([self.diagram.vertices[i] for i in region])
-            else:
-                # Infinite region: reconstruct polygon by extending infinite ridges
-                ridge_vertices = []
-                for (p1, p2), (v1, v2) in zip(self.diagram.ridge_points, self.diagram.ridge_vertices):
-                    if point_idx not in (p1, p2):
-                        continue
-                    if v1 == -1 or v2 == -1:
-                        # Infinite ridge: extend to bounding box
-                        finite_v = v2 if v1 == -1 else v1
-                        t = self.diagram.points[p2] - self.diagram.points[p1]
-                        t /= np.linalg.norm(t)
-                        n = np.array([-t[1], t[0]])
-                        midpoint = self.diagram.points[[p1, p2]].mean(axis=0)
-                        direction = np.sign(np.dot(midpoint - center, n)) * n
-                        far_point = self.diagram.vertices[finite_v] + direction * radius
-                        ridge_vertices.append(tuple(self.diagram.vertices[finite_v]))
-                        ridge_vertices.append(tuple(far_point))
-                    else:
-                        ridge_vertices.append(tuple(self.diagram.vertices[v1]))
-                        ridge_vertices.append(tuple(self.diagram.vertices[v2]))
-                # Remove duplicates and order vertices
-                ridge_vertices = np.array(list(dict.fromkeys(ridge_vertices)))
-                if len(ridge_vertices) < 3:
-                    continue
-                centroid = ridge_vertices.mean(axis=0)
-                angles = np.arctan2(ridge_vertices[:,1] - centroid[1], ridge_vertices[:,0] - centroid[0])
-                ridge_vertices = ridge_vertices[np.argsort(angles)]
-                polygon = Polygon(ridge_vertices)
-
-            # Clip polygon to bounding box
-            clipped = polygon.intersection(bbox)
-            if not clipped.is_empty and clipped.geom_type == 'Polygon':
-                self.polygons.append(clipped)
+        self._adjacency = None
+        self._neighbours = None
+        self._site_position = None
+
+        self._ray_center = self.diagram.points.mean(axis=0)
+        self._ray_radius = np.linalg.norm(self.diagram.points - self._ray_center, axis=1).max() * 2
+        point_ridges = self._point_ridges()
+
+        polygons = []
+        polygon_sites = []
+        for point_idx in range(len(self.diagram.point_region)):
+            clipped = self._build_cell(point_idx, point_ridges, bbox)
+            if clipped is not None:
+                polygons.append(clipped)
+                polygon_sites.append(point_idx)
+        self.polygons = polygons
+        self.polygon_sites = np.array(polygon_sites, dtype=np.intp)
         logger.info(f"Generated Voronoi diagram with {len(self.polygons)} polygons.")
 
 
+    def _point_ridges(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Map each cell to the ridges bordering it, in ridge order.
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: CSR (indptr, ridge indices) over cell indices.
+        """
+        ridge_points = np.asarray(self.diagram.ridge_points, dtype=np.intp)
+        owners = ridge_points.ravel()
+        ridge_ids = np.repeat(np.arange(len(ridge_points)), 2)
+        order = np.argsort(owners, kind='stable')
+        indptr = np.zeros(len(self.points) + 1, dtype=np.intp)
+        np.cumsum(np.bincount(owners, minlength=len(self.points)), out=indptr[1:])
+        return indptr, ridge_ids[order]
+
+
+    def _build_cell(
+        self, point_idx: int, point_ridges: Tuple[np.ndarray, np.ndarray], bbox: Polygon
+    ) -> Optional[Polygon]:
+        """
+        Build the clipped polygon of one cell from the current diagram.
+        Args:
+            point_idx (int): Index of the cell's site.
+            point_ridges (Tuple[np.ndarray, np.ndarray]): Output of ``_point_ridges``.
+            bbox (Polygon): Bounding box to clip to.
+        Returns:
+            Optional[Polygon]: The clipped cell, or None if it is empty or degenerate.
+        """
+        region = self.diagram.regions[self.diagram.point_region[point_idx]]
+        if not region or len(region) == 0:
+            return None
+
+        if -1 not in region:
+            # Finite region: create polygon from vertices
+            polygon = Polygon([self.diagram.vertices[i] for i in region])
+        else:
+            # Infinite region: reconstruct polygon by extending infinite ridges
+            indptr, ridges = point_ridges
+            ridge_vertices = []
+            for ridge in ridges[indptr[point_idx]:indptr[point_idx + 1]].tolist():
+                p1, p2 = self.diagram.ridge_points[ridge]
+                v1, v2 = self.diagram.ridge_vertices[ridge]
+                if v1 == -1 or v2 == -1:
+                    # Infinite ridge: extend to bounding box
+                    finite_v = v2 if v1 == -1 else v1
+                    t = self.diagram.points[p2] - self.diagram.points[p1]
+                    t /= np.linalg.norm(t)
+                    n = np.array([-t[1], t[0]])
+                    midpoint = self.diagram.points[[p1, p2]].mean(axis=0)
+                    direction = np.sign(np.dot(midpoint - self._ray_center, n)) * n
+                    far_point = self.diagram.vertices[finite_v] + direction * self._ray_radius
+                    ridge_vertices.append(tuple(self.diagram.vertices[finite_v]))
+                    ridge_vertices.append(tuple(far_point))
+                else:
+                    ridge_vertices.append(tuple(self.diagram.vertices[v1]))
+                    ridge_vertices.append(tuple(self.diagram.vertices[v2]))
+            # Remove duplicates and order vertices
+            ridge_vertices = np.array(list(dict.fromkeys(ridge_vertices)))
+            if len(ridge_vertices) < 3:
+                return None
+            polygon = Polygon(self._order_region(ridge_vertices))
+
+        # Clip polygon to bounding box
+        clipped = polygon.intersection(bbox)
+        if not clipped.is_empty and clipped.geom_type == 'Polygon':
+            return clipped
+        return None
+
+
+    def get_polygon_arrays(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Return the cell polygons as flat vertex arrays.
+
+        The exterior ring of polygon ``i`` (without the closing vertex) is
+        ``vertices[offsets[i]:offsets[i + 1]]``.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: (vertices of shape (m, 2), offsets of shape (n_polygons + 1,)).
+        """
+        if self._polygon_arrays is not None:
+            return self._polygon_arrays
+        if not self.polygons:
+            return np.empty((0, 2)), np.zeros(1, dtype=np.int64)
+        rings = shapely.get_exterior_ring(np.asarray(self.polygons, dtype=object))
+        coords = shapely.get_coordinates(rings)
+        counts = shapely.get_num_coordinates(rings)
+        ends = np.cumsum(counts)
+        # drop the closing vertex repeated at the end of each ring
+        keep = np.ones(len(coords), dtype=bool)
+        keep[ends - 1] = False
+        offsets = np.zeros(len(counts) + 1, dtype=np.int64)
+        np.cumsum(counts - 1, out=offsets[1:])
+        return coords[keep], offsets
+
+
+    def to_arrays(self) -> Dict[str, np.ndarray]:
+        """
+        Export the map as a flat dictionary of NumPy arrays (see ``from_arrays``).
+
+        Per-cell attributes from ``cell_data`` are stored under ``cell_<name>`` keys.
+
+        Returns:
+            Dict[str, np.ndarray]: Arrays describing points, polygons, adjacency and cell attributes.
+        """
+        vertices, offsets = self.get_polygon_arrays()
+        indptr, indices = self.get_adjacency()
+        arrays = {
+            'points': np.asarray(self.points, dtype=np.float64).reshape(-1, 2),
+            'polygon_vertices': np.asarray(vertices, dtype=np.float64),
+            'polygon_offsets': np.asarray(offsets, dtype=np.int64),
+            'polygon_sites': np.asarray(self.polygon_sites, dtype=np.int64),
+            'adjacency_indptr': np.asarray(indptr, dtype=np.int64),
+            'adjacency_indices': np.asarray(indices, dtype=np.int64),
+        }
+        for name, values in self.cell_data.items():
+            arrays[f'cell_{name}'] = np.asarray(values)
+        return arrays
+
+
+    @classmethod
+    def from_arrays(cls, arrays: Dict[str, np.ndarray], width: int, height: int) -> "VoronoiMap":
+        """
+        Rebuild a map from the arrays produced by ``to_arrays`` without recomputing the diagram.
+
+        Arrays are used as given (no copy), so memory-mapped inputs stay memory-mapped. The Qhull
+        ``diagram`` is not restored; Shapely polygons are built lazily on first access.
+
+        Args:
+            arrays (Dict[str, np.ndarray]): Arrays as produced by ``to_arrays``.
+            width (int): Width of the bounding rectangle.
+            height (int): Height of the bounding rectangle.
+        Returns:
+            VoronoiMap: The restored map.
+        """
+        voronoi = cls([], width=width, height=height)
+        voronoi.points = arrays['points']
+        voronoi._polygons = None
+        voronoi._polygon_arrays = (arrays['polygon_vertices'], arrays['polygon_offsets'])
+        voronoi.polygon_sites = arrays['polygon_sites']
+        voronoi._adjacency = (arrays['adjacency_indptr'], arrays['adjacency_indices'])
+        voronoi._neighbours = None
+        voronoi._site_position = None
+        voronoi.cell_data = {
+            name[len('cell_'):]: values for name, values in arrays.items() if name.startswith('cell_')
+        }
+        logger.info(f"Restored VoronoiMap with {len(voronoi.points)} points from arrays")
+        return voronoi
+
+
     def get_cells(self) -> Any:
         """
         Return the Voronoi cells (diagram object).
@@ -139,6 +558,230 @@ class VoronoiMap:
         return self.diagram
 
 
+    def get_adjacency(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Return the cell adjacency graph in compressed sparse row form.
+
+        Two cells are adjacent when they share a Voronoi ridge that crosses the map bounds;
+        ridges lying entirely outside the bounding box are dropped, since the clipped cells
+        do not touch there. The neighbours of cell ``i`` are
+        ``indices[indptr[i]:indptr[i + 1]]``. After ``add_points`` the arrays are rebuilt from
+        the per-cell rows it maintains.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: (indptr, indices) arrays over cell indices.
+        """
+        if self._adjacency is not None:
+            return self._adjacency
+        n = len(self.points)
+        if self._neighbours is not None:
+            indptr = np.zeros(n + 1, dtype=np.intp)
+            np.cumsum([len(row) for row in self._neighbours], out=indptr[1:])
+            indices = np.concatenate(self._neighbours) if n else np.empty(0, dtype=np.intp)
+            self._adjacency = (indptr, indices.astype(np.intp, copy=False))
+            return self._adjacency
+        if not isinstance(self.diagram, Voronoi):
+            self._adjacency = (np.zeros(n + 1, dtype=np.intp), np.empty(0, dtype=np.intp))
+            return self._adjacency
+
+        ridge_points = np.asarray(self.diagram.ridge_points, dtype=np.intp)
+        segments = self._ridge_segments()
+        ridge_points = ridge_points[self._segments_in_bounds(segments)]
+
+        # symmetric edge list sorted by source cell
+        src = np.concatenate([ridge_points[:, 0], ridge_points[:, 1]])
+        dst = np.concatenate([ridge_points[:, 1], ridge_points[:, 0]])
+        order = np.lexsort((dst, src))
+        src, dst = src[order], dst[order]
+        indptr = np.zeros(n + 1, dtype=np.intp)
+        np.cumsum(np.bincount(src, minlength=n), out=indptr[1:])
+        self._adjacency = (indptr, dst)
+        return self._adjacency
+
+
+    def _ridge_segments(self) -> np.ndarray:
+        """
+        Return every ridge of the diagram as a segment, extending infinite ridges outwards.
+        Returns:
+            np.ndarray: Array of shape (n_ridges, 2, 2) with segment endpoints.
+        """
+        pts = self.diagram.points
+        ridge_points = np.asarray(self.diagram.ridge_points, dtype=np.intp)
+        ridge_vertices = np.asarray(self.diagram.ridge_vertices, dtype=np.intp)
+        segments = self.diagram.vertices[ridge_vertices]
+
+        infinite = np.flatnonzero((ridge_vertices == -1).any(axis=1))
+        if len(infinite):
+            center = pts.mean(axis=0)
+            radius = np.linalg.norm(pts - center, axis=1).max() * 2 + self.width + self.height
+            p1, p2 = pts[ridge_points[infinite, 0]], pts[ridge_points[infinite, 1]]
+            t = (p2 - p1) / np.linalg.norm(p2 - p1, axis=1)[:, None]
+            n = np.column_stack([-t[:, 1], t[:, 0]])
+            midpoint = (p1 + p2) / 2
+            direction = np.sign(np.einsum('ij,ij->i', midpoint - center, n))[:, None] * n
+            finite_v = ridge_vertices[infinite].max(axis=1)
+            start = self.diagram.vertices[finite_v]
+            segments[infinite, 0] = start
+            segments[infinite, 1] = start + direction * radius
+        return segments
+
+
+    def _segments_in_bounds(self, segments: np.ndarray) -> np.ndarray:
+        """
+        Test which segments cross the bounding box (vectorised Liang-Barsky clipping).
+        Args:
+            segments (np.ndarray): Array of shape (n, 2, 2) with segment endpoints.
+        Returns:
+            np.ndarray: Boolean mask of segments with a non-empty part inside the box.
+        """
+        start = segments[:, 0]
+        delta = segments[:, 1] - start
+        lo = np.zeros(len(segments))
+        hi = np.ones(len(segments))
+        keep = np.ones(len(segments), dtype=bool)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            for axis, limit in ((0, self.width), (1, self.height)):
+                d = delta[:, axis]
+                for p, q in ((-d, start[:, axis]), (d, limit - start[:, axis])):
+                    parallel = p == 0
+                    keep &= ~(parallel & (q < 0))
+                    r = q / p
+                    lo = np.where(~parallel & (p < 0), np.maximum(lo, r), lo)
+                    hi = np.where(~parallel & (p > 0), np.minimum(hi, r), hi)
+        return keep & (lo <= hi)
+
+
+    def get_boundary_cells(self) -> np.ndarray:
+        """
+        Flag the cells whose clipped polygon touches the edge of the map.
+        Returns:
+            np.ndarray: Boolean mask aligned with ``self.points``.
+        """
+        boundary = np.zeros(len(self.points), dtype=bool)
+        if self.polygons:
+            minx, miny, maxx, maxy = shapely.bounds(np.asarray(self.polygons, dtype=object)).T
+            eps = 1e-9 * max(self.width, self.height, 1)
+            boundary[self.polygon_sites] = (
+                (minx <= eps) | (miny <= eps) | (maxx >= self.width - eps) | (maxy >= self.height - eps)
+            )
+        return boundary
+
+
+    def get_centroids(self, cells: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Return the centroid of each clipped cell.
+
+        Cells without a polygon (e.g. before ``generate_diagram`` has run) fall back to their site.
+
+        Args:
+            cells (np.ndarray, optional): Only return the centroids of these cells.
+        Returns:
+            np.ndarray: Array of shape (n_cells, 2) aligned with ``self.points``, or with ``cells``.
+        """
+        if cells is not None:
+            cells = np.asarray(cells, dtype=np.intp)
+            centroids = np.array(self.points, dtype=float).reshape(-1, 2)[cells]
+            positions = self._cell_positions()[cells] if len(self.polygon_sites) else np.full(len(cells), -1)
+            found = positions >= 0
+            if found.any():
+                polygons = self.polygons
+                centroids[found] = shapely.get_coordinates(shapely.centroid([polygons[i] for i in positions[found]]))
+            return centroids
+        centroids = np.array(self.points, dtype=float).reshape(-1, 2)
+        if self.polygons:
+            centroids[self.polygon_sites] = shapely.get_coordinates(
+                shapely.centroid(np.asarray(self.polygons, dtype=object))
+            )
+        return centroids
+
+
+    def locate_points(self, points: Any, chunk_size: int = 1_000_000) -> np.ndarray:
+        """
+        Find the cell containing each query point.
+
+        Cells are identified by the index of their site in ``self.points``. By definition of
+        the Voronoi diagram, the cell containing a point is the one whose site is nearest, so
+        lookups go through a KD-tree over the sites rather than polygon containment tests.
+        Queries are processed in chunks to bound the memory of very large batches.
+
+        Args:
+            points (Any): Array-like of shape (n, 2) with (x, y) query coordinates.
+            chunk_size (int): Maximum number of points queried at once.
+        Returns:
+            np.ndarray: Cell index for each point (-1 for points outside the map bounds).
+        """
+        if chunk_size <= 0:
+            raise ValueError("chunk_size must be positive")
+        queries = np.asarray(points, dtype=float).reshape(-1, 2)
+        cells = np.full(len(queries), -1, dtype=np.intp)
+        if len(self.points) == 0 or len(queries) == 0:
+            return cells
+
+        inside = np.flatnonzero(
+            (queries[:, 0] >= 0) & (queries[:, 0] <= self.width)
+            & (queries[:, 1] >= 0) & (queries[:, 1] <= self.height)
+        )
+        for start in range(0, len(inside), chunk_size):
+            chunk = inside[start:start + chunk_size]
+            cells[chunk] = self._nearest_sites(queries[chunk])
+        return cells
+
+
+    def _nearest_sites(self, queries: np.ndarray) -> np.ndarray:
+        """
+        Index of the nearest site for each query point.
+
+        Sites added incrementally after the main KD-tree was built go into a small secondary tree,
+        so ``add_points`` does not force a full rebuild; the main tree is rebuilt once the extra
+        sites exceed an eighth of it.
+        """
+        n_tree = 0 if self._tree is None else self._tree.n
+        n_extra = len(self.points) - n_tree
+        if self._tree is None or n_extra > max(1024, n_tree // 8):
+            self._tree = cKDTree(self.points)
+            self._extra_tree = None
+            n_tree, n_extra = len(self.points), 0
+        dist, nearest = self._tree.query(queries, workers=-1)
+        if n_extra:
+            if self._extra_tree is None or self._extra_tree.n != n_extra:
+                self._extra_tree = cKDTree(self.points[n_tree:])
+            extra_dist, extra_nearest = self._extra_tree.query(queries, workers=-1)
+            closer = extra_dist < dist
+            nearest[closer] = extra_nearest[closer] + n_tree
+        return nearest
+
+
+    def locate_point(self, x: float, y: float) -> int:
+        """
+        Find the cell containing a single point.
+        Args:
+            x (float): X coordinate.
+            y (float): Y coordinate.
+        Returns:
+            int: Cell index (-1 if the point is outside the map bounds).
+        """
+        return int(self.locate_points([(x, y)])[0])
+
+
+    def rasterize(self, size: Tuple[int, int]) -> np.ndarray:
+        """
+        Build a cell-id raster of the map: each pixel holds the index of the cell containing its centre.
+
+        The raster can be reused for O(1) lookups at that resolution (``raster[row, col]``).
+        Row 0 is the top (y = height) of the map.
+
+        Args:
+            size (Tuple[int, int]): Raster size in pixels (width, height).
+        Returns:
+            np.ndarray: Integer array of shape (height_px, width_px); -1 where no cell exists.
+        """
+        width_px, height_px = int(size[0]), int(size[1])
+        xs = (np.arange(width_px) + 0.5) * (self.width / width_px)
+        ys = self.height - (np.arange(height_px) + 0.5) * (self.height / height_px)
+        gx, gy = np.meshgrid(xs, ys)
+        return self.locate_points(np.column_stack([gx.ravel(), gy.ravel()])).reshape(height_px, width_px)
+
+
     def visualize_points(self) -> None:
         """
         Visualize the input points using matplotlib.
@@ -147,6 +790,8 @@ class VoronoiMap:
             logger.warning("No points to visualize.")
             print("No points to visualize.")
             return
+        import matplotlib.pyplot as plt
+
         xs, ys = zip(*self.points)
         plt.figure(figsize=(6, 6))
         plt.scatter(xs, ys, c='blue', s=10)
@@ -165,10 +810,13 @@ class VoronoiMap:
             logger.warning("No Voronoi diagram to visualize.")
             print("No Voronoi diagram to visualize.")
             return
+        import matplotlib.pyplot as plt
+        from imperial_generals.map.MapRenderer import MapRenderer
+
         fig, ax = plt.subplots()
-        for poly in self.polygons:
-            x, y = poly.exterior.xy
-            ax.fill(x, y, alpha=0.4, edgecolor='black')
+        ax.add_collection(MapRenderer.cell_collection(
+            self, MapRenderer.cell_colors(self), edgecolor='black'
+        ))
         # Plot the points
         ax.scatter(self.points[:, 0], self.points[:, 1], c='blue', s=10, zorder=10)
         ax.set_xlim(0, self.width)
@@ -1,9 +1,73 @@
-from .MapConfig import MapConfig
-from .PoissonDiscSampler import PoissonDiscSampler
-from .VoronoiMap import VoronoiMap
-from .MapGenerator import MapGenerator
+"""
+Map generation and spatial queries.
+
+Submodules are imported on first access to one of their names, so importing the package (or a
+light class such as MapConfig) does not load scipy, shapely or matplotlib.
+"""
+
+import importlib
+import sys
+import types
+
+# exported name -> submodule defining it
+_EXPORTS = {
+    "MapConfig": ".MapConfig",
+    "PoissonDiscSampler": ".PoissonDiscSampler",
+    "VoronoiMap": ".VoronoiMap",
+    "TerrainGenerator": ".TerrainGenerator",
+    "TERRAIN_TYPES": ".TerrainGenerator",
+    "TERRAIN_MOVE_COSTS": ".TerrainGenerator",
+    "HydrologyGenerator": ".HydrologyGenerator",
+    "LloydRelaxation": ".LloydRelaxation",
+    "MapStore": ".MapStore",
+    "MapCache": ".MapCache",
+    "MapGenerator": ".MapGenerator",
+    "MapRenderer": ".MapRenderer",
+    "Pathfinder": ".Pathfinder",
+    "RangeTable": ".RangeTable",
+    "ContactDetector": ".ContactDetector",
+}
 
 __all__ = [
     "MapConfig",
-    "MapGenerator"
-]
\ No newline at end of file
+    "MapGenerator",
+    "Pathfinder",
+    "RangeTable",
+    "ContactDetector",
+    "TerrainGenerator",
+    "HydrologyGenerator",
+    "LloydRelaxation",
+    "MapStore",
+    "MapCache",
+    "MapRenderer",
+    "TERRAIN_TYPES",
+    "TERRAIN_MOVE_COSTS",
+]
+
+
+class _LazyPackage(types.ModuleType):
+    """
+    Package module that imports submodules on first attribute access.
+
+    Submodules are named after the class they define, and the import system binds every loaded
+    submodule onto its package; those bindings are redirected to the class, so that
+    ``imperial_generals.map.VoronoiMap`` is always the class, as it was with eager imports.
+    """
+
+    def __getattr__(self, name: str):
+        if name not in _EXPORTS:
+            raise AttributeError(f"module {self.__name__!r} has no attribute {name!r}")
+        value = getattr(importlib.import_module(_EXPORTS[name], self.__name__), name)
+        super().__setattr__(name, value)
+        return value
+
+    def __setattr__(self, name: str, value) -> None:
+        if isinstance(value, types.ModuleType) and _EXPORTS.get(name) == f".{name}":
+            value = getattr(value, name)
+        super().__setattr__(name, value)
+
+    def __dir__(self):
+        return sorted(set(super().__dir__()) | set(_EXPORTS))
+
+
+sys.modules[__name__].__class__ = _LazyPackage
@@ -1,4 +1,4 @@
-from typing import Dict
+from typing import Any, Dict, List, Type
 from imperial_generals.units.Regiment import Regiment
 
 class Army:
@@ -35,6 +35,68 @@ class Army:
             raise TypeError("regiment must be an instance of Regiment")
         self.forces[name] = regiment
 
+    @classmethod
+    def from_json(cls, data: Dict[str, Any], regiment_cls: Type[Regiment] = Regiment) -> "Army":
+        """
+        Build an army from its JSON form: {'faction': ..., 'forces': {name: regiment}}, with each
+        regiment as in ``Regiment.from_json``.
+
+        Args:
+            data (dict): The army.
+            regiment_cls (type): Regiment class to build. Defaults to Regiment.
+
+        Returns:
+            Army: The new army.
+
+        Raises:
+            ValueError: If the data or any regiment is invalid.
+        """
+        return cls.bulk_from_json([data], regiment_cls)[0]
+
+    def to_json(self) -> Dict[str, Any]:
+        """Return the JSON form of the army (see ``from_json``)."""
+        return {"faction": self.faction, "forces": {name: reg.to_json() for name, reg in self.forces.items()}}
+
+    @classmethod
+    def bulk_from_json(cls, armies: List[Dict[str, Any]], regiment_cls: Type[Regiment] = Regiment) -> List["Army"]:
+        """
+        Build many armies (e.g. a whole order of battle) at once.
+
+        The regiments of all armies are validated and built in one ``Regiment.bulk_from_json``
+        call, then assigned to their armies directly.
+
+        Args:
+            armies (List[dict]): Armies as in ``from_json``.
+            regiment_cls (type): Regiment class to build. Defaults to Regiment.
+
+        Returns:
+            List[Army]: The armies, in payload order.
+
+        Raises:
+            ValueError: If an army or regiment is invalid.
+        """
+        names, records, counts = [], [], []
+        for i, data in enumerate(armies):
+            if not isinstance(data, dict) or not isinstance(data.get("faction"), str) or not isinstance(data.get("forces", {}), dict):
+                raise ValueError(f"Invalid army at index {i}: expected {{'faction': str, 'forces': {{name: regiment}}}}")
+            forces = data.get("forces", {})
+            names.extend(forces)
+            records.extend(forces.values())
+            counts.append(len(forces))
+
+        regiments = iter(zip(names, regiment_cls.bulk_from_json(records)))
+        result = []
+        for data, count in zip(armies, counts):
+            army = cls(data["faction"])
+            army.forces = dict(next(regiments) for _ in range(count))
+            result.append(army)
+        return result
+
+    @staticmethod
+    def bulk_to_json(armies: List["Army"]) -> List[Dict[str, Any]]:
+        """Export many armies, the inverse of ``bulk_from_json``."""
+        return [army.to_json() for army in armies]
+
     def __str__(self) -> str:
         return f"Army(faction={self.faction}, forces={list(self.forces.keys())})"
 
@@ -1,4 +1,8 @@
-from imperial_generals.utils import get_closest_morale_stat, get_combat_efficiency
+from typing import Any, Dict, List, Union
+
+import numpy as np
+
+from imperial_generals.utils import get_closest_morale_stat, get_combat_efficiency, get_combat_efficiency_batch
 
 class Regiment:
     """
@@ -12,6 +16,9 @@ class Regiment:
         Slash-separated string of four integers: experience/morale/weapon/melee.
     law : str
         Combat law, either 'ln' (Linear) or 'sq' (Square).
+    frontage : int, optional
+        Maximum number of soldiers standing in line; the rest wait in depth. None puts the whole
+        regiment in line.
 
     Attributes
     ----------
@@ -25,9 +32,11 @@ class Regiment:
         Combat efficiency coefficient.
     law : str
         Combat law used.
+    frontage : int or None
+        Maximum line width (None for unlimited).
     """
 
-    def __init__(self, size: int, stats: str, law: str) -> None:
+    def __init__(self, size: int, stats: str, law: str, frontage: int | None = None) -> None:
         """
         Initialize a regiment.
 
@@ -35,9 +44,10 @@ class Regiment:
             size (int): Number of soldiers in the regiment.
             stats (str): Slash-separated string of four integers (e.g., '4/4/0/0').
             law (str): Combat law, must be either 'ln' (Linear) or 'sq' (Square).
+            frontage (int, optional): Maximum number of soldiers in line. Defaults to None (all).
 
         Raises:
-            ValueError: If law is not 'ln' or 'sq', or stats is not four integers.
+            ValueError: If law is not 'ln' or 'sq', stats is not four integers, or frontage is not positive.
         """
         if law not in ('ln', 'sq'):
             raise ValueError("Law must be either 'ln' (Linear) or 'sq' (Square).")
@@ -49,6 +59,9 @@ class Regiment:
         self.coef: float = get_combat_efficiency(*self.stats)
         self.raw_morale: float = float(self.stats[1]*10)
         self.law: str = law
+        if frontage is not None and (not isinstance(frontage, int) or frontage <= 0):
+            raise ValueError("Frontage must be a positive integer or None.")
+        self.frontage: int | None = frontage
 
     def __str__(self) -> str:
         return (
@@ -59,10 +72,145 @@ class Regiment:
         )
 
     def __repr__(self) -> str:
+        frontage = f", frontage={self.frontage}" if self.frontage is not None else ""
         return (
-            f"Regiment(size={self.size}, stats={self.stats}, law='{self.law}')"
+            f"Regiment(size={self.size}, stats={self.stats}, law='{self.law}'{frontage})"
         )
 
+    @classmethod
+    def from_json(cls, data: Dict[str, Any]) -> "Regiment":
+        """
+        Build a regiment from its JSON form (the ``inputs`` of the test_cases files).
+
+        Args:
+            data (dict): 'size', 'stats' (string or list of four integers), 'law' and optionally
+                'frontage' and 'raw_morale' (defaults to the morale stat times 10).
+
+        Returns:
+            Regiment: The new regiment.
+
+        Raises:
+            ValueError: If the data is invalid.
+        """
+        return cls.bulk_from_json([data])[0]
+
+    def to_json(self) -> Dict[str, Any]:
+        """Return the JSON form of the regiment (see ``from_json``)."""
+        data = {"size": self.size, "stats": "/".join(str(s) for s in self.stats), "law": self.law}
+        if self.frontage is not None:
+            data["frontage"] = self.frontage
+        if self.raw_morale != self.stats[1] * 10:
+            data["raw_morale"] = self.raw_morale
+        return data
+
+    @classmethod
+    def bulk_from_json(cls, records: Union[List[Dict[str, Any]], Dict[str, List[Any]]]) -> List["Regiment"]:
+        """
+        Build many regiments at once from their JSON forms.
+
+        The whole payload is validated in one pass, the stats strings are split together and the
+        coefficients come from one `get_combat_efficiency_batch` call; the instances are then
+        filled in directly rather than through ``__init__``, one string parse and coefficient
+        call at a time.
+
+        Args:
+            records (list | dict): A list of regiment objects (see ``from_json``), or the same
+                fields as columns: {'size': [...], 'stats': [...], 'law': [...], 'frontage': [...],
+                'raw_morale': [...]}, where the optional columns may be left out.
+
+        Returns:
+            List[Regiment]: The regiments, in payload order.
+
+        Raises:
+            ValueError: If any record is invalid; the message names the first bad index.
+        """
+        if isinstance(records, dict):
+            columns = records
+            n = len(columns.get("size", ()))
+        else:
+            n = len(records)
+            try:
+                columns = {key: [r[key] for r in records] for key in ("size", "stats", "law")}
+            except (KeyError, TypeError) as e:
+                raise ValueError(f"Every regiment needs 'size', 'stats' and 'law': {e!r}") from None
+            columns["frontage"] = [r.get("frontage") for r in records]
+            columns["raw_morale"] = [r.get("raw_morale") for r in records]
+        sizes, stats, laws = columns.get("size", []), columns.get("stats", []), columns.get("law", [])
+        frontages = columns.get("frontage") or [None] * n
+        raw_morales = columns.get("raw_morale") or [None] * n
+        if not len(sizes) == len(stats) == len(laws) == len(frontages) == len(raw_morales) == n:
+            raise ValueError("Regiment columns must have the same length.")
+
+        bad_size = next(
+            (i for i, size in enumerate(sizes)
+             if isinstance(size, bool) or not isinstance(size, (int, np.integer)) or size < 0), None
+        )
+        if bad_size is not None:
+            raise ValueError(f"Invalid regiment at index {bad_size}: size must be a non-negative integer.")
+        bad_law = next((i for i, law in enumerate(laws) if law not in ('ln', 'sq')), None)
+        if bad_law is not None:
+            raise ValueError(f"Invalid regiment at index {bad_law}: law must be either 'ln' (Linear) or 'sq' (Square).")
+        bad_frontage = next(
+            (i for i, f in enumerate(frontages) if f is not None and (not isinstance(f, int) or f <= 0)), None
+        )
+        if bad_frontage is not None:
+            raise ValueError(f"Invalid regiment at index {bad_frontage}: frontage must be a positive integer or None.")
+        stat_values = cls._parse_stats(stats)
+        coefs = get_combat_efficiency_batch(*stat_values.T).tolist()
+
+        regiments = []
+        for size, stat, coef, law, frontage, raw_morale in zip(
+            sizes, map(tuple, stat_values.tolist()), coefs, laws, frontages, raw_morales
+        ):
+            regiment = cls.__new__(cls)
+            regiment.size = int(size)
+            regiment.stats = stat
+            regiment.coef = coef
+            regiment.raw_morale = float(stat[1] * 10) if raw_morale is None else float(raw_morale)
+            regiment.law = law
+            regiment.frontage = frontage
+            regiments.append(regiment)
+        return regiments
+
+    @staticmethod
+    def _parse_stats(stats: List[Union[str, List[int]]]) -> np.ndarray:
+        """Parse stats strings (or lists) into an (n, 4) integer array, validating all of them."""
+        records = [s if isinstance(s, str) else "/".join(str(d) for d in s) for s in stats]
+        parts = "/".join(records).split("/") if stats else []
+        # every record must have four parts; the total alone would let a short and a long one pair up
+        if any(r.count("/") != 3 for r in records) or not all(map(str.isdigit, parts)):
+            # find the offending record for the message
+            for i, s in enumerate(stats):
+                split = s.split('/') if isinstance(s, str) else [str(d) for d in s]
+                if len(split) != 4 or not all(d.isdigit() for d in split):
+                    raise ValueError(
+                        f"Invalid regiment at index {i}: stats must be a slash-separated string of four integers (e.g., '4/4/0/0')."
+                    )
+        return np.array(parts, dtype=np.int64).reshape(-1, 4)
+
+    @staticmethod
+    def bulk_to_json(regiments: List["Regiment"], columnar: bool = False) -> Union[List[Dict[str, Any]], Dict[str, List[Any]]]:
+        """
+        Export many regiments, the inverse of ``bulk_from_json``.
+
+        Args:
+            regiments (List[Regiment]): Regiments to export.
+            columnar (bool): Return columns instead of a list of objects. Defaults to False.
+
+        Returns:
+            list | dict: Regiment objects, or columns 'size', 'stats', 'law', 'frontage' and
+                'raw_morale'.
+        """
+        if not columnar:
+            return [regiment.to_json() for regiment in regiments]
+        return {
+            "size": [r.size for r in regiments],
+            "stats": ["/".join(map(str, r.stats)) for r in regiments],
+            "law": [r.law for r in regiments],
+            "frontage": [r.frontage for r in regiments],
+            "raw_morale": [r.raw_morale for r in regiments],
+        }
+
     def update_size(self, new_size: int) -> None:
         """
         Update the regiment's size.
@@ -1,7 +1,12 @@
 from .closest_morale_stat import get_closest_morale_stat
-from .combat_efficiency import get_combat_efficiency
+from .combat_efficiency import get_combat_efficiency, get_combat_efficiency_batch
+from .engaged_front import get_engaged_front
+from .memory_trace import trace_memory
 
 __all__ = [
     "get_closest_morale_stat",
     "get_combat_efficiency",
+    "get_combat_efficiency_batch",
+    "get_engaged_front",
+    "trace_memory",
 ]
\ No newline at end of file
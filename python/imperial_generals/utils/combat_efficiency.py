@@ -1,6 +1,36 @@
 
 import numpy as np
 
+# ===========================================
+# CONSTANTS
+# ===========================================
+
+# Base effectiveness of a regiment's primary weapon
+weapon_multipliers = {
+    '-2': 0.2, # Unarmed or Pikemen - very low effectiveness
+    '-1': 0.5, # Smoothbore matchlocks - inferior
+    '0': 1.0,  # Smoothbore muskets - standard/old for new regiments
+    '1': 1.5,  # Rifled muskets - significant improvement
+    '2': 2.5   # Needler rifles - highly advanced, major advantage
+}
+
+# Incremental effectiveness boosts based on training and morale
+xp_boost_per_level = 0.04 # 4% increase in effectiveness per XP level above 1
+morale_boost_per_level = 0.02 # 2% increase in effectiveness per morale level above 1
+
+# Melee combat penalty (less effective than aimed fire)
+melee_penalty_factor = 0.70 # 30% reduction in effectiveness for melee combat
+
+# ===========================================
+# MAX EFFECTIVENESS CALCULATION
+# ===========================================
+
+# Fixed value ensures the final coefficient is between 0 and 1, where 1 is highest possible effectiveness (one shot, one kill principle)
+max_weapon_base = max(weapon_multipliers.values())
+max_xp_adj = (10 - 1) * xp_boost_per_level
+max_morale_adj = (10 - 1) * morale_boost_per_level
+max_possible_raw_coefficient = max_weapon_base * (1 + max_xp_adj + max_morale_adj)
+
 def get_combat_efficiency(
     stat_xp: int | np.integer = None,
     stat_morale: int | np.integer = None, 
@@ -65,36 +95,6 @@ def get_combat_efficiency(
         if not isinstance(value, (int, np.integer)):
             raise TypeError(f"{name} must be an integer.")
 
-    # ===========================================
-    # CONSTANTS
-    # ===========================================
-    
-    # Base effectiveness of a regiment's primary weapon
-    weapon_multipliers = {
-        '-2': 0.2, # Unarmed or Pikemen - very low effectiveness
-        '-1': 0.5, # Smoothbore matchlocks - inferior
-        '0': 1.0,  # Smoothbore muskets - standard/old for new regiments
-        '1': 1.5,  # Rifled muskets - significant improvement
-        '2': 2.5   # Needler rifles - highly advanced, major advantage
-    }
-
-    # Incremental effectiveness boosts based on training and morale
-    xp_boost_per_level = 0.04 # 4% increase in effectiveness per XP level above 1
-    morale_boost_per_level = 0.02 # 2% increase in effectiveness per morale level above 1
-
-    # Melee combat penalty (less effective than aimed fire)
-    melee_penalty_factor = 0.70 # 30% reduction in effectiveness for melee combat
-
-    # ===========================================
-    # MAX EFFECTIVENESS CALCULATION
-    # ===========================================
-    
-    # Fixed value ensures the final coefficient is between 0 and 1, where 1 is highest possible effectiveness (one shot, one kill principle)
-    max_weapon_base = max(weapon_multipliers.values())
-    max_xp_adj = (10 - 1) * xp_boost_per_level
-    max_morale_adj = (10 - 1) * morale_boost_per_level
-    max_possible_raw_coefficient = max_weapon_base * (1 + max_xp_adj + max_morale_adj)
-
     # ===========================================
     # FUNCTION LOGIC
     # ===========================================
@@ -120,6 +120,52 @@ def get_combat_efficiency(
     # Scale and return result
     return coef / max_possible_raw_coefficient
 
+def get_combat_efficiency_batch(
+    stat_xp: np.ndarray,
+    stat_morale: np.ndarray,
+    stat_weapon: np.ndarray,
+    stat_melee: np.ndarray
+) -> np.ndarray:
+    """
+    Vectorised `get_combat_efficiency` for many regiments at once.
+
+    Applies the same conversion, clamping and arithmetic as the scalar function element-wise, so
+    each coefficient is identical to the scalar result.
+
+    Parameters
+    ----------
+    stat_xp, stat_morale, stat_weapon, stat_melee : array-like of int
+        Stats of each regiment, broadcast against each other (see `get_combat_efficiency`).
+
+    Returns
+    -------
+    np.ndarray
+        Combat efficiency coefficient (0 to 1) of each regiment.
+
+    Raises
+    ------
+    TypeError
+        If any input is not an integer array.
+    """
+    stats = [np.asarray(stat) for stat in (stat_xp, stat_morale, stat_weapon, stat_melee)]
+    for name, stat in zip(("stat_xp", "stat_morale", "stat_weapon", "stat_melee"), stats):
+        if stat.size and not np.issubdtype(stat.dtype, np.integer):
+            raise TypeError(f"{name} must be an integer array.")
+    stat_xp, stat_morale, stat_weapon, stat_melee = stats
+
+    # Morale conversion (10-100 back to 1-10) and clamping, as in the scalar function
+    stat_morale_1_10 = np.where(stat_morale > 10, np.round(stat_morale / 10), stat_morale)
+    stat_morale_1_10 = np.clip(stat_morale_1_10, 1, 10)
+    stat_xp = np.clip(stat_xp, 1, 10)
+    stat_weapon = np.clip(stat_weapon, -2, 2)
+    stat_melee = np.clip(stat_melee, 0, 1)
+
+    eff_adj = 1 + (stat_xp - 1) * xp_boost_per_level + (stat_morale_1_10 - 1) * morale_boost_per_level
+    multipliers = np.array([weapon_multipliers[str(w)] for w in range(-2, 3)])
+    raw_coef = multipliers[stat_weapon + 2] * eff_adj
+    coef = np.where(stat_melee == 1, raw_coef * melee_penalty_factor, raw_coef)
+    return coef / max_possible_raw_coefficient
+
 if __name__ == "__main__":
     coef = get_combat_efficiency(stat_xp=5, stat_morale=50, stat_weapon=1, stat_melee=0)
     print(f"Combat Efficiency Coefficient: {coef:.4f}")
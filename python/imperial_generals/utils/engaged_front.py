@@ -0,0 +1,71 @@
+import numpy as np
+
+def get_engaged_front(
+    sizes: np.ndarray,
+    frontages: np.ndarray | None = None,
+    sides: np.ndarray | None = None,
+    front_width: float | np.ndarray | None = None
+) -> np.ndarray:
+    """
+    Compute how many soldiers of each regiment are engaged along the battle front.
+
+    A regiment stands in a line of at most `frontage` men, with the rest in depth. Each side's line
+    is the sum of its regiments' lines, and the front is as wide as the shorter of the two lines
+    (optionally capped by the terrain's `front_width`); only the men facing an enemy across it are
+    engaged. As a regiment takes losses its reserves rotate into the line, so it keeps its full
+    line until fewer than `frontage` men are left.
+
+    All inputs broadcast, so the same call handles one battle, a batch of Monte Carlo replicas
+    (leading axes) or several regiments per side.
+
+    Parameters
+    ----------
+    sizes : array-like
+        Men per regiment, shape (..., m). Without `sides`, m must be 2 (one regiment per side).
+    frontages : array-like, optional
+        Maximum line width per regiment, same shape as `sizes`; ``inf`` (or None for all) means
+        the whole regiment stands in line.
+    sides : array-like, optional
+        Side (0 or 1) of each of the m regiments, shape (m,). Defaults to ``[0, 1]``.
+    front_width : float or array-like, optional
+        Maximum width of the front, broadcastable to the leading axes of `sizes`.
+
+    Returns
+    -------
+    np.ndarray
+        Engaged men per regiment, shape (..., m), as floats. A side's engaged men are shared among
+        its regiments in proportion to their lines.
+
+    Raises
+    ------
+    ValueError
+        If `sides` is omitted and the last axis of `sizes` is not 2, or a side has no regiment.
+    """
+
+    sizes = np.asarray(sizes, dtype=float)
+    if sides is None:
+        if sizes.shape[-1:] != (2,):
+            raise ValueError("sizes must have a last axis of length 2 unless sides is given.")
+        sides = np.array([0, 1])
+    sides = np.asarray(sides)
+    membership = (sides[:, None] == np.arange(2)).astype(float) # (m, 2) one-hot side of each regiment
+    if not membership.any(axis=0).all():
+        raise ValueError("each side needs at least one regiment.")
+
+    # men standing in line, per regiment and per side
+    lines = sizes if frontages is None else np.minimum(sizes, np.asarray(frontages, dtype=float))
+    side_lines = lines @ membership # (..., 2)
+
+    # the front is as wide as the shorter line
+    width = side_lines.min(axis=-1)
+    if front_width is not None:
+        width = np.minimum(width, front_width)
+
+    # share each side's engaged men among its regiments by line width
+    share = np.divide(width[..., None], side_lines, out=np.zeros_like(side_lines), where=side_lines > 0)
+    return lines * share[..., sides]
+
+if __name__ == "__main__":
+    print(get_engaged_front([1000, 600], frontages=[400, 500]))
+    # two regiments against one, for a batch of three replicas
+    print(get_engaged_front([[300, 200, 800], [100, 50, 800], [0, 0, 800]], frontages=[250, 250, 400], sides=[0, 0, 1]))
@@ -0,0 +1,54 @@
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator
+import tracemalloc
+
+@contextmanager
+def trace_memory(report: Dict[str, Dict[str, Any]], phase: str, top: int = 5) -> Iterator[None]:
+    """
+    Measure the memory allocated while a block runs, with tracemalloc snapshots.
+
+    Tracing is started for the block if it is not already running (and stopped afterwards), so
+    the overhead is only paid in profiling runs. The peak is reset at the start of the block;
+    phases should therefore not be nested.
+
+    Parameters
+    ----------
+    report : dict
+        Receives the measurements of the block under `phase`.
+    phase : str
+        Name of the phase (e.g. 'setup', 'events').
+    top : int, optional
+        Number of allocation sites with the largest growth to list (0 skips the snapshots).
+
+    Returns
+    -------
+    Iterator[None]
+        Context manager. On exit, ``report[phase]`` holds 'peak' (highest traced memory above
+        the start, in bytes), 'retained' (steady-state memory still allocated at the end) and
+        'top' (the largest allocation sites, as text).
+    """
+    started = not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start()
+    ignore = (tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, __file__))
+    before = tracemalloc.take_snapshot().filter_traces(ignore) if top else None
+    current_before, _ = tracemalloc.get_traced_memory()
+    tracemalloc.reset_peak()
+    try:
+        yield
+    finally:
+        current_after, peak = tracemalloc.get_traced_memory()
+        entry: Dict[str, Any] = {"peak": peak - current_before, "retained": current_after - current_before}
+        if top:
+            growth = tracemalloc.take_snapshot().filter_traces(ignore).compare_to(before, "lineno")
+            entry["top"] = [str(stat) for stat in growth[:top]]
+        report[phase] = entry
+        if started:
+            tracemalloc.stop()
+
+if __name__ == "__main__":
+    report = {}
+    with trace_memory(report, "lists"):
+        data = [list(range(1000)) for _ in range(100)]
+    print(report["lists"]["peak"], report["lists"]["retained"])
+    print("\n".join(report["lists"]["top"]))
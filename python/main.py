@@ -11,7 +11,7 @@ import logging
 
 # local modules
 ## map components
-from imperial_generals.map import MapConfig, MapGenerator
+from imperial_generals.map import MapCache, MapConfig, MapGenerator
 
 ## simulation components
 from imperial_generals.units import InfantryRegiment
@@ -33,7 +33,7 @@ logging.basicConfig(
 )
 
 # ==============================================================================
-# Main Entry Point (for now - eventually need argparse CLI)
+# Main Entry Point (interactive demo - batch runs use `python -m imperial_generals run`)
 # ==============================================================================
 if __name__ == "__main__":
 
@@ -44,10 +44,12 @@ if __name__ == "__main__":
     map_setup = MapConfig(
         width=100,
         height=100,
-        min_distance=5
+        min_distance=5,
+        seed=1
     )
 
-    map_gen = MapGenerator(map_setup)
+    # seeded maps are generated once and then memory-mapped from the cache
+    map_gen = MapGenerator(map_setup, cache=MapCache(".map_cache"))
     game_map = map_gen.generate_map()
     game_map['voronoi'].visualize_cells()
 
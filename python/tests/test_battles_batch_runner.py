@@ -0,0 +1,123 @@
+import os
+import json
+import pytest
+from imperial_generals.battles.BatchRunner import BatchRunner, RESULT_FIELDS
+from imperial_generals.__main__ import main
+
+GOLDEN_PATH = os.path.join(os.path.dirname(__file__), '../../test_cases/battle_simulation_basic.json')
+
+def write_scenarios(path):
+    path.write_text(json.dumps({
+        "defaults": {"time": 0.05, "replicas": 3},
+        "scenarios": [
+            {"id": "even", "units": [{"size": 200, "stats": "4/5/2/1", "law": "sq"},
+                                     {"size": 200, "stats": "4/5/2/1", "law": "sq"}]},
+            {"id": "duel", "units": [{"size": 1, "stats": "4/5/2/1", "law": "ln"},
+                                     {"size": 1, "stats": "3/6/1/0", "law": "ln"}],
+             "time": 10.0, "replicas": 2, "seed": 5},
+        ],
+    }))
+    return path
+
+def read_jsonl(path):
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+def test_load_golden_cases():
+    scenarios = BatchRunner.load_scenarios(GOLDEN_PATH, replicas=4)
+    assert len(scenarios) == 2
+    assert all(s["replicas"] == 4 and len(s["units"]) == 2 for s in scenarios)
+    assert scenarios[1]["time"] == 10.0
+
+def test_load_rejects_bad_scenarios(tmp_path):
+    unit = {"size": 10, "stats": "4/5/2/1", "law": "sq"}
+    (tmp_path / "dup.json").write_text(json.dumps([{"id": "a", "units": [unit, unit], "time": 1}] * 2))
+    with pytest.raises(ValueError, match="Duplicate"):
+        BatchRunner.load_scenarios(tmp_path / "dup.json")
+    (tmp_path / "law.json").write_text(json.dumps([{"units": [unit, dict(unit, law="xx")], "time": 1}]))
+    with pytest.raises(ValueError, match="scenario-0"):
+        BatchRunner.load_scenarios(tmp_path / "law.json")
+
+def test_replicas_are_reproducible():
+    scenario = BatchRunner.load_scenarios(GOLDEN_PATH)[0]
+    assert BatchRunner.run_replica(scenario, 3) == BatchRunner.run_replica(scenario, 3)
+    assert BatchRunner.replica_seed(scenario, 0) != BatchRunner.replica_seed(scenario, 1)
+
+def test_run_and_resume(tmp_path):
+    scenarios = BatchRunner.load_scenarios(write_scenarios(tmp_path / "s.json"))
+    out = tmp_path / "out.jsonl"
+    assert BatchRunner(scenarios, out, workers=1).run() == {"total": 5, "skipped": 0, "completed": 5}
+    records = read_jsonl(out)
+    assert [list(r) for r in records] == [list(RESULT_FIELDS)] * 5
+    assert all(r["outcome"] == "wipeout" and r["winner"] in (1, 2) for r in records if r["scenario"] == "duel")
+
+    # simulate a run killed mid-write: one record lost, the next one torn
+    lines = out.read_text().splitlines(keepends=True)
+    out.write_text("".join(lines[:3]) + lines[3][:20])
+    assert BatchRunner(scenarios, out, workers=1).run() == {"total": 5, "skipped": 3, "completed": 2}
+    resumed = read_jsonl(out)
+    key = lambda r: (r["scenario"], r["replica"])
+    assert sorted(resumed, key=key) == sorted(records, key=key)
+
+def test_pool_matches_serial(tmp_path):
+    scenarios = BatchRunner.load_scenarios(write_scenarios(tmp_path / "s.json"))
+    BatchRunner(scenarios, tmp_path / "serial.jsonl", workers=1).run()
+    BatchRunner(scenarios, tmp_path / "pool.jsonl", workers=2, max_pending=1, chunk_size=2).run()
+    key = lambda r: (r["scenario"], r["replica"])
+    serial = sorted(read_jsonl(tmp_path / "serial.jsonl"), key=key)
+    assert sorted(read_jsonl(tmp_path / "pool.jsonl"), key=key) == serial
+
+def test_parquet_output(tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    scenarios = BatchRunner.load_scenarios(write_scenarios(tmp_path / "s.json"))
+    BatchRunner(scenarios, tmp_path / "out.parquet", workers=1).run()
+    table = pq.read_table(tmp_path / "out.parquet")
+    assert table.num_rows == 5 and table.column_names == list(RESULT_FIELDS)
+    assert BatchRunner(scenarios, tmp_path / "out.parquet", workers=1).run()["skipped"] == 5
+
+def test_cli_run(tmp_path, capsys):
+    scenarios = write_scenarios(tmp_path / "s.json")
+    assert main(["run", str(scenarios), "-j", "1", "--replicas", "2"]) == 0
+    assert len(read_jsonl(tmp_path / "s.results.jsonl")) == 5
+    assert "5 runs completed" in capsys.readouterr().err
+    assert main(["run", str(scenarios), "-j", "1"]) == 0
+    assert "0 runs completed, 5 already" in capsys.readouterr().err
+
+def test_replica_checkpoints(tmp_path):
+    scenario = BatchRunner.load_scenarios(GOLDEN_PATH)[0]
+    plain = BatchRunner.run_replica(scenario, 2)
+    assert BatchRunner.run_replica(scenario, 2, tmp_path) == plain
+    assert not list(tmp_path.iterdir())
+
+    # an unfinished run left behind by a pre-empted worker is continued, not restarted
+    from imperial_generals.units.Regiment import Regiment
+    from imperial_generals.battles import Simulation
+    forces = tuple(Regiment(u["size"], u["stats"], u["law"]) for u in scenario["units"])
+    partial = Simulation(forces, seed=BatchRunner.replica_seed(scenario, 2))
+    partial.run_simulation(time=scenario["time"] / 2)
+    partial._end_time = scenario["time"]
+    partial.save_checkpoint(BatchRunner.checkpoint_path(tmp_path, scenario, 2))
+    resumed = BatchRunner.run_replica(scenario, 2, tmp_path)
+    assert resumed["events"] > 0 and resumed["end_time"] > scenario["time"]
+    assert not list(tmp_path.iterdir())
+
+def test_scenario_events():
+    unit = {"size": 100, "stats": "4/5/2/1", "law": "sq"}
+    entry = {"units": [unit, unit], "time": 0.05, "events": [{"time": 0.0, "kind": "withdraw", "side": 1, "value": 100}]}
+    scenario = BatchRunner.parse_scenario(entry)
+    record = BatchRunner.run_replica(scenario, 0)
+    assert record["outcome"] == "wipeout" and record["winner"] == 1 and record["size_1"] == 100
+    with pytest.raises(ValueError, match="event kind"):
+        BatchRunner.parse_scenario(dict(entry, events=[{"time": 0.0, "kind": "charge", "side": 0, "value": 1}]))
+
+def test_memory_profile_and_budget(tmp_path, capsys):
+    scenarios = write_scenarios(tmp_path / "s.json")
+    runner = BatchRunner(
+        BatchRunner.load_scenarios(scenarios), tmp_path / "out.jsonl", workers=1,
+        memory_budget=64 * 160, profile_memory=True,
+    )
+    summary = runner.run()
+    records = read_jsonl(tmp_path / "out.jsonl")
+    assert summary["peak_memory"] == max(r["peak_memory"] for r in records) > 0
+    assert all(r["trajectory_rows"] <= 64 for r in records)
+    assert main(["run", str(scenarios), "-j", "1", "--profile-memory", "--memory-budget-mb", "1"]) == 0
+    assert "peak memory of a run" in capsys.readouterr().err
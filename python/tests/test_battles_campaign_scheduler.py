@@ -0,0 +1,88 @@
+import pytest
+from imperial_generals.units.Regiment import Regiment
+from imperial_generals.battles.CampaignScheduler import CampaignScheduler, CAMPAIGN_RESULT_FIELDS
+
+def schedule(campaign):
+    for i in range(5):
+        campaign.start_battle(f"b{i}", (Regiment(100 + 50 * i, "4/5/2/1", "sq"), Regiment(150, "3/6/1/0", "sq")), time=0.01 * i)
+    campaign.join_battle("b0", 1, Regiment(400, "3/6/1/0", "sq"), time=0.015)
+    campaign.end_battle("b4", time=0.06)
+    return campaign
+
+def test_pool_matches_serial():
+    serial = schedule(CampaignScheduler(workers=1, seed=3))
+    serial.run(until=0.05)
+    serial.run(until=0.2)
+    with schedule(CampaignScheduler(workers=2, seed=3)) as pooled:
+        pooled.run(until=0.05)
+        pooled.run(until=0.2)
+    assert pooled.results == serial.results
+    for battle_id, sim in serial.battles.items():
+        assert sim.trajectory['size_1'].tolist() == pooled.battles[battle_id].trajectory['size_1'].tolist()
+
+def test_battles_start_join_and_end():
+    campaign = schedule(CampaignScheduler(workers=1, seed=3))
+    campaign.run(until=0.012)
+    assert set(campaign.battles) == {"b0", "b1"}
+    campaign.run(until=0.2)
+    # the joining men reinforce side 2 of b0 at campaign time 0.015
+    assert campaign.battles["b0"].casualties['initial_size'] == [100, 550]
+    result = campaign.results["b4"]
+    assert result["outcome"] in ("called_off", "wipeout", "rout")
+    assert set(result) == set(CAMPAIGN_RESULT_FIELDS) and result["start"] == 0.04
+    assert all(r["end"] >= r["start"] for r in campaign.results.values())
+
+def test_report_splits_engine_time():
+    campaign = schedule(CampaignScheduler(workers=1))
+    campaign.run(until=0.1)
+    report = campaign.report()
+    assert set(report["battles"]) == {f"b{i}" for i in range(5)}
+    assert sum(b["share"] for b in report["battles"].values()) == pytest.approx(1.0)
+    assert report["engine_time"] <= report["wall_time"]
+
+def test_rejects_bad_events():
+    campaign = CampaignScheduler(workers=1)
+    campaign.start_battle("a", (Regiment(10, "4/5/2/1", "sq"), Regiment(10, "3/6/1/0", "sq")))
+    with pytest.raises(ValueError, match="Duplicate"):
+        campaign.start_battle("a", (Regiment(10, "4/5/2/1", "sq"), Regiment(10, "3/6/1/0", "sq")))
+    with pytest.raises(ValueError, match="Unknown"):
+        campaign.join_battle("b", 0, 10)
+    campaign.run(until=0.01)
+    with pytest.raises(ValueError):
+        campaign.end_battle("a", time=0.005)
+
+def test_pool_matches_serial_with_many_battles():
+    # the pool's cost against the serial path is tracked by the campaign_run benchmark
+    def results(workers):
+        with CampaignScheduler(workers=workers, seed=1) as campaign:
+            for i in range(100):
+                campaign.start_battle(
+                    f"b{i}", (Regiment(300 + i, "4/5/2/1", "sq"), Regiment(320, "3/6/1/0", "sq")), time=0.001 * (i + 1)
+                )
+                if i % 10 == 0:
+                    campaign.join_battle(f"b{i}", 1, 50, time=0.001 * i + 0.05)
+            campaign.run(until=0.3)
+            return campaign.results
+    assert results(4) == results(1)
+
+def test_pool_restarts_and_coarsened_trajectories_match_serial():
+    serial = schedule(CampaignScheduler(workers=1, seed=3, memory_budget=64 * 160))
+    serial.run(until=0.05)
+    serial.run(until=0.2)
+    pooled = schedule(CampaignScheduler(workers=2, seed=3, memory_budget=64 * 160))
+    pooled.run(until=0.05)
+    pooled.close() # the active battles are sent to the new workers from their copies here
+    pooled.run(until=0.2)
+    pooled.close()
+    assert pooled.results == serial.results
+    for battle_id, sim in serial.battles.items():
+        for name, values in sim.trajectory.items():
+            assert values.tolist() == pooled.battles[battle_id].trajectory[name].tolist()
+
+def test_pending_reinforcements_follow_the_workers():
+    serial = schedule(CampaignScheduler(workers=1, seed=3))
+    serial.run(until=0.2)
+    with schedule(CampaignScheduler(workers=2, seed=3)) as pooled:
+        pooled.run(until=0.2)
+    # the join of b0 is applied in a worker; the copy here must not keep waiting for it
+    assert pooled.battles["b0"]._pending_reinforcements == serial.battles["b0"]._pending_reinforcements == [0, 0]
@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+from imperial_generals.battles.BatchRunner import BatchRunner
+from imperial_generals.battles.EnginePlanner import EnginePlanner
+
+LARGE = {"id": "large", "time": 0.5, "units": [
+    {"size": 3000, "stats": "4/5/1/0", "law": "sq"}, {"size": 2500, "stats": "4/6/1/0", "law": "sq"}]}
+DUEL = {"id": "duel", "time": 10.0, "units": [
+    {"size": 5, "stats": "4/5/2/1", "law": "ln"}, {"size": 5, "stats": "3/6/1/0", "law": "ln"}]}
+
+def test_mean_field_matches_exact_mean():
+    scenario = BatchRunner.parse_scenario(LARGE)
+    expected = EnginePlanner.mean_field(scenario)
+    exact = [BatchRunner.run_replica(scenario, replica) for replica in range(10)]
+    for field in ("size_1", "size_2"):
+        assert expected[field] == pytest.approx(np.mean([r[field] for r in exact]), rel=0.01)
+    assert expected["events"] == pytest.approx(np.mean([r["events"] for r in exact]), rel=0.02)
+
+def test_large_expectation_uses_mean_field():
+    result = EnginePlanner(accuracy=0.05).run(LARGE)
+    assert result["metadata"]["engine"] == "mean_field"
+    assert result["metadata"]["replicas"] == 0
+    assert result["metadata"]["estimated_error"] <= 0.05
+    assert result["size_1"] > result["size_2"] > 0
+
+def test_decisive_battle_uses_exact_replicas():
+    planner = EnginePlanner(accuracy=0.1)
+    plan = planner.plan(BatchRunner.parse_scenario(DUEL), "expectation")
+    assert plan["decisive"] and plan["engine"] == "exact"
+    assert plan["replicas"] == 97 # (1.96 * 0.5 / 0.1) ** 2, rounded up
+    result = planner.run(DUEL)
+    assert result["win_1"] + result["win_2"] == pytest.approx(1.0)
+    assert result["stderr"]["win_1"] < 0.1
+    assert result["metadata"]["seconds"] > 0
+
+def test_outputs_and_accuracy_drive_replicas():
+    planner = EnginePlanner()
+    scenario = BatchRunner.parse_scenario(LARGE)
+    assert planner.plan(scenario, "path")["replicas"] == 1
+    coarse = planner.plan(scenario, "distribution", accuracy=0.2)
+    fine = planner.plan(scenario, "distribution", accuracy=0.1)
+    assert coarse["engine"] == fine["engine"] == "exact"
+    assert fine["replicas"] > 3 * coarse["replicas"]
+    assert fine["estimated_seconds"] > coarse["estimated_seconds"]
+    result = planner.run(DUEL, "distribution", accuracy=0.2)
+    assert len(result["samples"]["winner"]) == result["metadata"]["replicas"]
+    path = planner.run(DUEL, "path")
+    assert path["trajectory"]["size_1"][-1] == path["size_1"]
+    with pytest.raises(ValueError):
+        planner.plan(scenario, "histogram")
+
+def test_replica_cap_falls_back_to_most_accurate():
+    plan = EnginePlanner(max_replicas=10).plan(BatchRunner.parse_scenario(DUEL), "expectation", accuracy=0.01)
+    assert plan["engine"] == "exact" and plan["replicas"] == 10
+    assert plan["estimated_error"] > 0.01
@@ -0,0 +1,54 @@
+import importlib
+import inspect
+import pytest
+from imperial_generals.battles.BatchRunner import BatchRunner
+from imperial_generals.battles.EquivalenceHarness import EquivalenceHarness, CANONICAL_MATCHUPS, REFERENCE_MODULES
+
+MATCHUPS = [m for m in CANONICAL_MATCHUPS if m["id"] in ("outnumbered_sq", "duel_ln")]
+
+def reseeded(scenario, replica):
+    return BatchRunner.run_replica({**scenario, "seed": [scenario["seed"], 1]}, replica)
+
+def reinforced(scenario, replica):
+    # a "faster engine" that gets the battle wrong: side 1 fights with a third more men
+    units = [dict(scenario["units"][0], size=scenario["units"][0]["size"] * 4 // 3), scenario["units"][1]]
+    return BatchRunner.run_replica({**scenario, "units": units}, replica)
+
+@pytest.fixture
+def harness(tmp_path):
+    return EquivalenceHarness(MATCHUPS, replicas=60, cache_dir=tmp_path)
+
+def test_independent_sample_is_equivalent(harness, tmp_path):
+    report = harness.assert_equivalent(reseeded, "reseeded")
+    assert set(report["matchups"]) == {"outnumbered_sq", "duel_ln"}
+    assert report["speedup"] > 0
+    # reference distributions are cached, one file per matchup
+    assert len(list(tmp_path.glob("*.npz"))) == 2
+
+def test_biased_engine_fails(harness):
+    with pytest.raises(AssertionError, match="FAILED"):
+        harness.assert_equivalent(reinforced)
+    report = harness.compare(reinforced)
+    assert not report["matchups"]["outnumbered_sq"]["metrics"]["size_1"]["passed"]
+
+def test_cached_reference_is_reused(harness, monkeypatch):
+    first = harness.reference(harness.matchups[0])
+    monkeypatch.setattr(EquivalenceHarness, "run_engine", lambda *args: pytest.fail("reference was rerun"))
+    second = harness.reference(harness.matchups[0])
+    assert (first["size_1"] == second["size_1"]).all() and first["seconds"] == second["seconds"]
+
+def test_identical_engine_passes_without_cache():
+    report = EquivalenceHarness(MATCHUPS[1:], replicas=20).compare(BatchRunner.run_replica)
+    metrics = report["matchups"]["duel_ln"]["metrics"]
+    assert report["passed"] and all(m["effect"] == 0 for m in metrics.values())
+
+def test_fingerprint_covers_the_reference_code():
+    # every package function or class the reference modules use is itself hashed
+    # (memory tracing only measures a run and does not change its results)
+    used = set()
+    for name in REFERENCE_MODULES:
+        for value in vars(importlib.import_module(name)).values():
+            if inspect.isfunction(value) or inspect.isclass(value):
+                used.add(value.__module__)
+    used = {m for m in used if m.startswith("imperial_generals.")} - {"imperial_generals.utils.memory_trace"}
+    assert used <= set(REFERENCE_MODULES)
@@ -0,0 +1,62 @@
+import pytest
+from imperial_generals.battles.BatchRunner import BatchRunner
+from imperial_generals.battles.Simulation import Simulation
+from imperial_generals.battles.SensitivityAnalysis import SensitivityAnalysis, SENSITIVITY_METRICS
+
+BASELINE = {"id": "outnumbered", "time": 2.0, "seed": 3, "units": [
+    {"size": 300, "stats": "3/6/1/0", "law": "sq"}, {"size": 200, "stats": "6/7/1/0", "law": "sq"}]}
+
+def test_common_random_numbers_shrink_intervals():
+    analysis = SensitivityAnalysis(BASELINE, [{"id": "+1 xp", "side": 0, "experience": 1}], replicas=40)
+    report = analysis.run()
+    size_1 = report["variants"]["+1 xp"]["size_1"]
+    assert size_1["ci_low"] > 0 # more experience keeps more men alive
+    assert size_1["replica_saving"] > 10
+    assert size_1["stderr"] < size_1["independent_stderr"]
+    assert set(report["variants"]["+1 xp"]) == set(SENSITIVITY_METRICS)
+    assert "+1 xp" in SensitivityAnalysis.format_report(report)
+
+def test_null_variant_has_no_effect():
+    report = SensitivityAnalysis(BASELINE, [{"id": "nothing"}], replicas=5).run()
+    for values in report["variants"]["nothing"].values():
+        assert values["effect"] == values["ci_low"] == values["ci_high"] == 0
+
+def test_baseline_matches_batch_runner():
+    analysis = SensitivityAnalysis(BASELINE, [], replicas=3)
+    scenario = BatchRunner.parse_scenario(BASELINE)
+    for replica in range(3):
+        record = BatchRunner.run_replica(scenario, replica)
+        metrics = analysis.run_replica(analysis.baseline, replica)
+        assert metrics["size_1"] == record["size_1"] and metrics["end_time"] == record["end_time"]
+
+def test_apply_variant():
+    scenario = BatchRunner.parse_scenario(BASELINE)
+    perturbed, constants = SensitivityAnalysis.apply_variant(
+        scenario, {"id": "v", "side": 1, "melee": 2, "size_fraction": 0.1, "constants": {"MORALE_LOSS_CONSTANT_A": 0.0}}
+    )
+    assert perturbed["units"][1] == {"size": 220, "stats": "6/7/1/2", "law": "sq"}
+    assert perturbed["units"][0] == scenario["units"][0] and scenario["units"][1]["size"] == 200
+    assert constants == {"MORALE_LOSS_CONSTANT_A": 0.0}
+    for bad in ({"id": "v", "experience": 1}, {"id": "v", "side": 0, "weapon": -5},
+                {"id": "v", "constants": {"MORALE": 1.0}}, {"id": "v", "speed": 1}):
+        with pytest.raises(ValueError):
+            SensitivityAnalysis.apply_variant(scenario, bad)
+    with pytest.raises(ValueError):
+        SensitivityAnalysis(BASELINE, [{"id": "a"}, {"id": "a"}])
+
+def test_default_variants_cover_stats_sizes_and_constants():
+    variants = SensitivityAnalysis(BASELINE, replicas=2).variants
+    assert len(variants) == 2 * 5 + len(Simulation.MORALE_CONSTANTS)
+
+def test_morale_constants_are_per_simulation(tmp_path):
+    def run(constant):
+        sim = BatchRunner.build_simulation(BatchRunner.parse_scenario(BASELINE), 1)
+        if constant is not None:
+            sim.MORALE_LOSS_CONSTANT_C = constant
+        sim.run_simulation(time=0.3)
+        return sim
+    changed = run(Simulation.MORALE_LOSS_CONSTANT_C * 5)
+    assert Simulation.MORALE_LOSS_CONSTANT_C == 0.0000040
+    assert changed.casualties['morale'][0] < run(None).casualties['morale'][0]
+    changed.save_checkpoint(tmp_path / "sim.npz")
+    assert Simulation.resume(tmp_path / "sim.npz").MORALE_LOSS_CONSTANT_C == changed.MORALE_LOSS_CONSTANT_C
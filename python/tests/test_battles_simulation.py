@@ -1,9 +1,11 @@
 import os
 import json
 import pytest
+import numpy as np
 import pandas as pd
 from imperial_generals.units.Regiment import Regiment
 from imperial_generals.battles.Simulation import Simulation
+from imperial_generals.utils.engaged_front import get_engaged_front
 
 def make_regiment(obj):
     return Regiment(obj["size"], obj["stats"], obj["law"])
@@ -30,3 +32,214 @@ GOLDEN_PATH = os.path.join(os.path.dirname(__file__), '../../test_cases/battle_s
 @pytest.mark.parametrize("case", json.load(open(GOLDEN_PATH)))
 def test_simulate_battle_golden(case):
     run_simulate_battle_case(case)
+
+def test_seeded_simulation_is_reproducible():
+    def run(seed):
+        sim = Simulation((Regiment(300, "4/5/2/1", "sq"), Regiment(250, "3/6/1/0", "sq")), seed=seed)
+        sim.run_simulation(time=0.5)
+        return sim.trajectory
+    first, second = run(7), run(7)
+    for name in first:
+        assert (first[name] == second[name]).all()
+    assert not (len(run(8)['time']) == len(first['time']) and (run(8)['time'] == first['time']).all())
+
+class PreemptedSimulation(Simulation):
+    """Simulation killed right after its third checkpoint."""
+    saves = 0
+
+    def save_checkpoint(self, path):
+        super().save_checkpoint(path)
+        self.saves += 1
+        if self.saves == 3:
+            raise KeyboardInterrupt
+
+def test_resume_from_checkpoint_is_bit_exact(tmp_path):
+    forces = lambda: (Regiment(3000, "4/5/2/1", "sq"), Regiment(2800, "3/6/1/0", "sq"))
+    full = Simulation(forces(), seed=3)
+    full.run_simulation(time=0.5)
+
+    preempted = PreemptedSimulation(forces(), seed=3)
+    with pytest.raises(KeyboardInterrupt):
+        preempted.run_simulation(time=0.5, checkpoint_path=tmp_path / "sim.npz", checkpoint_interval=0)
+    resumed = Simulation.resume(tmp_path / "sim.npz")
+    assert len(resumed.sim_output) == 4
+    resumed.run_simulation()
+    for name, column in full.trajectory.items():
+        assert (resumed.trajectory[name] == column).all()
+    assert [r.size for r in resumed.forces] == [r.size for r in full.forces]
+    assert resumed.forces[0].stats == full.forces[0].stats
+
+def test_run_without_time_needs_checkpoint():
+    sim = Simulation((Regiment(10, "4/5/2/1", "sq"), Regiment(10, "3/6/1/0", "sq")))
+    with pytest.raises(ValueError):
+        sim.run_simulation()
+
+def test_linear_law_scales_with_engaged_front():
+    reg1 = Regiment(1000, "4/5/2/1", "ln", frontage=100)
+    reg2 = Regiment(800, "3/6/1/0", "ln", frontage=300)
+    sim = Simulation((reg1, reg2))
+    sim.build_lanch_diffeq()
+    coef = [reg1.coef, reg2.coef]
+    # the narrower line sets the front; reserves keep it filled until a side is smaller than it
+    assert sim.rate_funcs[0]([1000, 800], coef, 0) == pytest.approx(-coef[1] * 100)
+    assert sim.rate_funcs[1]([1000, 800], coef, 1) == pytest.approx(-coef[0] * 100)
+    assert sim.rate_funcs[0]([1000, 40], coef, 0) == pytest.approx(-coef[1] * 40)
+
+    narrow = Simulation((Regiment(1000, "4/5/2/1", "ln"), Regiment(800, "3/6/1/0", "ln")), front_width=25)
+    narrow.build_lanch_diffeq()
+    assert narrow.rate_funcs[1]([1000, 800], coef, 1) == pytest.approx(-coef[0] * 25)
+
+def test_linear_law_matches_get_engaged_front():
+    # the per-event rates and the vectorised engaged front agree on every state of a grid
+    sizes = np.array([[s1, s2] for s1 in (0, 1, 40, 100, 299, 1000) for s2 in (0, 7, 100, 300, 800)])
+    for frontages in ((None, None), (100, 300), (250, None)):
+        for front_width in (None, 25, 500):
+            reg1 = Regiment(1000, "4/5/2/1", "ln", frontage=frontages[0])
+            reg2 = Regiment(800, "3/6/1/0", "ln", frontage=frontages[1])
+            sim = Simulation((reg1, reg2), front_width=front_width)
+            sim.build_lanch_diffeq()
+            coef = [reg1.coef, reg2.coef]
+            widths = [np.inf if f is None else f for f in frontages]
+            engaged = get_engaged_front(sizes, frontages=widths, front_width=front_width)
+            for state, front in zip(sizes.tolist(), engaged):
+                for i in (0, 1):
+                    assert sim.rate_funcs[i](state, coef, i) == pytest.approx(-coef[1 - i] * front[i])
+
+def test_checkpoint_keeps_frontage(tmp_path):
+    sim = Simulation((Regiment(50, "4/5/2/1", "ln", frontage=10), Regiment(40, "3/6/1/0", "ln")), seed=1, front_width=8)
+    sim.run_simulation(time=0.1)
+    sim.save_checkpoint(tmp_path / "sim.npz")
+    resumed = Simulation.resume(tmp_path / "sim.npz")
+    assert resumed.forces[0].frontage == 10 and resumed.front_width == 8
+
+def test_scheduled_events_are_applied_in_time_order():
+    sim = Simulation((Regiment(300, "4/5/2/1", "sq"), Regiment(300, "3/6/1/0", "sq")), seed=5)
+    sim.schedule_event(0.02, "withdraw", 1, 50)
+    sim.schedule_event(0.01, "reinforce", 0, 200)
+    sim.schedule_event(0.01, "stats", 1, "3/6/1/1")
+    sim.schedule_event(5.0, "reinforce", 1, 1000) # after the end, never applied
+    sim.run_simulation(time=0.03)
+    out = sim.sim_output
+    # each applied event is a row of its own at the event time
+    reinforced = out[out["time"] == 0.01]
+    assert len(reinforced) == 2 and reinforced["size_1"].iloc[0] - out["size_1"][reinforced.index[0] - 1] == 200
+    withdrawn = out[out["time"] == 0.02]
+    assert out["size_2"][withdrawn.index[0] - 1] - withdrawn["size_2"].iloc[0] == 50
+    assert sim.forces[1].stats[3] == 1
+    assert sim.casualties['initial_size'] == [500, 300]
+    # reinforcements and withdrawals are not losses
+    assert sim.casualties['losses'].tolist() == [500 - sim.forces[0].size, 250 - sim.forces[1].size]
+    assert [event[0] for event in sim.events] == [5.0]
+
+def test_events_after_the_run_do_not_change_it():
+    def forces():
+        return (Regiment(100, "4/5/2/1", "sq"), Regiment(90, "3/6/1/0", "sq"))
+    plain = Simulation(forces(), seed=9)
+    plain.run_simulation(time=0.05)
+    scheduled = Simulation(forces(), seed=9)
+    for i in range(1000):
+        scheduled.schedule_event(1.0 + i, "reinforce", i % 2, 10)
+    scheduled.run_simulation(time=0.05)
+    assert plain.sim_output.equals(scheduled.sim_output)
+
+def test_empty_side_waits_for_its_reinforcements(tmp_path):
+    sim = Simulation((Regiment(100, "4/5/2/1", "sq"), Regiment(0, "3/6/1/0", "sq")), seed=2)
+    sim.schedule_event(0.01, "reinforce", 1, 100)
+    sim.run_simulation(time=0.05)
+    out = sim.sim_output
+    # nothing happens before the reinforcements arrive, and the battle goes on after them
+    assert out["time"][1] == 0.01 and out["size_1"][1] == 100 and out["size_2"][1] == 100
+    assert len(out) > 2 and (out["size_2"] >= 0).all()
+    assert sim.casualties['initial_size'] == [100, 100]
+
+    # with the reinforcements due after the run, it stops without running on to infinity
+    waiting = Simulation((Regiment(100, "4/5/2/1", "sq"), Regiment(0, "3/6/1/0", "sq")), seed=2)
+    waiting.schedule_event(1.0, "reinforce", 1, 100)
+    waiting.run_simulation(time=0.05)
+    assert waiting.sim_output["time"].tolist() == [0.0]
+    # the men still to arrive are counted, not looked up in the event heap, and kept in checkpoints
+    waiting.save_checkpoint(tmp_path / "waiting.npz")
+    waiting = Simulation.resume(tmp_path / "waiting.npz")
+    assert waiting._pending_reinforcements == [0, 100]
+    waiting.run_simulation(time=1.05)
+    assert waiting._pending_reinforcements == [0, 0]
+    assert waiting.sim_output["time"][1] == 1.0 and waiting.sim_output["size_2"][1] == 100
+
+def test_schedule_event_validates():
+    sim = Simulation((Regiment(10, "4/5/2/1", "sq"), Regiment(10, "3/6/1/0", "sq")))
+    with pytest.raises(ValueError):
+        sim.schedule_event(0.1, "retreat", 0, 5)
+    with pytest.raises(ValueError):
+        sim.schedule_event(0.1, "reinforce", 2, 5)
+    with pytest.raises(ValueError):
+        sim.schedule_event(0.1, "stats", 0, "4/5")
+    with pytest.raises(ValueError):
+        sim.schedule_event(-1, "withdraw", 0, 5)
+
+def test_checkpoint_keeps_scheduled_events(tmp_path):
+    def scheduled():
+        sim = Simulation((Regiment(200, "4/5/2/1", "sq"), Regiment(200, "3/6/1/0", "sq")), seed=4)
+        sim.schedule_event(0.03, "reinforce", 1, 100)
+        sim.schedule_event(0.06, "withdraw", 0, 20)
+        return sim
+    full = scheduled()
+    full.run_simulation(time=0.1)
+    half = scheduled()
+    half.run_simulation(time=0.04)
+    half.save_checkpoint(tmp_path / "sim.npz")
+    resumed = Simulation.resume(tmp_path / "sim.npz")
+    assert [event[2] for event in resumed.events] == ["withdraw"]
+    resumed.run_simulation(time=0.1)
+    assert (resumed.trajectory['size_2'] == full.trajectory['size_2']).all()
+
+def test_memory_budget_coarsens_recording():
+    def forces():
+        return (Regiment(3000, "4/5/2/1", "sq"), Regiment(2800, "3/6/1/0", "sq"))
+    full = Simulation(forces(), seed=6)
+    full.run_simulation(time=1.0)
+    budget = 200 * Simulation.TRAJECTORY_ROW_BYTES
+    capped = Simulation(forces(), seed=6, memory_budget=budget)
+    capped.run_simulation(time=1.0)
+    rows = len(capped.trajectory['time'])
+    assert rows * Simulation.TRAJECTORY_ROW_BYTES <= budget
+    assert capped.record_interval is not None
+    assert capped.n_events == full.n_events == len(full.trajectory['time']) - 1
+    # same battle, same final state, fewer rows
+    for name in ("time", "size_1", "size_2", "morale_1", "morale_2"):
+        assert capped.trajectory[name][0] == full.trajectory[name][0]
+        assert capped.trajectory[name][-1] == full.trajectory[name][-1]
+    assert (capped.trajectory['time'][1:] > capped.trajectory['time'][:-1]).all()
+    assert len(capped.sim_output) == rows
+
+def test_memory_budget_validates():
+    with pytest.raises(ValueError):
+        Simulation((Regiment(10, "4/5/2/1", "sq"), Regiment(10, "3/6/1/0", "sq")), memory_budget=100)
+    with pytest.raises(ValueError):
+        Simulation((Regiment(10, "4/5/2/1", "sq"), Regiment(10, "3/6/1/0", "sq")), record_interval=0)
+
+def test_coarsened_run_resumes(tmp_path):
+    def capped():
+        return Simulation(
+            (Regiment(2000, "4/5/2/1", "sq"), Regiment(2000, "3/6/1/0", "sq")),
+            seed=2, memory_budget=100 * Simulation.TRAJECTORY_ROW_BYTES
+        )
+    full = capped()
+    full.run_simulation(time=0.5)
+    half = capped()
+    half.run_simulation(time=0.2)
+    half.save_checkpoint(tmp_path / "sim.npz")
+    resumed = Simulation.resume(tmp_path / "sim.npz")
+    assert resumed.memory_budget == half.memory_budget and resumed.n_events == half.n_events
+    resumed.run_simulation(time=0.5)
+    assert resumed.n_events == full.n_events
+    assert resumed.trajectory['size_1'][-1] == full.trajectory['size_1'][-1]
+
+def test_profile_memory_reports_phases():
+    sim = Simulation((Regiment(300, "4/5/2/1", "sq"), Regiment(300, "3/6/1/0", "sq")), seed=1)
+    sim.run_simulation(time=0.1)
+    assert sim.memory_profile is None
+    sim.run_simulation(time=0.2, profile_memory=True)
+    assert set(sim.memory_profile) == {"setup", "events"}
+    events = sim.memory_profile["events"]
+    assert events["peak"] >= events["retained"] > 0
+    assert isinstance(events["top"], list)
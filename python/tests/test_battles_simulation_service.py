@@ -0,0 +1,103 @@
+import json
+import asyncio
+import pytest
+from imperial_generals.battles.SimulationService import SimulationService
+
+REQUEST = {
+    "units": [{"size": 60, "stats": "4/5/2/1", "law": "sq"}, {"size": 50, "stats": "3/6/1/0", "law": "sq"}],
+    "time": 0.2,
+    "replicas": 3,
+}
+
+def test_predict_batches_and_coalesces():
+    async def scenario():
+        async with SimulationService(workers=0, batch_window=0.05) as service:
+            requests = [dict(REQUEST, seed=i % 3) for i in range(9)]
+            results = await asyncio.gather(*(service.predict(r) for r in requests))
+            return results, service.metrics()
+    results, metrics = asyncio.run(scenario())
+    assert results[0] == results[3] == results[6]
+    assert results[0]["replicas"] == 3 and sum(results[0]["outcomes"].values()) == 3
+    assert abs(sum(results[0]["win_probability"]) + results[0]["undecided"] - 1) < 1e-12
+    assert metrics["requests"] == 9 and metrics["coalesced"] == 6 and metrics["completed"] == 9
+    assert metrics["batches"] == 1 and metrics["mean_batch_size"] == 3
+    assert set(metrics["latency_ms"]) == {"p50", "p95", "p99", "max"} and metrics["throughput_rps"] > 0
+
+def test_requests_differing_in_replicas_share_one_run():
+    async def scenario():
+        async with SimulationService(workers=0, batch_window=0.05) as service:
+            shared = await asyncio.gather(*(service.predict(dict(REQUEST, seed=4, replicas=n)) for n in (2, 5, 3)))
+            metrics = service.metrics()
+        alone = []
+        for n in (2, 5, 3):
+            async with SimulationService(workers=0, batch_window=0) as service:
+                alone.append(await service.predict(dict(REQUEST, seed=4, replicas=n)))
+        return shared, alone, metrics
+    shared, alone, metrics = asyncio.run(scenario())
+    # each caller gets the prefix of one run of 5 replicas, identical to a run of its own
+    assert shared == alone and [r["replicas"] for r in shared] == [2, 5, 3]
+    assert metrics["coalesced"] == 2 and metrics["batches"] == 1 and metrics["mean_batch_size"] == 1
+
+def test_larger_request_does_not_join_a_smaller_running_run():
+    async def scenario():
+        async with SimulationService(workers=0, batch_window=0) as service:
+            small = asyncio.ensure_future(service.predict(dict(REQUEST, seed=6, replicas=2)))
+            while service.metrics()["batches"] == 0:
+                await asyncio.sleep(0)
+            # the run of 2 is dispatched: a request for 4 runs again, one for 1 joins it
+            results = await asyncio.gather(
+                small,
+                service.predict(dict(REQUEST, seed=6, replicas=4)),
+                service.predict(dict(REQUEST, seed=6, replicas=1)),
+            )
+            return results, service.metrics()
+    results, metrics = asyncio.run(scenario())
+    assert [r["replicas"] for r in results] == [2, 4, 1]
+    assert metrics["batches"] == 2 and metrics["coalesced"] == 1
+
+def test_predict_is_reproducible_and_validates():
+    async def scenario():
+        async with SimulationService(workers=0, batch_window=0) as service:
+            first = await service.predict(REQUEST)
+            again = await service.predict(dict(REQUEST, id="client-7"))
+            with pytest.raises(ValueError):
+                await service.predict({"units": REQUEST["units"][:1], "time": 1})
+            return first, again
+    first, again = asyncio.run(scenario())
+    assert first == again
+
+def test_bounded_queue_and_timeout():
+    async def scenario():
+        service = SimulationService(workers=0, max_queue=1, timeout=0.01)
+        await service.start()
+        service._batcher.cancel() # nothing is consumed from the queue
+        pending = asyncio.ensure_future(service.predict(dict(REQUEST, seed=1)))
+        await asyncio.sleep(0)
+        with pytest.raises(asyncio.QueueFull):
+            await service.predict(dict(REQUEST, seed=2))
+        with pytest.raises(TimeoutError):
+            await pending
+        metrics = service.metrics()
+        await service.stop()
+        return metrics
+    metrics = asyncio.run(scenario())
+    assert metrics["rejected"] == 1 and metrics["timeouts"] == 1
+
+def test_json_lines_server(tmp_path):
+    async def scenario():
+        async with SimulationService(workers=1) as service:
+            server = await service.serve(path=str(tmp_path / "sim.sock"))
+            async with server:
+                reader, writer = await asyncio.open_unix_connection(str(tmp_path / "sim.sock"))
+                for message in (dict(REQUEST, id=1), {"id": 2, "units": []}, dict(REQUEST, id=3)):
+                    writer.write(json.dumps(message).encode() + b"\n")
+                await writer.drain()
+                responses = [json.loads(await reader.readline()) for _ in range(3)]
+                writer.write(b'{"op": "metrics", "id": "m"}\n')
+                metrics = json.loads(await reader.readline())
+                writer.close()
+            return {r["id"]: r for r in responses}, metrics
+    responses, metrics = asyncio.run(scenario())
+    assert responses[1]["result"] == responses[3]["result"]
+    assert responses[2]["error"]["type"] == "ValueError"
+    assert metrics["id"] == "m" and metrics["result"]["completed"] == 2
@@ -0,0 +1,74 @@
+import pytest
+import numpy as np
+
+pytest.importorskip("pyarrow")
+import pyarrow.parquet as pq
+from imperial_generals.units.Regiment import Regiment
+from imperial_generals.battles import Simulation, TrajectoryReader, TrajectoryWriter
+
+MATCHUPS = {"1000 sq vs 800 sq": (1000, 800), "a/b: 300 vs 300": (300, 300)}
+
+def simulate(sizes, seed):
+    sim = Simulation((Regiment(sizes[0], "4/5/2/1", "sq"), Regiment(sizes[1], "3/6/1/0", "sq")), seed=seed)
+    sim.run_simulation(time=0.3)
+    return sim
+
+@pytest.fixture(scope="module")
+def dataset(tmp_path_factory):
+    root = tmp_path_factory.mktemp("trajectories")
+    sims = {}
+    with TrajectoryWriter(root, row_group_size=500, max_open_files=1) as writer:
+        for replica in range(4):
+            for matchup, sizes in MATCHUPS.items():
+                sims[matchup, replica] = simulate(sizes, replica)
+                writer.write(sims[matchup, replica], matchup, replica, metadata={'sizes': list(sizes)})
+    return root, sims
+
+def test_roundtrip(dataset):
+    root, sims = dataset
+    reader = TrajectoryReader(root)
+    assert reader.matchups() == sorted(MATCHUPS)
+    assert reader.metadata("a/b: 300 vs 300") == {'sizes': [300, 300]}
+    for (matchup, replica), sim in sims.items():
+        stored = reader.trajectory(matchup, replica)
+        expected = sim.trajectory
+        assert stored['time'].dtype == np.float32 and stored['size_1'].dtype == np.int32
+        assert np.allclose(stored['time'], expected['time'], rtol=1e-6)
+        assert np.array_equal(stored['size_2'], expected['size_2'])
+        assert np.allclose(stored['morale_1'], expected['morale_1'], rtol=1e-6)
+
+def test_row_groups_and_parts(dataset):
+    root, sims = dataset
+    parts = list(root.glob("matchup=*/part-*.parquet"))
+    # one open file at a time: alternating matchups start new parts
+    assert len(parts) > 2 and not list(root.glob("**/*.tmp"))
+    assert max(pq.ParquetFile(p).metadata.row_group(0).num_rows for p in parts) <= 500
+    total = sum(len(sim.trajectory['time']) for sim in sims.values())
+    assert TrajectoryReader(root).read().num_rows == total
+
+def test_filtered_read(dataset):
+    root, sims = dataset
+    reader = TrajectoryReader(root, memory_map=True)
+    table = reader.read(["1000 sq vs 800 sq"], replicas=[1, 3], columns=["replica", "time"])
+    assert table.column_names == ["replica", "time", "matchup"]
+    assert set(table.column("replica").to_pylist()) == {1, 3}
+    assert set(table.column("matchup").to_pylist()) == {"1000 sq vs 800 sq"}
+    assert table.num_rows == sum(len(sims["1000 sq vs 800 sq", r].trajectory['time']) for r in (1, 3))
+    assert reader.read(["1000 sq vs 800 sq"], replicas=[99]).num_rows == 0
+    with pytest.raises(KeyError):
+        reader.trajectory("1000 sq vs 800 sq", 99)
+
+def test_parts_read_in_write_order(tmp_path):
+    sim = simulate((1000, 800), 7)
+    # a replica spread over many parts, across two writer sessions
+    with TrajectoryWriter(tmp_path, row_group_size=50, max_open_files=1) as writer:
+        for i in range(8):
+            writer.write(sim, "a", 0)
+            writer.write(sim, "b", 0)
+    with TrajectoryWriter(tmp_path, row_group_size=50) as writer:
+        writer.write(sim, "a", 0)
+    parts = sorted(p.name for p in (tmp_path / "matchup=a").glob("part-*.parquet"))
+    assert len(parts) > 9
+    times = TrajectoryReader(tmp_path).read(["a"], columns=["time"]).column("time").to_numpy()
+    expected = np.tile(sim.trajectory['time'].astype(np.float32), 9)
+    assert np.array_equal(times, expected)
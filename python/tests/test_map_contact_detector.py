@@ -0,0 +1,57 @@
+import pytest
+import numpy as np
+from imperial_generals.map import ContactDetector, VoronoiMap
+
+@pytest.fixture
+def grid_map():
+    rng = np.random.default_rng(1)
+    xs, ys = np.meshgrid(np.arange(10) * 10 + 5, np.arange(10) * 10 + 5)
+    points = np.column_stack([xs.ravel(), ys.ravel()]) + rng.uniform(-1, 1, size=(100, 2))
+    vm = VoronoiMap(points, width=100, height=100)
+    vm.generate_diagram()
+    return vm
+
+def brute_force(vm, positions, factions, contact_range):
+    indptr, indices = vm.get_adjacency()
+    cells = vm.locate_points(positions)
+    pairs = set()
+    for i in range(len(positions)):
+        for j in range(i + 1, len(positions)):
+            near = cells[i] == cells[j] or cells[j] in indices[indptr[cells[i]]:indptr[cells[i] + 1]]
+            if contact_range is not None:
+                near &= np.linalg.norm(positions[i] - positions[j]) <= contact_range
+            if near and factions[i] != factions[j]:
+                pairs.add((i, j))
+    return pairs
+
+@pytest.mark.parametrize("contact_range", [None, 4.0])
+def test_matches_all_pairs(grid_map, contact_range):
+    rng = np.random.default_rng(2)
+    positions = rng.uniform(0, 100, (300, 2))
+    factions = rng.choice(["Union", "Confederacy"], 300)
+    detector = ContactDetector(grid_map, contact_range=contact_range, capacity=16)
+    detector.add(range(300), positions, factions)
+    new = detector.update()
+    assert set(new) == brute_force(grid_map, positions, factions, contact_range)
+
+def test_update_reports_only_new_engagements(grid_map):
+    detector = ContactDetector(grid_map, contact_range=3.0)
+    detector.add(["a", "b", "c"], [(5, 5), (6, 5), (50, 50)], ["red", "blue", "blue"])
+    assert detector.update() == [("a", "b")]
+    assert detector.update() == []
+    detector.move(["c"], [(5, 7)])
+    assert detector.cell("c") == detector.cell("a")
+    assert detector.update() == [("a", "c")]
+    assert sorted(detector.engaged()) == [("a", "b"), ("a", "c")]
+    detector.remove(["a"])
+    assert detector.engaged() == [] and detector.n_armies == 2
+    detector.add(["d"], [(5, 6)], ["red"])
+    assert sorted(detector.update()) == [("d", "b"), ("d", "c")]
+
+def test_rejects_unknown_and_duplicate_armies(grid_map):
+    detector = ContactDetector(grid_map)
+    detector.add(["a"], [(1, 1)], ["red"])
+    with pytest.raises(ValueError):
+        detector.add(["a"], [(2, 2)], ["red"])
+    with pytest.raises(KeyError):
+        detector.move(["z"], [(2, 2)])
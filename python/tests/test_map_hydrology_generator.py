@@ -0,0 +1,65 @@
+import pytest
+import numpy as np
+from imperial_generals.map import HydrologyGenerator, MapConfig, MapGenerator
+
+def line_graph(n):
+    # cells 0..n-1 in a row, each adjacent to its neighbours
+    rows = [[j for j in (i - 1, i + 1) if 0 <= j < n] for i in range(n)]
+    indptr = np.cumsum([0] + [len(r) for r in rows])
+    indices = np.array([j for r in rows for j in r])
+    return indptr, indices
+
+def test_fill_depressions_removes_pits():
+    indptr, indices = line_graph(5)
+    elevation = np.array([0.0, 0.5, 0.2, 0.6, 0.9])
+    outlets = np.array([True, False, False, False, False])
+    filled = HydrologyGenerator(epsilon=1e-3).fill_depressions(elevation, indptr, indices, outlets)
+    # the pit at cell 2 is raised above its spill point at cell 1
+    assert filled[2] == pytest.approx(0.501)
+    assert np.all(np.diff(filled) > 0)
+
+def test_receivers_and_accumulation():
+    indptr, indices = line_graph(5)
+    hydro = HydrologyGenerator(river_fraction=0.6)
+    result = hydro.generate(np.array([0.0, 0.5, 0.2, 0.6, 0.9]), indptr, indices, np.array([1, 0, 0, 0, 0], dtype=bool))
+    assert result['receivers'].tolist() == [-1, 0, 1, 2, 3]
+    assert result['accumulation'].tolist() == [5, 4, 3, 2, 1]
+    assert result['river'].tolist() == [True, True, True, False, False]
+    edges = HydrologyGenerator.river_edges(result['receivers'], result['river'])
+    assert edges.tolist() == [[1, 0], [2, 1]]
+
+def test_accumulation_conserves_rainfall():
+    receivers = np.array([-1, 0, 0, 1, 1, -1, 5])
+    acc = HydrologyGenerator.accumulate_flow(receivers)
+    assert acc.tolist() == [5, 3, 1, 1, 1, 2, 1]
+    assert acc[receivers < 0].sum() == len(receivers)
+
+def test_water_cells_are_not_rivers():
+    indptr, indices = line_graph(4)
+    water = np.array([True, False, False, False])
+    result = HydrologyGenerator(river_fraction=0.5).generate(
+        np.array([0.1, 0.3, 0.4, 0.5]), indptr, indices, np.zeros(4, dtype=bool), water=water
+    )
+    assert result['accumulation'][0] == 4
+    assert not result['river'][0]
+
+def test_invalid_parameters():
+    with pytest.raises(ValueError):
+        HydrologyGenerator(river_fraction=0)
+    with pytest.raises(ValueError):
+        HydrologyGenerator(epsilon=-1)
+
+def test_map_generator_routes_rivers():
+    game_map = MapGenerator(MapConfig(width=80, height=80, min_distance=4, seed=5)).generate_map()
+    data = game_map['voronoi'].cell_data
+    receivers = data['receivers']
+    has_receiver = receivers >= 0
+    # water always flows to a strictly lower filled cell
+    assert np.all(data['filled_elevation'][receivers[has_receiver]] < data['filled_elevation'][has_receiver])
+    assert np.all(data['river'][game_map['rivers'][:, 0]])
+
+def test_add_points_drops_drainage_fields():
+    voronoi = MapGenerator(MapConfig(width=80, height=80, min_distance=4, seed=5)).generate_map()['voronoi']
+    voronoi.add_points([(40.5, 40.5)])
+    assert not {'filled_elevation', 'receivers', 'accumulation', 'river'} & voronoi.cell_data.keys()
+    assert len(voronoi.cell_data['elevation']) == len(voronoi.points)
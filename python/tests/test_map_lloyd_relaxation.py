@@ -0,0 +1,50 @@
+import pytest
+import numpy as np
+from unittest.mock import patch
+from imperial_generals.map import LloydRelaxation, MapConfig, MapGenerator, VoronoiMap
+
+def test_cell_centroids_match_clipped_polygons():
+    rng = np.random.default_rng(0)
+    points = rng.uniform(0, 1, size=(300, 2)) * [100, 60]
+    centroids, areas = LloydRelaxation.cell_centroids(points, 100, 60)
+    vm = VoronoiMap(points, width=100, height=60)
+    vm.generate_diagram()
+    np.testing.assert_allclose(centroids, vm.get_centroids(), atol=1e-9)
+    np.testing.assert_allclose(areas[vm.polygon_sites], [p.area for p in vm.polygons])
+    assert areas.sum() == pytest.approx(6000)
+
+def test_cell_centroids_small_and_empty():
+    centroids, areas = LloydRelaxation.cell_centroids([(2, 3)], 10, 10)
+    np.testing.assert_allclose(centroids, [[5, 5]])
+    np.testing.assert_allclose(areas, [100])
+    centroids, areas = LloydRelaxation.cell_centroids(np.empty((0, 2)), 10, 10)
+    assert centroids.shape == (0, 2) and areas.shape == (0,)
+
+def test_relax_evens_out_cells():
+    points = np.random.default_rng(1).uniform(0, 100, size=(400, 2))
+    relaxed = LloydRelaxation(iterations=10).relax(points, 100, 100)
+    assert relaxed.shape == points.shape
+    assert ((relaxed >= 0) & (relaxed <= 100)).all()
+    _, before = LloydRelaxation.cell_centroids(points, 100, 100)
+    _, after = LloydRelaxation.cell_centroids(relaxed, 100, 100)
+    assert after.std() < before.std() / 2
+
+def test_relax_stops_early_on_convergence():
+    points = np.random.default_rng(2).uniform(0, 50, size=(100, 2))
+    with patch.object(LloydRelaxation, 'cell_centroids', wraps=LloydRelaxation.cell_centroids) as spy:
+        LloydRelaxation(iterations=20, tolerance=10.0).relax(points, 50, 50)
+    assert spy.call_count == 1
+    np.testing.assert_array_equal(LloydRelaxation(iterations=0).relax(points, 50, 50), points)
+
+def test_invalid_arguments():
+    with pytest.raises(ValueError):
+        LloydRelaxation(iterations=-1)
+    with pytest.raises(ValueError):
+        LloydRelaxation(tolerance=-0.1)
+
+def test_map_generator_relaxation_stage():
+    plain = MapGenerator(MapConfig(width=60, height=60, min_distance=4, seed=3)).generate_map()
+    relaxed = MapGenerator(MapConfig(width=60, height=60, min_distance=4, seed=3, lloyd_iterations=5)).generate_map()
+    assert len(relaxed['points']) == len(plain['points'])
+    areas = lambda game_map: [p.area for p in game_map['voronoi'].polygons]
+    assert np.std(areas(relaxed)) < np.std(areas(plain))
@@ -1,4 +1,5 @@
 import pytest
+import numpy as np
 from imperial_generals.map import MapConfig
 
 def test_map_config_initialization():
@@ -34,4 +35,25 @@ def test_map_config_types():
 
 def test_map_config_repr():
     config = MapConfig(1, 2, 3)
-    assert repr(config) is not None
\ No newline at end of file
+    assert repr(config) is not None
+
+def test_map_config_seed():
+    assert MapConfig(1, 2, 3).seed is None
+    assert MapConfig(1, 2, 3, seed=42).seed == 42
+    with pytest.raises(TypeError):
+        MapConfig(1, 2, 3, seed="42")
+
+def test_map_config_lloyd_iterations():
+    assert MapConfig(1, 2, 3).lloyd_iterations == 0
+    assert MapConfig(1, 2, 3, lloyd_iterations=4).lloyd_iterations == 4
+    with pytest.raises(TypeError):
+        MapConfig(1, 2, 3, lloyd_iterations=1.5)
+    with pytest.raises(ValueError):
+        MapConfig(1, 2, 3, lloyd_iterations=-1)
+
+def test_map_config_min_distance_field():
+    assert MapConfig(1, 2, 3).min_distance_field is None
+    raster = np.ones((4, 4))
+    assert MapConfig(1, 2, 3, min_distance_field=raster).min_distance_field is raster
+    with pytest.raises(TypeError):
+        MapConfig(1, 2, 3, min_distance_field=[[1.0]])
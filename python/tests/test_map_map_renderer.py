@@ -0,0 +1,62 @@
+import io
+import pytest
+import numpy as np
+import matplotlib.image as mpimg
+from imperial_generals.map import MapConfig, MapGenerator, MapRenderer, MapStore, VoronoiMap
+
+@pytest.fixture(scope="module")
+def game_map():
+    return MapGenerator(MapConfig(width=80, height=60, min_distance=5, seed=4)).generate_map()
+
+def test_render_png_to_buffer(game_map):
+    buffer = io.BytesIO()
+    MapRenderer(size=(160, 120)).render(game_map['voronoi'], buffer, fmt='png')
+    buffer.seek(0)
+    image = mpimg.imread(buffer, format='png')
+    assert image.shape[:2] == (120, 160)
+
+def test_render_svg_to_file(tmp_path, game_map):
+    target = tmp_path / "map.svg"
+    MapRenderer().render(game_map['voronoi'], target, fmt='svg', show_points=True)
+    assert target.read_text().lstrip().startswith("<?xml")
+
+def test_render_invalid_format(game_map):
+    with pytest.raises(ValueError):
+        MapRenderer().render(game_map['voronoi'], io.BytesIO(), fmt='gif')
+
+def test_cell_colors_sources(game_map):
+    voronoi = game_map['voronoi']
+    n = len(voronoi.points)
+    terrain = MapRenderer.cell_colors(voronoi)
+    assert terrain.shape == (n, 4)
+    owners = np.arange(n) % 3 - 1
+    owned = MapRenderer.cell_colors(voronoi, ownership=owners)
+    assert np.allclose(owned[owners == -1], owned[0])
+    assert np.allclose(MapRenderer.cell_colors(voronoi, colors='red')[:, :3], [1, 0, 0])
+    with pytest.raises(ValueError):
+        MapRenderer.cell_colors(voronoi, colors=['red', 'blue'])
+
+def test_render_raster_matches_location(game_map):
+    voronoi = game_map['voronoi']
+    renderer = MapRenderer(size=(40, 30))
+    image = renderer.render_raster(voronoi, None, colors=np.column_stack([
+        np.linspace(0, 1, len(voronoi.points)), np.zeros((len(voronoi.points), 2)), np.ones(len(voronoi.points))
+    ]))
+    assert image.shape == (30, 40, 4)
+    raster = voronoi.rasterize((40, 30))
+    # top-left pixel centre is (1, 59) in map coordinates
+    assert raster[0, 0] == voronoi.locate_point(1, 59)
+    assert image[0, 0, 0] == pytest.approx(raster[0, 0] / (len(voronoi.points) - 1))
+
+def test_render_batch_from_store(tmp_path, game_map):
+    MapStore.save(game_map['voronoi'], tmp_path / "map")
+    maps = [MapStore.load(tmp_path / "map") for _ in range(3)]
+    targets = [tmp_path / f"thumb_{i}.png" for i in range(3)]
+    written = MapRenderer(size=(32, 24)).render_batch(maps, targets)
+    assert written == targets
+    assert all(mpimg.imread(t).shape[:2] == (24, 32) for t in targets)
+
+def test_render_empty_map():
+    vm = VoronoiMap([], width=10, height=10)
+    image = MapRenderer(size=(4, 4), background='black').render_raster(vm, None)
+    assert np.allclose(image[..., :3], 0)
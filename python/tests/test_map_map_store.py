@@ -0,0 +1,82 @@
+import importlib
+import pytest
+import numpy as np
+from imperial_generals.map import MapCache, MapConfig, MapGenerator, MapStore, VoronoiMap
+
+@pytest.fixture(scope="module")
+def game_map():
+    return MapGenerator(MapConfig(width=60, height=40, min_distance=4, seed=2)).generate_map()
+
+def test_save_load_roundtrip(tmp_path, game_map):
+    voronoi = game_map['voronoi']
+    MapStore.save(voronoi, tmp_path / "map", metadata={'name': 'test'})
+    loaded = MapStore.load(tmp_path / "map")
+    assert isinstance(loaded.points, np.memmap)
+    assert np.array_equal(loaded.points, voronoi.points)
+    assert (loaded.width, loaded.height) == (60, 40)
+    for a, b in zip(loaded.get_adjacency(), voronoi.get_adjacency()):
+        assert np.array_equal(a, b)
+    assert set(loaded.cell_data) == set(voronoi.cell_data)
+    assert np.array_equal(loaded.cell_data['terrain'], voronoi.cell_data['terrain'])
+    assert MapStore.read_manifest(tmp_path / "map")['metadata'] == {'name': 'test'}
+    # polygons are rebuilt lazily from the vertex arrays
+    assert len(loaded.polygons) == len(voronoi.polygons)
+    assert all(a.equals(b) for a, b in zip(loaded.polygons, voronoi.polygons))
+    assert np.allclose(loaded.get_centroids(), voronoi.get_centroids())
+    assert np.array_equal(loaded.locate_points([(10, 10), (55, 35)]), voronoi.locate_points([(10, 10), (55, 35)]))
+
+def test_polygon_arrays(game_map):
+    voronoi = game_map['voronoi']
+    vertices, offsets = voronoi.get_polygon_arrays()
+    assert len(offsets) == len(voronoi.polygons) + 1
+    first = voronoi.polygons[0]
+    assert np.allclose(vertices[offsets[0]:offsets[1]], np.asarray(first.exterior.coords)[:-1])
+
+def test_save_overwrite(tmp_path, game_map):
+    MapStore.save(game_map['voronoi'], tmp_path / "map")
+    MapStore.save(game_map['voronoi'], tmp_path / "map")
+    with pytest.raises(OSError):
+        MapStore.save(game_map['voronoi'], tmp_path / "map", overwrite=False)
+    assert [p.name for p in tmp_path.iterdir()] == ["map"]
+
+def test_load_empty_map(tmp_path):
+    MapStore.save(VoronoiMap([], width=10, height=10), tmp_path / "empty")
+    loaded = MapStore.load(tmp_path / "empty")
+    assert len(loaded.points) == 0
+    assert loaded.polygons == []
+
+def test_map_cache_hit(tmp_path):
+    cache = MapCache(tmp_path / "cache")
+    config = MapConfig(width=50, height=50, min_distance=5, seed=9)
+    first = MapGenerator(config, cache=cache).generate_map()
+    assert len(list((tmp_path / "cache").iterdir())) == 1
+    second = MapGenerator(config, cache=cache).generate_map()
+    assert isinstance(second['voronoi'].points, np.memmap)
+    assert second['points'] == first['points']
+    assert np.array_equal(second['rivers'], first['rivers'])
+    # cached maps keep their stages registered for later insertions
+    for game_map in (first, second):
+        game_map['voronoi'].add_points([(25.5, 25.5)])
+    np.testing.assert_array_equal(second['voronoi'].cell_data['terrain'], first['voronoi'].cell_data['terrain'])
+    assert 'river' not in second['voronoi'].cell_data
+
+def test_map_cache_key():
+    assert MapCache.key(MapConfig(10, 10, 2)) is None
+    a = MapCache.key(MapConfig(10, 10, 2, seed=1))
+    assert a == MapCache.key(MapConfig(10, 10, 2, seed=1))
+    assert a != MapCache.key(MapConfig(10, 10, 2, seed=2))
+    assert a != MapCache.key(MapConfig(10, 10, 2, seed=1), hydrology="other")
+
+def test_map_cache_key_generator_version(monkeypatch):
+    # maps generated by an older sampler must not be served for the same config and seed
+    key = MapCache.key(MapConfig(10, 10, 2, seed=1))
+    monkeypatch.setattr(importlib.import_module("imperial_generals.map.MapCache"), "GENERATOR_VERSION", 1)
+    assert MapCache.key(MapConfig(10, 10, 2, seed=1)) != key
+
+def test_map_cache_key_min_distance_field():
+    raster = np.full((4, 4), 2.0)
+    base = MapCache.key(MapConfig(10, 10, 2, seed=1))
+    keyed = MapCache.key(MapConfig(10, 10, 2, seed=1, min_distance_field=raster))
+    assert keyed is not None and keyed != base
+    assert keyed == MapCache.key(MapConfig(10, 10, 2, seed=1, min_distance_field=raster.copy()))
+    assert MapCache.key(MapConfig(10, 10, 2, seed=1, min_distance_field=lambda pts: 2.0)) is None
@@ -0,0 +1,62 @@
+import pytest
+import numpy as np
+from imperial_generals.map import Pathfinder, VoronoiMap
+
+@pytest.fixture
+def grid_map():
+    # 10x10 jittered grid so every cell has a handful of neighbours
+    rng = np.random.default_rng(1)
+    xs, ys = np.meshgrid(np.arange(10) * 10 + 5, np.arange(10) * 10 + 5)
+    points = np.column_stack([xs.ravel(), ys.ravel()]) + rng.uniform(-1, 1, size=(100, 2))
+    vm = VoronoiMap(points, width=100, height=100)
+    vm.generate_diagram()
+    return vm
+
+def test_adjacency_is_symmetric(grid_map):
+    indptr, indices = grid_map.get_adjacency()
+    assert len(indptr) == 101
+    edges = {(i, j) for i in range(100) for j in indices[indptr[i]:indptr[i + 1]]}
+    assert all((j, i) in edges for i, j in edges)
+    # interior cells of a jittered grid have at least 4 neighbours
+    assert all(indptr[i + 1] - indptr[i] >= 4 for i in (44, 45, 54, 55))
+
+def test_find_path_matches_distance_field(grid_map):
+    finder = Pathfinder(grid_map)
+    path, cost = finder.find_path(0, 99)
+    assert path[0] == 0 and path[-1] == 99
+    indptr, indices = grid_map.get_adjacency()
+    for a, b in zip(path, path[1:]):
+        assert b in indices[indptr[a]:indptr[a + 1]]
+    dist, _ = finder.distance_field([99])
+    assert cost == pytest.approx(dist[0])
+    route, route_cost = finder.route_to([99], 0)
+    assert route[0] == 0 and route[-1] == 99
+    assert route_cost == pytest.approx(cost)
+
+def test_impassable_cells_are_avoided(grid_map):
+    costs = np.ones(100)
+    wall = [i for i in range(100) if i % 10 == 5 and i != 95]
+    costs[wall] = np.inf
+    finder = Pathfinder(grid_map, costs)
+    path, cost = finder.find_path(0, 9)
+    assert not set(path) & set(wall)
+    assert 95 in path
+    costs[95] = np.inf
+    finder.set_costs(costs)
+    assert finder.find_path(0, 9) == ([], float('inf'))
+
+def test_distance_field_cache_invalidated(grid_map):
+    finder = Pathfinder(grid_map)
+    field = finder.distance_field([3, 60])
+    assert finder.distance_field([60, 3]) is field
+    assert field[0][3] == 0 and field[0][60] == 0
+    finder.update_costs([4], [5.0])
+    new_field = finder.distance_field([3, 60])
+    assert new_field is not field
+    assert new_field[0][4] > field[0][4]
+
+def test_invalid_costs(grid_map):
+    with pytest.raises(ValueError):
+        Pathfinder(grid_map, np.ones(5))
+    with pytest.raises(ValueError):
+        Pathfinder(grid_map, np.zeros(100))
@@ -1,6 +1,6 @@
 import pytest
 import numpy as np
-from imperial_generals.map import PoissonDiscSampler
+from imperial_generals.map import MapConfig, MapGenerator, PoissonDiscSampler
 
 def test_generate_basic():
     points = PoissonDiscSampler.generate(100, 100, 10)
@@ -51,4 +51,36 @@ def test_points_within_bounds():
     points = PoissonDiscSampler.generate(20, 30, 2)
     for x, y in points:
         assert 0 <= x < 20
-        assert 0 <= y < 30
\ No newline at end of file
+        assert 0 <= y < 30
+
+def test_seed_reproducible():
+    assert PoissonDiscSampler.generate(50, 50, 5, seed=3) == PoissonDiscSampler.generate(50, 50, 5, seed=3)
+    with pytest.raises(TypeError):
+        PoissonDiscSampler.generate(50, 50, 5, seed="3")
+
+def test_variable_min_distance_callable():
+    field = lambda pts: 1 + pts[:, 0] / 10  # 1 at the left edge, 11 at the right
+    points = np.array(PoissonDiscSampler.generate(100, 60, field, seed=4))
+    radii = field(points)
+    dist = np.linalg.norm(points[:, None] - points[None, :], axis=2)
+    np.fill_diagonal(dist, np.inf)
+    assert (dist >= np.minimum.outer(radii, radii) - 1e-7).all()
+    # far more points where the minimum distance is small
+    assert (points[:, 0] < 30).sum() > 5 * (points[:, 0] >= 70).sum()
+
+def test_variable_min_distance_raster():
+    raster = np.full((2, 2), 2.0)
+    raster[0] = 8.0  # row 0 is the top half of the map
+    points = np.array(PoissonDiscSampler.generate(50, 50, raster, seed=1))
+    assert (points[:, 1] < 25).sum() > 4 * (points[:, 1] >= 25).sum()
+    with pytest.raises(ValueError):
+        PoissonDiscSampler.generate(50, 50, np.zeros((2, 2)))
+    with pytest.raises(ValueError):
+        PoissonDiscSampler.generate(50, 50, lambda pts: -np.ones(len(pts)))
+
+def test_map_generator_min_distance_field():
+    raster = np.full((2, 2), 2.0)
+    raster[:, 1] = 6.0  # sparse right half
+    game_map = MapGenerator(MapConfig(width=60, height=60, min_distance=4, seed=3, min_distance_field=raster)).generate_map()
+    points = np.array(game_map['points'])
+    assert (points[:, 0] < 30).sum() > 3 * (points[:, 0] >= 30).sum()
@@ -0,0 +1,74 @@
+import pytest
+import numpy as np
+from imperial_generals.map import MapStore, RangeTable, VoronoiMap
+
+@pytest.fixture
+def ridge_map():
+    # 10x10 jittered grid with a high ridge along x = 45..55
+    rng = np.random.default_rng(2)
+    xs, ys = np.meshgrid(np.arange(10) * 10 + 5, np.arange(10) * 10 + 5)
+    points = np.column_stack([xs.ravel(), ys.ravel()]) + rng.uniform(-1, 1, size=(100, 2))
+    vm = VoronoiMap(points, width=100, height=100)
+    vm.generate_diagram()
+    centroids = vm.get_centroids()
+    vm.cell_data['elevation'] = np.where(np.abs(centroids[:, 0] - 50) < 6, 0.9, 0.1 + centroids[:, 1] / 1000)
+    return vm
+
+def test_pairs_match_brute_force(ridge_map):
+    table = RangeTable.build(ridge_map, max_range=25)
+    centroids = ridge_map.get_centroids()
+    dist = np.linalg.norm(centroids[:, None] - centroids[None, :], axis=2)
+    expected = (dist <= 25) & ~np.eye(100, dtype=bool)
+    assert len(table.indices) == expected.sum()
+    for cell in (0, 37, 99):
+        assert sorted(table.targets(cell, visible_only=False).tolist()) == np.flatnonzero(expected[cell]).tolist()
+    src = np.repeat(np.arange(100), np.diff(table.indptr))
+    np.testing.assert_allclose(table.distance, dist[src, table.indices], rtol=1e-5)
+
+def test_line_of_sight_blocked_by_ridge(ridge_map):
+    table = RangeTable.build(ridge_map, max_range=40)
+    centroids = ridge_map.get_centroids()
+    west = np.flatnonzero(centroids[:, 0] < 40)
+    east = np.flatnonzero(centroids[:, 0] > 60)
+    shooters, targets = np.meshgrid(west, east, indexing='ij')
+    result = table.lookup(shooters.ravel(), targets.ravel())
+    assert result['in_range'].any()
+    assert not result['line_of_sight'][result['in_range']].any()
+    # cells on the same side of the ridge see each other
+    same_side = table.lookup(west[:-1], west[1:])
+    assert same_side['line_of_sight'][same_side['in_range']].all()
+
+def test_effective_distance_uphill_and_downhill(ridge_map):
+    table = RangeTable.build(ridge_map, max_range=25, slope_factor=0.5)
+    pos = np.flatnonzero(table.elevation_delta > 0.5)
+    src = np.repeat(np.arange(100), np.diff(table.indptr))
+    assert len(pos)
+    # firing uphill counts as further than the flat distance, the reverse shot as closer
+    assert (table.effective_distance[pos] > table.distance[pos]).all()
+    back = table.lookup(table.indices[pos], src[pos])
+    assert (back['effective_distance'] < back['distance']).all()
+    np.testing.assert_allclose(back['elevation_delta'], -table.elevation_delta[pos])
+
+def test_lookup_out_of_range(ridge_map):
+    table = RangeTable.build(ridge_map, max_range=12)
+    result = table.lookup(np.array([0, 0]), np.array([0, 99]))
+    assert not result['in_range'].any()
+    assert np.isinf(result['effective_distance']).all()
+    assert not result['line_of_sight'].any()
+
+def test_save_and_load_with_map(ridge_map, tmp_path):
+    table = RangeTable.build(ridge_map, max_range=20)
+    table.save(ridge_map, tmp_path / "map")
+    loaded = RangeTable.load(tmp_path / "map")
+    assert loaded.max_range == 20
+    for name in ('indptr', 'indices', 'effective_distance', 'line_of_sight'):
+        np.testing.assert_array_equal(getattr(loaded, name), getattr(table, name))
+    assert len(MapStore.load(tmp_path / "map").points) == 100
+
+def test_build_requires_elevation():
+    vm = VoronoiMap([(10, 10), (90, 10), (50, 90)], width=100, height=100)
+    vm.generate_diagram()
+    with pytest.raises(ValueError):
+        RangeTable.build(vm, max_range=10)
+    with pytest.raises(ValueError):
+        RangeTable.build(vm, max_range=0, elevation=np.zeros(3))
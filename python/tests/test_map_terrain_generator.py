@@ -0,0 +1,63 @@
+import pytest
+import numpy as np
+from imperial_generals.map import MapConfig, MapGenerator, TerrainGenerator, TERRAIN_TYPES, TERRAIN_MOVE_COSTS
+
+@pytest.fixture
+def centroids():
+    return np.random.default_rng(0).uniform(0, 100, size=(500, 2))
+
+def test_generate_shapes_and_ranges(centroids):
+    terrain = TerrainGenerator(seed=3).generate(centroids, 100, 100)
+    assert terrain['elevation'].shape == (500,)
+    assert terrain['terrain'].shape == (500,)
+    assert terrain['elevation'].min() >= 0 and terrain['elevation'].max() <= 1
+    assert set(np.unique(terrain['terrain'])) <= set(range(len(TERRAIN_TYPES)))
+    water = terrain['terrain'] == TERRAIN_TYPES.index('water')
+    assert np.all(terrain['elevation'][water] < 0.3)
+
+def test_generate_is_seedable(centroids):
+    a = TerrainGenerator(seed=7).generate(centroids, 100, 100)
+    b = TerrainGenerator(seed=7).generate(centroids, 100, 100)
+    c = TerrainGenerator(seed=8).generate(centroids, 100, 100)
+    assert np.array_equal(a['elevation'], b['elevation'])
+    assert np.array_equal(a['terrain'], b['terrain'])
+    assert not np.array_equal(a['elevation'], c['elevation'])
+
+def test_noise_is_smooth():
+    tg = TerrainGenerator(seed=1, octaves=1)
+    xs = np.column_stack([np.linspace(0, 10, 1001), np.full(1001, 5.0)])
+    values = tg.fractal_noise(xs, 100)
+    assert np.abs(np.diff(values)).max() < 0.01
+
+def test_movement_costs():
+    codes = np.array([TERRAIN_TYPES.index(t) for t in TERRAIN_TYPES])
+    costs = TerrainGenerator.movement_costs(codes)
+    assert costs.tolist() == [TERRAIN_MOVE_COSTS[t] for t in TERRAIN_TYPES]
+
+def test_invalid_parameters():
+    with pytest.raises(ValueError):
+        TerrainGenerator(octaves=0)
+    with pytest.raises(ValueError):
+        TerrainGenerator(sea_level=0.9, hill_level=0.5)
+
+def test_map_generator_assigns_terrain():
+    config = MapConfig(width=60, height=60, min_distance=6, seed=11)
+    game_map = MapGenerator(config).generate_map()
+    n = len(game_map['points'])
+    assert game_map['elevation'].shape == (n,)
+    assert game_map['terrain'].shape == (n,)
+    assert game_map['voronoi'].cell_data['terrain'] is game_map['terrain']
+    again = MapGenerator(config).generate_map()
+    assert game_map['points'] == again['points']
+    assert np.array_equal(game_map['elevation'], again['elevation'])
+
+def test_add_points_updates_terrain_of_reshaped_cells():
+    config = MapConfig(width=60, height=60, min_distance=6, seed=11)
+    generator = MapGenerator(config)
+    voronoi = generator.generate_map()['voronoi']
+    voronoi.add_points([(30.5, 30.5), (2.0, 57.0)])
+    # terrain stays a function of the centroids, as if the map had been generated with these cells
+    terrain_seed = np.random.SeedSequence(11).spawn(2)[1]
+    expected = TerrainGenerator(seed=np.random.default_rng(terrain_seed)).generate(voronoi.get_centroids(), 60, 60)
+    for name in ('elevation', 'moisture', 'terrain'):
+        np.testing.assert_allclose(voronoi.cell_data[name], expected[name])
@@ -1,7 +1,7 @@
 import pytest
 import numpy as np
 from imperial_generals.map import VoronoiMap
-from shapely.geometry import Polygon
+from shapely.geometry import Point, Polygon
 from unittest.mock import patch
 
 @pytest.fixture
@@ -71,4 +71,94 @@ def test_visualize_points_empty():
 def test_visualize_cells_empty():
     vm = VoronoiMap([(10, 10)], width=100, height=100)
     # No diagram generated yet
-    vm.visualize_cells()
\ No newline at end of file
+    vm.visualize_cells()
+
+def test_locate_points_matches_polygons():
+    rng = np.random.default_rng(0)
+    sites = rng.uniform(0, 100, size=(40, 2))
+    vm = VoronoiMap(sites, width=100, height=100)
+    vm.generate_diagram()
+    queries = rng.uniform(0, 100, size=(200, 2))
+    cells = vm.locate_points(queries)
+    assert cells.shape == (200,)
+    for (x, y), cell in zip(queries, cells):
+        # the polygon built for the located site must contain the query point
+        assert vm.polygons[cell].buffer(1e-9).contains(Point(x, y))
+
+def test_locate_points_outside_and_single(simple_points):
+    vm = VoronoiMap(simple_points, width=100, height=100)
+    cells = vm.locate_points([(-1, 50), (50, 101), (12, 8)])
+    assert cells.tolist() == [-1, -1, 0]
+    assert vm.locate_point(85, 88) == 2
+    vm.add_points([(50, 50)])
+    assert vm.locate_point(52, 49) == 4
+
+def test_locate_points_empty():
+    vm = VoronoiMap([], width=100, height=100)
+    assert vm.locate_points([(1, 1)]).tolist() == [-1]
+    assert vm.locate_points(np.empty((0, 2))).shape == (0,)
+
+def test_add_points_incremental_matches_full_rebuild():
+    rng = np.random.default_rng(3)
+    sites = rng.uniform(0, 100, size=(200, 2))
+    extra = rng.uniform(0, 100, size=(15, 2))
+    vm = VoronoiMap(sites, width=100, height=100)
+    vm.generate_diagram()
+    vm.get_adjacency()
+    vm.cell_data['owner'] = np.arange(200)
+    parents = vm.locate_points(extra)
+    vm.add_points(extra)
+
+    full = VoronoiMap(np.vstack([sites, extra]), width=100, height=100)
+    full.generate_diagram()
+    assert sorted(vm.polygon_sites.tolist()) == sorted(full.polygon_sites.tolist())
+    incremental = dict(zip(vm.polygon_sites.tolist(), vm.polygons))
+    for site, polygon in zip(full.polygon_sites.tolist(), full.polygons):
+        assert incremental[site].symmetric_difference(polygon).area < 1e-9
+    for got, expected in zip(vm.get_adjacency(), full.get_adjacency()):
+        np.testing.assert_array_equal(got, expected)
+    # new cells inherit the attributes of the cell they were placed in
+    np.testing.assert_array_equal(vm.cell_data['owner'][200:], parents)
+    assert vm.locate_points(extra).tolist() == list(range(200, 215))
+
+def test_add_points_after_from_arrays_is_local():
+    rng = np.random.default_rng(5)
+    sites = rng.uniform(0, 100, size=(100, 2))
+    extra = rng.uniform(0, 100, size=(5, 2))
+    vm = VoronoiMap(sites, width=100, height=100)
+    vm.generate_diagram()
+    vm.get_adjacency()
+    restored = VoronoiMap.from_arrays(vm.to_arrays(), width=100, height=100)
+    restored.add_points(extra)
+    assert restored.diagram is None
+    full = VoronoiMap(np.vstack([sites, extra]), width=100, height=100)
+    full.generate_diagram()
+    for got, expected in zip(restored.get_adjacency(), full.get_adjacency()):
+        np.testing.assert_array_equal(got, expected)
+    assert restored.locate_points(extra).tolist() == list(range(100, 105))
+
+def test_repeated_add_points_match_full_rebuild():
+    rng = np.random.default_rng(8)
+    vm = VoronoiMap(rng.uniform(0, 50, size=(60, 2)), width=50, height=50)
+    vm.generate_diagram()
+    calls = []
+    vm.cell_updaters.append(lambda voronoi, cells: calls.append(cells))
+    for _ in range(10):
+        vm.add_points(rng.uniform(0, 50, size=(3, 2)))
+    full = VoronoiMap(vm.points, width=50, height=50)
+    full.generate_diagram()
+    for got, expected in zip(vm.get_adjacency(), full.get_adjacency()):
+        np.testing.assert_array_equal(got, expected)
+    # updaters see each call's new cells plus the neighbours they reshaped, not the whole map
+    assert len(calls) == 10
+    assert all(3 < len(cells) < 40 for cells in calls)
+    np.testing.assert_allclose(vm.get_centroids(calls[-1]), full.get_centroids()[calls[-1]])
+
+def test_add_points_rejects_points_off_the_map_or_on_a_site():
+    vm = VoronoiMap([(10, 10), (20, 20), (30, 10), (40, 40)], width=50, height=50)
+    vm.generate_diagram()
+    with pytest.raises(ValueError):
+        vm.add_points([(60, 10)])
+    with pytest.raises(ValueError):
+        vm.add_points([(5, 5), (20, 20)])
+    assert len(vm.points) == 4
@@ -0,0 +1,39 @@
+import os
+import subprocess
+import sys
+import pytest
+
+PYTHON_DIR = os.path.join(os.path.dirname(__file__), '..')
+
+def loaded_modules(statement):
+    # fresh interpreter, so modules imported by other tests do not count
+    code = f"{statement}; import sys; print(' '.join(sorted(m for m in sys.modules if '.' not in m)))"
+    env = dict(os.environ, PYTHONPATH=os.path.abspath(PYTHON_DIR))
+    out = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, env=env, check=True)
+    return set(out.stdout.split())
+
+@pytest.mark.parametrize("statement", [
+    "import imperial_generals.battles",
+    "import imperial_generals.map",
+    "from imperial_generals.map import MapConfig",
+])
+def test_heavy_dependencies_not_imported(statement):
+    assert not loaded_modules(statement) & {'pandas', 'scipy', 'shapely', 'matplotlib'}
+
+def test_map_generation_does_not_import_matplotlib():
+    loaded = loaded_modules("from imperial_generals.map import MapGenerator")
+    assert 'scipy' in loaded
+    assert 'matplotlib' not in loaded
+
+def test_lazy_names_resolve_to_classes():
+    # importing MapStore loads the VoronoiMap submodule first; the package must still expose the class
+    loaded = loaded_modules(
+        "from imperial_generals.map import MapStore; import imperial_generals.map as m; "
+        "assert isinstance(m.VoronoiMap, type) and isinstance(m.MapStore, type); "
+        "from imperial_generals.map import VoronoiMap; assert VoronoiMap is m.VoronoiMap"
+    )
+    assert 'shapely' in loaded
+    import imperial_generals.map as game_map
+    assert set(game_map.__all__) <= set(dir(game_map))
+    with pytest.raises(AttributeError):
+        game_map.NotAThing
@@ -39,3 +39,15 @@ def test_army_golden(case):
     if case.get('expectedForcesCount', None) is not None:
         # checking the count of forces
         assert len(army.forces) == case['expectedForcesCount']
+
+def test_army_bulk_json_round_trip():
+    cases = load_army_golden_cases()
+    payload = [case["expected"] for case in cases if "forces" in case.get("expected", {})]
+    payload.append({"faction": "Confederacy", "forces": {"A": {"size": 10, "stats": "1/2/3/4", "law": "ln"}}})
+    armies = Army.bulk_from_json(payload)
+    assert [a.faction for a in armies] == ["Union", "Confederacy"]
+    assert armies[0].forces["1st VA"].stats == (2, 3, 1, 0)
+    restored = Army.bulk_from_json(Army.bulk_to_json(armies))
+    assert [vars(r) for r in restored[1].forces.values()] == [vars(r) for r in armies[1].forces.values()]
+    with pytest.raises(ValueError):
+        Army.from_json({"faction": "Union", "forces": {"A": {"size": 10, "stats": "1/2/3", "law": "ln"}}})
@@ -21,3 +21,44 @@ def test_regiment_golden(case):
         assert reg.size == expected['size']
         assert reg.stats == tuple(expected['stats'])
         assert reg.law == expected['law']
+
+def test_regiment_frontage():
+    assert Regiment(500, '4/5/2/1', 'ln').frontage is None
+    reg = Regiment(500, '4/5/2/1', 'ln', frontage=120)
+    assert reg.frontage == 120 and "frontage=120" in repr(reg)
+    for frontage in (0, -5, 12.5):
+        with pytest.raises(ValueError):
+            Regiment(500, '4/5/2/1', 'ln', frontage=frontage)
+
+def test_bulk_from_json_matches_constructor():
+    cases = load_regiment_golden_cases()
+    valid = [case["inputs"] for case in cases if not case.get("shouldError")]
+    bulk = Regiment.bulk_from_json(valid)
+    for inputs, reg in zip(valid, bulk):
+        expected = Regiment(inputs["size"], inputs["stats"], inputs["law"])
+        assert vars(reg) == vars(expected)
+    for case in cases:
+        if case.get("shouldError"):
+            with pytest.raises(ValueError, match="index 1"):
+                Regiment.bulk_from_json([valid[0], case["inputs"]])
+
+def test_bulk_from_json_validates_each_record():
+    good = {"size": 10, "stats": "4/5/2/1", "law": "sq"}
+    # part counts that only add up over the whole payload
+    with pytest.raises(ValueError, match="index 1"):
+        Regiment.bulk_from_json([good, dict(good, stats="1/2/3"), dict(good, stats="4/5/6/7/8")])
+    with pytest.raises(ValueError, match="index 0"):
+        Regiment.bulk_from_json({"size": [1, 1], "stats": [[1, 2, 3], [4, 5, 6, 7, 8]], "law": ["sq", "sq"]})
+    for size in (-5, "abc", 2.5, None, True):
+        with pytest.raises(ValueError, match="index 1: size"):
+            Regiment.bulk_from_json([good, dict(good, size=size)])
+    assert Regiment.bulk_from_json([dict(good, size=0)])[0].size == 0
+
+def test_bulk_json_round_trip():
+    regs = [Regiment(100, "4/5/2/1", "ln", frontage=40), Regiment(50, "3/6/1/0", "sq")]
+    regs[1].update_raw_morale(47.5)
+    for columnar in (False, True):
+        restored = Regiment.bulk_from_json(Regiment.bulk_to_json(regs, columnar=columnar))
+        assert [vars(r) for r in restored] == [vars(r) for r in regs]
+    assert Regiment.from_json({"size": 10, "stats": [4, 5, 2, 1], "law": "sq"}).stats == (4, 5, 2, 1)
+    assert Regiment.bulk_from_json({"size": [10], "stats": ["4/5/2/1"], "law": ["sq"]})[0].frontage is None
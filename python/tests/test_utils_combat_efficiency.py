@@ -1,7 +1,7 @@
 import os
 import json
 import pytest
-from imperial_generals.utils.combat_efficiency import get_combat_efficiency
+from imperial_generals.utils.combat_efficiency import get_combat_efficiency, get_combat_efficiency_batch
 
 GOLDEN_PATH = os.path.join(os.path.dirname(__file__), '../../test_cases/combat_efficiency.json')
 
@@ -15,3 +15,11 @@ def test_get_combat_efficiency_golden(case):
         # checking that result is within range
         lo, hi = case["expectedRange"]
         assert lo <= result <= hi
+
+def test_get_combat_efficiency_batch_matches_scalar():
+    cases = json.load(open(GOLDEN_PATH))
+    inputs = [[case["inputs"][k] for k in ("stat_xp", "stat_morale", "stat_weapon", "stat_melee")] for case in cases]
+    batch = get_combat_efficiency_batch(*zip(*inputs))
+    assert batch.tolist() == [get_combat_efficiency(*i) for i in inputs]
+    with pytest.raises(TypeError):
+        get_combat_efficiency_batch([1.5], [5], [0], [0])
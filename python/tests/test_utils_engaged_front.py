@@ -0,0 +1,29 @@
+import os
+import json
+import pytest
+import numpy as np
+from imperial_generals.utils.engaged_front import get_engaged_front
+
+GOLDEN_PATH = os.path.join(os.path.dirname(__file__), '../../test_cases/engaged_front.json')
+
+@pytest.mark.parametrize("case", json.load(open(GOLDEN_PATH)))
+def test_get_engaged_front_golden(case):
+    if "expected" in case:
+        assert np.allclose(get_engaged_front(**case["inputs"]), case["expected"])
+
+def test_get_engaged_front_batched():
+    # one call over replicas matches the per-replica calls
+    rng = np.random.default_rng(0)
+    sizes = rng.integers(0, 1000, size=(50, 3))
+    frontages = np.array([250, 300, 400])
+    batched = get_engaged_front(sizes, frontages, sides=[0, 1, 1], front_width=500)
+    for row, expected in zip(sizes, batched):
+        assert np.allclose(get_engaged_front(row, frontages, sides=[0, 1, 1], front_width=500), expected)
+    # both sides always engage the same number of men
+    assert np.allclose(batched[:, 0], batched[:, 1:].sum(axis=1))
+
+def test_get_engaged_front_needs_two_sides():
+    with pytest.raises(ValueError):
+        get_engaged_front([10, 20, 30])
+    with pytest.raises(ValueError):
+        get_engaged_front([10, 20], sides=[0, 0])
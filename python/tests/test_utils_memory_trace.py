@@ -0,0 +1,25 @@
+import tracemalloc
+from imperial_generals.utils.memory_trace import trace_memory
+
+def test_trace_memory_reports_peak_and_retained():
+    report = {}
+    with trace_memory(report, "alloc"):
+        kept = [bytearray(10_000) for _ in range(10)]
+        temporary = bytearray(1_000_000)
+        del temporary
+    assert report["alloc"]["peak"] >= 1_000_000 + 100_000
+    assert 100_000 <= report["alloc"]["retained"] < 1_000_000
+    assert len(report["alloc"]["top"]) <= 5
+    assert not tracemalloc.is_tracing()
+    assert len(kept) == 10
+
+def test_trace_memory_leaves_outer_tracing_running():
+    report = {}
+    tracemalloc.start()
+    try:
+        with trace_memory(report, "inner", top=0):
+            pass
+        assert tracemalloc.is_tracing()
+        assert "top" not in report["inner"]
+    finally:
+        tracemalloc.stop()
@@ -0,0 +1,131 @@
+"""
+Run the Python benchmark suite (python/benchmarks/suite.py) and store the results.
+
+Each run is saved as .benchmarks/<timestamp>-<commit>.json with the commit, interpreter and
+machine, so runs of different commits can be compared:
+
+    python run_benchmarks.py                          # run everything, compare with the previous run
+    python run_benchmarks.py -k simulation_run        # only cases whose name contains the pattern
+    python run_benchmarks.py --compare .benchmarks/20260101T120000-abc1234.json --fail-on-regression
+    python run_benchmarks.py --show A.json B.json     # compare two stored runs without running
+"""
+
+import os
+import sys
+import json
+import glob
+import logging
+import argparse
+import platform
+import subprocess
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+RESULTS_DIR = os.path.join(ROOT, '.benchmarks')
+sys.path.insert(0, os.path.join(ROOT, 'python'))
+sys.path.insert(0, os.path.join(ROOT, 'python', 'benchmarks'))
+
+
+def git_revision():
+    def git(*args):
+        result = subprocess.run(['git', *args], cwd=ROOT, capture_output=True, text=True)
+        return result.stdout.strip() if result.returncode == 0 else ''
+    return git('rev-parse', '--short', 'HEAD') or 'unknown', bool(git('status', '--porcelain', '--untracked-files=no'))
+
+
+def run_suite(pattern, repeat, min_time):
+    import suite
+
+    # per-call INFO records (and their console output) would be part of every timing
+    logging.disable(logging.INFO)
+
+    results = {}
+    for case, setup, param in suite.cases(pattern):
+        func = setup() if param is None else setup(param)
+        results[case] = suite.measure(func, repeat=repeat, min_time=min_time)
+        print(f"  {case:<32} {results[case]['median'] * 1000:>10.2f} ms  (min {results[case]['min'] * 1000:.2f}, n={results[case]['repeats']})")
+    return results
+
+
+def save_run(results):
+    commit, dirty = git_revision()
+    stamp = datetime.now()
+    run = {
+        'commit': commit,
+        'dirty': dirty,
+        'timestamp': stamp.isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'machine': f"{platform.system()} {platform.machine()} ({os.cpu_count()} cpus)",
+        'results': results,
+    }
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    path = os.path.join(RESULTS_DIR, f"{stamp:%Y%m%dT%H%M%S}-{commit}{'-dirty' if dirty else ''}.json")
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(run, f, indent=2)
+    return path, run
+
+
+def compare(base, new, threshold):
+    """Print median ratios for the cases in both runs; return the cases slower than 1 + threshold."""
+    print(f"\n=== {new['commit']} vs {base['commit']} (median, regression above +{threshold:.0%}) ===")
+    regressions = []
+    for case, result in new['results'].items():
+        if case not in base['results']:
+            continue
+        ratio = result['median'] / base['results'][case]['median']
+        flag = ''
+        if ratio > 1 + threshold:
+            flag = 'SLOWER'
+            regressions.append(case)
+        elif ratio < 1 - threshold:
+            flag = 'faster'
+        print(f"  {case:<32} {base['results'][case]['median'] * 1000:>10.2f} -> {result['median'] * 1000:>10.2f} ms  x{ratio:5.2f}  {flag}")
+    return regressions
+
+
+def load_run(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('-k', '--filter', default='', help='run only cases whose name contains this')
+    parser.add_argument('--repeat', type=int, default=5, help='minimum timed calls per case')
+    parser.add_argument('--min-time', type=float, default=0.2, help='minimum timed seconds per case')
+    parser.add_argument('--compare', help='stored run to compare with (default: the latest stored run)')
+    parser.add_argument('--threshold', type=float, default=0.10, help='relative slowdown reported as a regression')
+    parser.add_argument('--fail-on-regression', action='store_true', help='exit with status 1 on regressions')
+    parser.add_argument('--no-save', action='store_true', help='do not store this run')
+    parser.add_argument('--show', nargs=2, metavar=('BASE', 'NEW'), help='compare two stored runs and exit')
+    args = parser.parse_args()
+
+    if args.show:
+        regressions = compare(load_run(args.show[0]), load_run(args.show[1]), args.threshold)
+        return 1 if regressions and args.fail_on_regression else 0
+
+    previous = sorted(glob.glob(os.path.join(RESULTS_DIR, '*.json')))
+    base_path = args.compare or (previous[-1] if previous else None)
+
+    print("\n===== BENCHMARK SUITE =====\n")
+    results = run_suite(args.filter, args.repeat, args.min_time)
+    if not results:
+        print(f"No benchmark matches {args.filter!r}")
+        return 1
+    if args.no_save:
+        commit, dirty = git_revision()
+        run = {'commit': commit + ('-dirty' if dirty else ''), 'results': results}
+    else:
+        path, run = save_run(results)
+        print(f"\nSaved results to {os.path.relpath(path, ROOT)}")
+
+    if base_path is None:
+        return 0
+    regressions = compare(load_run(base_path), run, args.threshold)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s): {', '.join(regressions)}")
+    return 1 if regressions and args.fail_on_regression else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())